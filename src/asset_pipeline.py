@@ -0,0 +1,63 @@
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Any, Callable, Dict, Tuple
+from log_system import get_logger
+
+log = get_logger('assets')
+
+class AssetPipeline:
+    """Runs asset loading jobs on worker threads and reports overall progress.
+
+    Jobs are plain callables (decode images, build map layers, load sounds).
+    The main loop keeps drawing while they run and only blocks on a job's
+    future when a game system actually needs its result.
+    """
+    def __init__(self, max_workers: int = 2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="asset-loader")
+        self._jobs: Dict[str, Tuple[Future, float]] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, name: str, job: Callable, *args, weight: float = 1.0) -> Future:
+        """Queue a loading job; weight sets its share of the progress bar"""
+        future = self._executor.submit(job, *args)
+        with self._lock:
+            self._jobs[name] = (future, weight)
+        return future
+
+    def get(self, name: str, timeout: float = None) -> Any:
+        """Wait for a job and return its result (re-raises job errors)"""
+        return self._jobs[name][0].result(timeout)
+
+    def wait_all(self) -> Dict[str, BaseException]:
+        """Block until every submitted job has finished; logs and returns the jobs that failed"""
+        with self._lock:
+            jobs = [(name, future) for name, (future, _) in self._jobs.items()]
+        failed = {}
+        for name, future in jobs:
+            error = future.exception()
+            if error is not None:
+                failed[name] = error
+                log.error("Asset job '%s' failed: %s", name,
+                          ''.join(traceback.format_exception(type(error), error, error.__traceback__)).rstrip())
+        return failed
+
+    def is_done(self, name: str = None) -> bool:
+        """Check whether one job (or every job) has finished"""
+        with self._lock:
+            if name is not None:
+                return self._jobs[name][0].done()
+            return all(future.done() for future, _ in self._jobs.values())
+
+    def get_progress(self) -> float:
+        """Get weighted progress of all jobs (0.0 to 1.0)"""
+        with self._lock:
+            total = sum(weight for _, weight in self._jobs.values())
+            if total <= 0:
+                return 1.0
+            done = sum(weight for future, weight in self._jobs.values() if future.done())
+        return done / total
+
+    def shutdown(self):
+        """Stop the workers, dropping jobs that have not started"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
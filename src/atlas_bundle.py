@@ -0,0 +1,257 @@
+import pygame
+import os
+import sys
+import json
+import mmap
+import threading
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional, Tuple
+from startup_profiler import profiler
+
+# Packed texture atlas built offline from every sheet the game uses.
+#
+# Build it from the project root with:
+#     python src/atlas_bundle.py
+#
+# The bundle is one raw RGBA file (memory-mapped at startup) plus a JSON index
+# of frame rectangles. If any source PNG changed since the build, the bundle is
+# treated as stale and the game falls back to decoding the PNGs.
+
+ATLAS_DIR = os.path.join("assets", "atlas")
+ATLAS_PIXELS_FILE = "atlas.rgba"
+ATLAS_INDEX_FILE = "atlas_index.json"
+ATLAS_FORMAT_VERSION = 1
+ATLAS_WIDTH = 4096
+
+def _frame_set_key(sheet_path: str, sprite_width: int, sprite_height: int, scale: float) -> str:
+    return f"{os.path.normpath(sheet_path)}|{sprite_width}|{sprite_height}|{scale!r}"
+
+def _image_key(image_path: str, scale: float = 1) -> str:
+    return f"{os.path.normpath(image_path)}|{scale!r}"
+
+def _source_stamp(path: str) -> Optional[List[int]]:
+    """Get the (mtime, size) fingerprint used for staleness checks"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+class AtlasBundle:
+    """Memory-mapped atlas page with frame lookups returning subsurfaces"""
+    def __init__(self, index: Dict, page: pygame.Surface, mapped_file=None):
+        self.index = index
+        self.page = page
+        # Keep the mapping alive while the page (or its subsurfaces) reference it
+        self._mapped_file = mapped_file
+
+    @classmethod
+    def load(cls, atlas_dir: str = ATLAS_DIR, convert: bool = True) -> Optional['AtlasBundle']:
+        """Load the bundle, or return None if it is missing or stale"""
+        index_path = os.path.join(atlas_dir, ATLAS_INDEX_FILE)
+        pixels_path = os.path.join(atlas_dir, ATLAS_PIXELS_FILE)
+        if not os.path.exists(index_path) or not os.path.exists(pixels_path):
+            return None
+
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Atlas index unreadable, falling back to PNG loading: {e}")
+            return None
+
+        if index.get('version') != ATLAS_FORMAT_VERSION:
+            print("Atlas bundle format changed, falling back to PNG loading")
+            return None
+
+        for source, stamp in index['sources'].items():
+            if _source_stamp(source) != stamp:
+                print(f"Atlas bundle is stale ({source} changed), falling back to PNG loading. "
+                      f"Rebuild with: python src/atlas_bundle.py")
+                return None
+
+        width, height = index['size']
+        with open(pixels_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size != width * height * 4:
+                print("Atlas pixel file does not match its index, falling back to PNG loading")
+                return None
+            # Copy-on-write mapping so nothing can write back into the bundle
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        page = pygame.image.frombuffer(mapped, (width, height), 'RGBA')
+        if convert and pygame.display.get_surface() is not None:
+            # One conversion pass to the display format keeps per-frame blits fast
+            page = page.convert_alpha()
+            mapped.close()
+            mapped = None
+
+        return cls(index, page, mapped)
+
+    def _subsurface(self, rect: List[int]) -> pygame.Surface:
+        return self.page.subsurface(pygame.Rect(rect))
+
+    def get_frame_set(self, sheet_path: str, sprite_width: int, sprite_height: int,
+                      scale: float) -> Optional[Dict[str, List[pygame.Surface]]]:
+        """Get pre-sliced animation frames for a sheet, or None if not bundled"""
+        entry = self.index['frame_sets'].get(_frame_set_key(sheet_path, sprite_width, sprite_height, scale))
+        if entry is None:
+            return None
+
+        surfaces = {}
+        animations = {}
+        for name, rects in entry.items():
+            frames = []
+            for rect in rects:
+                rect_key = tuple(rect)
+                if rect_key not in surfaces:
+                    surfaces[rect_key] = self._subsurface(rect)
+                frames.append(surfaces[rect_key])
+            animations[name] = frames
+        return animations
+
+    def get_image(self, image_path: str, scale: float = 1) -> Optional[pygame.Surface]:
+        """Get a bundled image (tileset or icon), or None if not bundled"""
+        rect = self.index['images'].get(_image_key(image_path, scale))
+        if rect is None:
+            return None
+        return self._subsurface(rect)
+
+_atlas = None
+_atlas_checked = False
+_atlas_lock = threading.Lock()
+
+def get_atlas() -> Optional[AtlasBundle]:
+    """Get the process-wide atlas bundle, loading it on first call"""
+    global _atlas, _atlas_checked
+    # Asset loader threads may ask for the atlas at the same time
+    with _atlas_lock:
+        if not _atlas_checked:
+            _atlas_checked = True
+            try:
+                with profiler.phase('atlas'):
+                    _atlas = AtlasBundle.load()
+            except (OSError, ValueError, pygame.error) as e:
+                print(f"Failed to load atlas bundle, falling back to PNG loading: {e}")
+                _atlas = None
+    return _atlas
+
+def _pack_shelves(sizes: List[Tuple[int, int]], width: int) -> Tuple[List[Tuple[int, int]], int]:
+    """Shelf-pack rectangles; returns positions (same order as sizes) and total height"""
+    order = sorted(range(len(sizes)), key=lambda i: sizes[i][1], reverse=True)
+    positions = [None] * len(sizes)
+    x = y = shelf_height = 0
+    for i in order:
+        w, h = sizes[i]
+        if w > width:
+            raise ValueError(f"Image {w}x{h} is wider than the atlas ({width})")
+        if x + w > width:
+            y += shelf_height
+            x = shelf_height = 0
+        positions[i] = (x, y)
+        x += w
+        shelf_height = max(shelf_height, h)
+    return positions, y + shelf_height
+
+def _tileset_image_paths(tmx_path: str) -> List[str]:
+    """List the tileset images referenced by a TMX map"""
+    map_dir = os.path.dirname(tmx_path)
+    paths = []
+    for tileset in ET.parse(tmx_path).getroot().findall('tileset'):
+        tileset_elem = tileset
+        source = tileset.get('source')
+        if source:
+            tsx_path = os.path.join(map_dir, source)
+            if not os.path.exists(tsx_path):
+                continue
+            tileset_elem = ET.parse(tsx_path).getroot()
+        image_elem = tileset_elem.find('image')
+        if image_elem is not None:
+            image_path = os.path.normpath(os.path.join(map_dir, image_elem.get('source')))
+            if os.path.exists(image_path) and image_path not in paths:
+                paths.append(image_path)
+    return paths
+
+def build_atlas(atlas_dir: str = ATLAS_DIR, tmx_path: str = os.path.join("tiled_map", "Basic_maps.tmx")):
+    """Slice, scale, flip and pack every sheet the game uses into one bundle"""
+    from utils import AnimationLibrary
+    from enemy_system import ENEMY_CONFIGS
+    from player import PLAYER_SPRITE_PATH, PLAYER_SPRITE_SCALE
+    from powerup_system import POWERUP_CONFIGS, PowerUpRegistry
+
+    sources = {}
+    images = []        # Unique surfaces to pack
+    image_ids = {}     # id(surface) -> index in images
+
+    def add_surface(surface):
+        if id(surface) not in image_ids:
+            image_ids[id(surface)] = len(images)
+            images.append(surface)
+        return image_ids[id(surface)]
+
+    # Animation sheets (Player and every enemy archetype)
+    library = AnimationLibrary(use_atlas=False)
+    sheets = [(PLAYER_SPRITE_PATH, 192, 192, PLAYER_SPRITE_SCALE)]
+    for config in ENEMY_CONFIGS.values():
+        sheets.append((config['sprite_path'], config['sprite_width'], config['sprite_height'], config['scale']))
+
+    frame_sets = {}
+    for sheet_path, sprite_width, sprite_height, scale in sheets:
+        key = _frame_set_key(sheet_path, sprite_width, sprite_height, scale)
+        if key in frame_sets:
+            continue
+        animations = library.get_animations(sheet_path, sprite_width, sprite_height, scale)
+        frame_sets[key] = {name: [add_surface(frame) for frame in frames]
+                           for name, frames in animations.items()}
+        sources[os.path.normpath(sheet_path)] = _source_stamp(sheet_path)
+
+    # Power-up icons
+    bundled_images = {}
+    registry = PowerUpRegistry(POWERUP_CONFIGS, use_atlas=False)
+    for config in POWERUP_CONFIGS.values():
+        if not os.path.exists(config['sprite_path']):
+            continue
+        icon = registry._load_icon(config)
+        bundled_images[_image_key(config['sprite_path'], config['scale'])] = add_surface(icon)
+        sources[os.path.normpath(config['sprite_path'])] = _source_stamp(config['sprite_path'])
+
+    # Map tilesets (unscaled, MapLoader slices tiles from them)
+    if os.path.exists(tmx_path):
+        for image_path in _tileset_image_paths(tmx_path):
+            tileset_image = pygame.image.load(image_path).convert_alpha()
+            bundled_images[_image_key(image_path)] = add_surface(tileset_image)
+            sources[image_path] = _source_stamp(image_path)
+
+    positions, height = _pack_shelves([surface.get_size() for surface in images], ATLAS_WIDTH)
+    page = pygame.Surface((ATLAS_WIDTH, height), pygame.SRCALPHA)
+    page.fill((0, 0, 0, 0))
+    rects = []
+    for surface, position in zip(images, positions):
+        page.blit(surface, position)
+        rects.append([position[0], position[1], surface.get_width(), surface.get_height()])
+
+    index = {
+        'version': ATLAS_FORMAT_VERSION,
+        'size': [ATLAS_WIDTH, height],
+        'sources': sources,
+        'frame_sets': {key: {name: [rects[i] for i in frame_ids] for name, frame_ids in animations.items()}
+                       for key, animations in frame_sets.items()},
+        'images': {key: rects[i] for key, i in bundled_images.items()}
+    }
+
+    os.makedirs(atlas_dir, exist_ok=True)
+    with open(os.path.join(atlas_dir, ATLAS_PIXELS_FILE), 'wb') as f:
+        f.write(pygame.image.tobytes(page, 'RGBA'))
+    with open(os.path.join(atlas_dir, ATLAS_INDEX_FILE), 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+
+    print(f"Atlas built: {len(images)} images packed into {ATLAS_WIDTH}x{height} "
+          f"({ATLAS_WIDTH * height * 4 / (1024 * 1024):.1f} MB) from {len(sources)} source files")
+    return index
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    pygame.init()
+    # Hidden display so convert_alpha() matches the game's pixel format
+    pygame.display.set_mode((1, 1), pygame.HIDDEN)
+    build_atlas()
+    pygame.quit()
@@ -1,9 +1,204 @@
 import pygame
 import os
-from typing import Dict, Optional
+import time
+import threading
+from typing import Dict, List, Optional
+from startup_profiler import profiler
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SOUNDS_DIR = os.path.join("assets", "sounds")
+# Generated placeholder tones are cached here, keyed by their parameters
+PLACEHOLDER_CACHE_DIR = os.path.join(SOUNDS_DIR, ".cache")
+
+SOUND_FILES = {
+    'player_attack': 'attack.wav',
+    'player_hurt': 'hurt.wav',
+    'enemy_death': 'enemy_death.wav',
+    'powerup_pickup': 'powerup.wav',
+    'wave_start': 'wave_start.wav',
+    'wave_complete': 'wave_complete.wav',
+    'game_over': 'game_over.wav',
+    'menu_select': 'menu_select.wav',
+    'menu_confirm': 'menu_confirm.wav',
+    'footstep': 'footstep.wav',
+    'sword_swing': 'sword_swing.wav',
+    'enemy_hit': 'enemy_hit.wav'
+}
+
+# Played within the first seconds of a run, so worth decoding before the game starts
+PREFETCH_SOUNDS = ['wave_start', 'player_attack', 'footstep', 'enemy_hit', 'enemy_death']
+
+def _placeholder_frequency(sound_name: str) -> int:
+    """Pick the placeholder beep pitch for a sound"""
+    if sound_name in ['player_attack', 'sword_swing']:
+        return 800  # Higher pitch for attacks
+    elif sound_name in ['player_hurt', 'enemy_hit']:
+        return 200  # Lower pitch for hits
+    elif sound_name in ['powerup_pickup', 'menu_select']:
+        return 600  # Medium pitch for pickups
+    elif sound_name in ['wave_start', 'wave_complete']:
+        return 400  # Medium-low pitch for events
+    return 500  # Default pitch
+
+class SoundBank:
+    """Registers sounds by name and decodes each one on first use (or on prefetch)"""
+    def __init__(self, volume: float = 0.7, cache_dir: str = PLACEHOLDER_CACHE_DIR):
+        self.volume = volume
+        self.cache_dir = cache_dir
+        self.sources: Dict[str, Dict] = {}
+        self.sounds: Dict[str, pygame.mixer.Sound] = {}
+        self.stats: Dict[str, Dict] = {}
+        self._failed = set()
+        self._lock = threading.RLock()
+
+    def register_file(self, name: str, filepath: str):
+        """Register a sound file; nothing is decoded yet"""
+        self.sources[name] = {'kind': 'file', 'path': filepath}
+
+    def register_placeholder(self, name: str, frequency: int, duration: float = 0.1, sample_rate: int = 44100):
+        """Register a generated beep for a sound that has no file"""
+        self.sources[name] = {'kind': 'placeholder', 'frequency': frequency,
+                              'duration': duration, 'sample_rate': sample_rate}
+
+    def get(self, name: str) -> Optional[pygame.mixer.Sound]:
+        """Get a decoded sound, decoding it now if needed"""
+        sound = self.sounds.get(name)
+        if sound is not None or name not in self.sources or name in self._failed:
+            return sound
+        with self._lock:
+            # Another thread may have decoded it while we waited
+            if name not in self.sounds and name not in self._failed:
+                self._decode(name)
+            return self.sounds.get(name)
+
+    def prefetch(self, names: List[str] = None):
+        """Decode sounds ahead of time (safe to call from a worker thread)"""
+        for name in (self.sources if names is None else names):
+            self.get(name)
+
+    def set_volume(self, volume: float):
+        """Set the volume of decoded sounds and of sounds decoded later"""
+        with self._lock:
+            self.volume = volume
+            for sound in self.sounds.values():
+                sound.set_volume(volume)
+
+    def _decode(self, name: str):
+        source = self.sources[name]
+        start = time.perf_counter()
+        with profiler.phase(f"sound {name}"):
+            if source['kind'] == 'file':
+                sound, origin = self._load_file(source['path']), 'file'
+            else:
+                sound, origin = self._load_placeholder(name, source)
+        if sound is None:
+            self._failed.add(name)
+            return
+
+        sound.set_volume(self.volume)
+        self.sounds[name] = sound
+        self.stats[name] = {
+            'source': origin,
+            'decode_ms': (time.perf_counter() - start) * 1000,
+            'bytes': self._sound_bytes(sound)
+        }
+
+    def _load_file(self, filepath: str) -> Optional[pygame.mixer.Sound]:
+        try:
+            return pygame.mixer.Sound(filepath)
+        except (pygame.error, OSError):
+            print(f"Failed to load sound: {filepath}")
+            return None
+
+    def _placeholder_cache_path(self, source: Dict) -> str:
+        frequency, duration, sample_rate = source['frequency'], source['duration'], source['sample_rate']
+        return os.path.join(self.cache_dir,
+                            f"placeholder_{frequency}hz_{int(duration * 1000)}ms_{sample_rate}.pcm")
+
+    def _load_placeholder(self, name: str, source: Dict):
+        """Build a placeholder beep, reusing cached PCM when available"""
+        cache_path = self._placeholder_cache_path(source)
+        try:
+            if np is None:
+                raise ImportError("numpy is not installed")
+
+            if os.path.exists(cache_path):
+                with open(cache_path, 'rb') as f:
+                    wave = np.frombuffer(f.read(), dtype=np.int16).reshape(-1, 2)
+                origin = 'cached placeholder'
+            else:
+                wave = self._generate_tone(source)
+                origin = 'placeholder'
+                try:
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    with open(cache_path, 'wb') as f:
+                        f.write(wave.tobytes())
+                except OSError as e:
+                    print(f"Could not cache placeholder sound {cache_path}: {e}")
+
+            return pygame.sndarray.make_sound(wave), origin
+
+        except ImportError:
+            # Fallback: create a simple silent sound
+            print(f"numpy not available, creating silent placeholder for {name}")
+        except Exception as e:
+            # Handle any other errors in sound creation
+            print(f"Error creating sound for {name}: {e}")
+
+        # Create a minimal silent sound (0.1 seconds of silence at 44.1kHz)
+        try:
+            sound = pygame.mixer.Sound(buffer=bytes(4410))
+            return sound, 'silent placeholder'
+        except pygame.error:
+            print(f"Could not create placeholder sound for {name}")
+            return None, None
+
+    def _generate_tone(self, source: Dict):
+        """Generate a 16-bit stereo sine beep"""
+        sample_rate = source['sample_rate']
+        duration = source['duration']
+        t = np.linspace(0, duration, int(sample_rate * duration))
+        wave = np.sin(2 * np.pi * source['frequency'] * t)
+        wave = (wave * 32767).astype(np.int16)
+        return np.ascontiguousarray(np.stack([wave, wave], axis=-1))  # Make stereo
+
+    def _sound_bytes(self, sound: pygame.mixer.Sound) -> int:
+        """Estimate the decoded PCM size from the mixer format"""
+        mixer = pygame.mixer.get_init()
+        if not mixer:
+            return 0
+        frequency, sample_format, channels = mixer
+        return int(sound.get_length() * frequency) * channels * (abs(sample_format) // 8)
+
+    def get_stats(self) -> Dict:
+        """Get decode time and memory for every decoded sound"""
+        with self._lock:
+            return {
+                'registered': len(self.sources),
+                'decoded': len(self.sounds),
+                'total_bytes': sum(entry['bytes'] for entry in self.stats.values()),
+                'total_decode_ms': sum(entry['decode_ms'] for entry in self.stats.values()),
+                'sounds': dict(self.stats)
+            }
+
+    def format_report(self) -> str:
+        """Build a human readable decode report"""
+        stats = self.get_stats()
+        lines = [f"Sound bank: {stats['decoded']}/{stats['registered']} decoded, "
+                 f"{stats['total_bytes'] / 1024:.1f} KB, {stats['total_decode_ms']:.1f} ms"]
+        for name, entry in sorted(stats['sounds'].items()):
+            lines.append(f"  {name:<16}{entry['decode_ms']:>8.2f} ms{entry['bytes'] / 1024:>10.1f} KB  ({entry['source']})")
+        never_played = sorted(set(self.sources) - set(stats['sounds']))
+        if never_played:
+            lines.append(f"  never decoded: {', '.join(never_played)}")
+        return "\n".join(lines)
 
 class AudioSystem:
-    def __init__(self):
+    def __init__(self, preload: bool = True):
         pygame.mixer.init()
         
         # Audio settings
@@ -12,117 +207,45 @@ class AudioSystem:
         self.sound_enabled = True
         self.music_enabled = True
         
-        # Sound effects dictionary
-        self.sounds = {}
+        # Sound effects are registered up front and decoded on first use
+        self.sound_bank = SoundBank(self.sfx_volume)
+        self.sounds = self.sound_bank.sounds  # Decoded sounds only
         
         # Background music
         self.current_music = None
         
-        # Initialize sounds
-        self._load_sounds()
+        self._register_sounds()
+        if preload:
+            self.sound_bank.prefetch()
         
-    def _load_sounds(self):
-        """Load all sound effects"""
+    def _register_sounds(self):
+        """Register all sound effects (cheap, nothing is decoded here)"""
         # Create sounds directory if it doesn't exist
-        sounds_dir = "assets/sounds"
-        if not os.path.exists(sounds_dir):
-            os.makedirs(sounds_dir)
-            print(f"Created sounds directory: {sounds_dir}")
+        if not os.path.exists(SOUNDS_DIR):
+            os.makedirs(SOUNDS_DIR)
+            print(f"Created sounds directory: {SOUNDS_DIR}")
             return
             
-        # Load sound effects
-        sound_files = {
-            'player_attack': 'attack.wav',
-            'player_hurt': 'hurt.wav',
-            'enemy_death': 'enemy_death.wav',
-            'powerup_pickup': 'powerup.wav',
-            'wave_start': 'wave_start.wav',
-            'wave_complete': 'wave_complete.wav',
-            'game_over': 'game_over.wav',
-            'menu_select': 'menu_select.wav',
-            'menu_confirm': 'menu_confirm.wav',
-            'footstep': 'footstep.wav',
-            'sword_swing': 'sword_swing.wav',
-            'enemy_hit': 'enemy_hit.wav'
-        }
-        
-        for sound_name, filename in sound_files.items():
-            filepath = os.path.join(sounds_dir, filename)
+        for sound_name, filename in SOUND_FILES.items():
+            filepath = os.path.join(SOUNDS_DIR, filename)
             if os.path.exists(filepath):
-                try:
-                    self.sounds[sound_name] = pygame.mixer.Sound(filepath)
-                    self.sounds[sound_name].set_volume(self.sfx_volume)
-                except:
-                    print(f"Failed to load sound: {filepath}")
-            else:
-                # Create placeholder sound
-                self._create_placeholder_sound(sound_name)
-                
-    def _create_placeholder_sound(self, sound_name: str):
-        """Create a placeholder sound effect"""
-        try:
-            # Try to use numpy for better sound generation
-            import numpy as np
-            
-            # Generate a simple beep sound
-            sample_rate = 44100
-            duration = 0.1  # 100ms
-            
-            if sound_name in ['player_attack', 'sword_swing']:
-                frequency = 800  # Higher pitch for attacks
-            elif sound_name in ['player_hurt', 'enemy_hit']:
-                frequency = 200  # Lower pitch for hits
-            elif sound_name in ['powerup_pickup', 'menu_select']:
-                frequency = 600  # Medium pitch for pickups
-            elif sound_name in ['wave_start', 'wave_complete']:
-                frequency = 400  # Medium-low pitch for events
+                self.sound_bank.register_file(sound_name, filepath)
             else:
-                frequency = 500  # Default pitch
-                
-            # Generate sine wave
-            t = np.linspace(0, duration, int(sample_rate * duration))
-            wave = np.sin(2 * np.pi * frequency * t)
-            
-            # Convert to 16-bit PCM - make it stereo (2D array)
-            wave = (wave * 32767).astype(np.int16)
-            if len(wave.shape) == 1:
-                wave = np.stack([wave, wave], axis=-1)  # Make stereo
-            
-            # Create pygame sound
-            sound = pygame.sndarray.make_sound(wave)
-            self.sounds[sound_name] = sound
-            self.sounds[sound_name].set_volume(self.sfx_volume)
-            
-        except ImportError:
-            # Fallback: create a simple silent sound
-            print(f"numpy not available, creating silent placeholder for {sound_name}")
-            # Create a minimal silent sound
-            silent_data = bytes([0] * 4410)  # 0.1 seconds of silence at 44.1kHz
-            try:
-                sound = pygame.mixer.Sound(buffer=silent_data)
-                self.sounds[sound_name] = sound
-                self.sounds[sound_name].set_volume(0)  # Make it silent
-            except:
-                # If even that fails, just skip this sound
-                print(f"Could not create placeholder sound for {sound_name}")
-        except Exception as e:
-            # Handle any other errors in sound creation
-            print(f"Error creating sound for {sound_name}: {e}")
-            # Create a silent placeholder
-            try:
-                silent_data = bytes([0] * 4410)
-                sound = pygame.mixer.Sound(buffer=silent_data)
-                self.sounds[sound_name] = sound
-                self.sounds[sound_name].set_volume(0)
-            except:
-                print(f"Could not create placeholder sound for {sound_name}")
+                # Use a generated placeholder beep
+                self.sound_bank.register_placeholder(sound_name, _placeholder_frequency(sound_name))
+
+    def prefetch_sounds(self, names: List[str] = None):
+        """Decode sounds before they are first played (worker thread friendly)"""
+        self.sound_bank.prefetch(PREFETCH_SOUNDS if names is None else names)
         
     def play_sound(self, sound_name: str, volume: Optional[float] = None):
         """Play a sound effect"""
-        if not self.sound_enabled or sound_name not in self.sounds:
+        if not self.sound_enabled:
             return
             
-        sound = self.sounds[sound_name]
+        sound = self.sound_bank.get(sound_name)
+        if sound is None:
+            return
         if volume is not None:
             original_volume = sound.get_volume()
             sound.set_volume(volume)
@@ -162,8 +285,7 @@ class AudioSystem:
     def set_sfx_volume(self, volume: float):
         """Set sound effects volume (0.0 to 1.0)"""
         self.sfx_volume = max(0.0, min(1.0, volume))
-        for sound in self.sounds.values():
-            sound.set_volume(self.sfx_volume)
+        self.sound_bank.set_volume(self.sfx_volume)
             
     def set_music_volume(self, volume: float):
         """Set music volume (0.0 to 1.0)"""
@@ -0,0 +1,76 @@
+import pygame
+from typing import Tuple
+
+class Camera:
+    """Viewport into the world that follows a target and stays inside the map.
+
+    rect is the simulated view in world coordinates (used for culling updates
+    and spawns). view_rect is the view being rendered: the same as rect, or
+    interpolated between the last two simulation steps. Both are updated in
+    place, so systems holding a reference always see the current view. A world
+    position maps to the screen at (x - camera.x, y - camera.y).
+    """
+    def __init__(self, view_width: int, view_height: int, world_width: int = None, world_height: int = None):
+        self.rect = pygame.Rect(0, 0, view_width, view_height)
+        self.view_rect = self.rect.copy()
+        self.world_rect = pygame.Rect(0, 0, world_width or view_width, world_height or view_height)
+        self.prev_topleft = self.rect.topleft
+        self.moved = False  # True if the last follow() scrolled the view
+        self.view_moved = False  # True if the last update_view() scrolled the rendered view
+        self.last_view_topleft = None  # Rendered view of the previous update_view()
+        self.view_delta = None  # How far the last update_view() scrolled, or None if unknown
+
+    @property
+    def x(self) -> int:
+        return self.view_rect.x
+
+    @property
+    def y(self) -> int:
+        return self.view_rect.y
+
+    def set_world_size(self, width: int, height: int):
+        """Set the map size the view is clamped to"""
+        self.world_rect.size = (width, height)
+        self._clamp()
+
+    def follow(self, target_rect: pygame.Rect):
+        """Center the view on a target, clamped to the map"""
+        old_topleft = self.rect.topleft
+        self.rect.center = target_rect.center
+        self._clamp()
+        self.moved = self.rect.topleft != old_topleft
+        self.view_rect.topleft = self.rect.topleft
+
+    def store_previous(self):
+        """Remember the view before a simulation step (for interpolation)"""
+        self.prev_topleft = self.rect.topleft
+
+    def update_view(self, alpha: float = 1.0):
+        """Place the rendered view between the previous and current step (alpha 0..1)"""
+        prev_x, prev_y = self.prev_topleft
+        self.view_rect.topleft = (round(prev_x + (self.rect.x - prev_x) * alpha),
+                                  round(prev_y + (self.rect.y - prev_y) * alpha))
+        last = self.last_view_topleft
+        self.view_moved = self.view_rect.topleft != last
+        self.view_delta = None if last is None else (self.view_rect.x - last[0], self.view_rect.y - last[1])
+        self.last_view_topleft = self.view_rect.topleft
+
+    def _clamp(self):
+        # A map smaller than the view stays at the top-left corner
+        world = self.world_rect
+        self.rect.x = max(world.left, min(self.rect.x, world.right - self.rect.width))
+        self.rect.y = max(world.top, min(self.rect.y, world.bottom - self.rect.height))
+
+    def apply(self, rect: pygame.Rect) -> pygame.Rect:
+        """Convert a world rect to screen coordinates"""
+        return rect.move(-self.view_rect.x, -self.view_rect.y)
+
+    def world_to_screen(self, pos: Tuple[float, float]) -> Tuple[float, float]:
+        return pos[0] - self.view_rect.x, pos[1] - self.view_rect.y
+
+    def screen_to_world(self, pos: Tuple[float, float]) -> Tuple[float, float]:
+        return pos[0] + self.view_rect.x, pos[1] + self.view_rect.y
+
+    def is_visible(self, rect: pygame.Rect) -> bool:
+        """Check whether a world rect intersects the view"""
+        return self.rect.colliderect(rect)
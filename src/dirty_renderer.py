@@ -0,0 +1,224 @@
+import pygame
+from typing import Callable, List, Optional
+
+class DirtyRectRenderer:
+    """Redraws and presents only the parts of the logic surface that changed.
+
+    The renderer keeps three full-size surfaces:
+      background - the map (static layers plus current animated tile frames)
+      world      - background plus this frame's sprites
+      hud_layer  - transparent HUD, re-rendered only when its signature changes
+    Each frame it restores the background under last frame's sprites, draws the
+    sprites, and composites world + HUD into the logic surface only inside the
+    dirty rects. If the dirty area is too large, it redraws the whole frame.
+    """
+    def __init__(self, scaler, full_redraw_threshold: float = 0.4, padding: int = 2):
+        self.scaler = scaler
+        self.full_redraw_threshold = full_redraw_threshold
+        self.padding = padding  # Hides seams when scaled regions are presented
+
+        size = scaler.get_logic_surface().get_size()
+        self.screen_rect = pygame.Rect((0, 0), size)
+        self.background = pygame.Surface(size).convert()
+        self.world = pygame.Surface(size).convert()
+        self.hud_layer = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+
+        self.prev_rects: List[pygame.Rect] = []
+        self.prev_hud_rects: List[pygame.Rect] = []
+        self.hud_signature = None
+        self.needs_full_redraw = True
+        self.pending_scroll = (0, 0)  # View movement since the last frame (world pixels)
+
+        # Stats
+        self.dirty_frames = 0
+        self.full_frames = 0
+        self.scrolled_frames = 0
+        self.last_dirty_fraction = 1.0
+
+    def invalidate(self):
+        """Force the next frame to rebuild everything (state change, map reload, ...)"""
+        self.needs_full_redraw = True
+        self.hud_signature = None
+
+    def scroll(self, dx: int, dy: int):
+        """Report that the view moved by (dx, dy) since the last frame"""
+        self.pending_scroll = (self.pending_scroll[0] + dx, self.pending_scroll[1] + dy)
+
+    def _apply_scroll(self) -> List[pygame.Rect]:
+        """Shift the cached background and world; returns the exposed strips to redraw"""
+        dx, dy = self.pending_scroll
+        self.pending_scroll = (0, 0)
+        width, height = self.screen_rect.size
+        if not dx and not dy:
+            return []
+        if self.needs_full_redraw or abs(dx) >= width or abs(dy) >= height:
+            self.needs_full_redraw = True
+            return []
+
+        self.background.scroll(-dx, -dy)
+        self.world.scroll(-dx, -dy)
+        # Last frame's sprites moved with the world; erase them where they are now
+        self.prev_rects = [rect for rect in (rect.move(-dx, -dy).clip(self.screen_rect) for rect in self.prev_rects)
+                           if rect.width and rect.height]
+        exposed = []
+        if dx > 0:
+            exposed.append(pygame.Rect(width - dx, 0, dx, height))
+        elif dx < 0:
+            exposed.append(pygame.Rect(0, 0, -dx, height))
+        if dy > 0:
+            exposed.append(pygame.Rect(0, height - dy, width, dy))
+        elif dy < 0:
+            exposed.append(pygame.Rect(0, 0, width, -dy))
+        return exposed
+
+    def render(self, draw_background: Callable, draw_world: Callable, draw_hud: Callable,
+               hud_signature=None, background_rects: Optional[List[pygame.Rect]] = None,
+               draw_foreground: Optional[Callable] = None, world_rects: Optional[List[pygame.Rect]] = None):
+        """Render and present one frame.
+
+        draw_background(surface, area) draws the map (only inside area, if given).
+        draw_world(surface) and draw_hud(surface) draw and return the rects they touched.
+        draw_foreground(surface, area), if given, draws map layers above the world.
+        background_rects are background areas that changed since the last frame.
+        world_rects, if known before drawing, are where draw_world will draw; they
+        are cleared first so a translucent foreground is not blended twice.
+        """
+        logic_surface = self.scaler.get_logic_surface()
+
+        exposed_rects = self._apply_scroll()
+        scrolled = bool(exposed_rects)
+        if scrolled:
+            background_rects = list(background_rects or ()) + exposed_rects
+
+        if self.needs_full_redraw:
+            draw_background(self.background, None)
+        else:
+            # Restore the background under last frame's sprites and changed tiles
+            for rect in background_rects or ():
+                rect = rect.clip(self.screen_rect)
+                if rect.width and rect.height:
+                    self.background.set_clip(rect)
+                    draw_background(self.background, rect)
+            self.background.set_clip(None)
+            restore_rects = self.prev_rects + list(background_rects or ())
+            if draw_foreground and world_rects:
+                restore_rects += self._clip_rects(world_rects)
+            for rect in restore_rects:
+                self.world.blit(self.background, rect, rect)
+
+        if self.needs_full_redraw:
+            self.world.blit(self.background, (0, 0))
+        cur_rects = self._clip_rects(draw_world(self.world))
+        if draw_foreground:
+            # Cover everything that was just restored or drawn
+            if self.needs_full_redraw:
+                draw_foreground(self.world, None)
+            else:
+                # Translucent foreground pixels must be blended exactly once
+                for rect in self._disjoint_rects(self.prev_rects + cur_rects + list(background_rects or ())):
+                    draw_foreground(self.world, rect)
+
+        # HUD
+        hud_rects = []
+        if self.needs_full_redraw or hud_signature is None or hud_signature != self.hud_signature:
+            self.hud_layer.fill((0, 0, 0, 0))
+            new_hud_rects = self._clip_rects(draw_hud(self.hud_layer))
+            hud_rects = self.prev_hud_rects + new_hud_rects
+            self.prev_hud_rects = new_hud_rects
+            self.hud_signature = hud_signature
+
+        dirty_rects = self._merge_rects(self.prev_rects + cur_rects + hud_rects + list(background_rects or ()))
+        self.prev_rects = cur_rects
+        dirty_area = sum(rect.width * rect.height for rect in dirty_rects)
+        self.last_dirty_fraction = dirty_area / float(self.screen_rect.width * self.screen_rect.height)
+
+        if self.needs_full_redraw or scrolled or self.last_dirty_fraction > self.full_redraw_threshold:
+            # Every pixel moved when scrolling, but only the exposed strips were redrawn
+            logic_surface.blit(self.world, (0, 0))
+            logic_surface.blit(self.hud_layer, (0, 0))
+            self.scaler.end_frame()
+            if scrolled:
+                self.scrolled_frames += 1
+            else:
+                self.full_frames += 1
+            self.needs_full_redraw = False
+            return
+
+        for rect in dirty_rects:
+            logic_surface.blit(self.world, rect, rect)
+            logic_surface.blit(self.hud_layer, rect, rect)
+        self.scaler.end_frame_rects(dirty_rects)
+        self.dirty_frames += 1
+
+    def _clip_rects(self, rects) -> List[pygame.Rect]:
+        """Pad rects and drop the parts outside the logic surface"""
+        clipped = []
+        for rect in rects:
+            if rect is None:
+                continue
+            rect = pygame.Rect(rect).inflate(self.padding * 2, self.padding * 2).clip(self.screen_rect)
+            if rect.width and rect.height:
+                clipped.append(rect)
+        return clipped
+
+    def _disjoint_rects(self, rects: List[pygame.Rect]) -> List[pygame.Rect]:
+        """Split rects into non-overlapping pieces covering the same area"""
+        disjoint: List[pygame.Rect] = []
+        for rect in rects:
+            pieces = [pygame.Rect(rect)]
+            for hit in rect.collidelistall(disjoint):
+                done = disjoint[hit]
+                remaining = []
+                for piece in pieces:
+                    if not piece.colliderect(done):
+                        remaining.append(piece)
+                        continue
+                    # Keep the parts of piece above, below, left and right of done
+                    top = max(piece.top, done.top)
+                    bottom = min(piece.bottom, done.bottom)
+                    if piece.top < done.top:
+                        remaining.append(pygame.Rect(piece.left, piece.top, piece.width, done.top - piece.top))
+                    if done.bottom < piece.bottom:
+                        remaining.append(pygame.Rect(piece.left, done.bottom, piece.width, piece.bottom - done.bottom))
+                    if piece.left < done.left:
+                        remaining.append(pygame.Rect(piece.left, top, done.left - piece.left, bottom - top))
+                    if done.right < piece.right:
+                        remaining.append(pygame.Rect(done.right, top, piece.right - done.right, bottom - top))
+                pieces = remaining
+            disjoint.extend(pieces)
+        return disjoint
+
+    def _merge_rects(self, rects: List[pygame.Rect]) -> List[pygame.Rect]:
+        """Union overlapping rects when that does not add much area.
+
+        Rects that stay separate may still overlap; compositing a region twice
+        is harmless, only the presented area grows.
+        """
+        merged: List[pygame.Rect] = []
+        for rect in rects:
+            rect = rect.clip(self.screen_rect)
+            if not rect.width or not rect.height:
+                continue
+            merging = True
+            while merging:
+                merging = False
+                for index, other in enumerate(merged):
+                    if not rect.colliderect(other):
+                        continue
+                    union = rect.union(other)
+                    if union.width * union.height <= rect.width * rect.height + other.width * other.height:
+                        rect = union
+                        merged.pop(index)
+                        merging = True
+                        break
+            merged.append(rect)
+        return merged
+
+    def get_stats(self) -> dict:
+        """Get how many frames were presented partially vs fully"""
+        return {
+            'dirty_frames': self.dirty_frames,
+            'full_frames': self.full_frames,
+            'scrolled_frames': self.scrolled_frames,
+            'last_dirty_fraction': self.last_dirty_fraction
+        }
@@ -2,26 +2,149 @@ import pygame
 import random
 import math
 import os
+from collections import deque
 from typing import List, Dict, Tuple
-from utils import LoadSprite, AnimationManager
+from utils import animation_library
 from health_system import HealthSystem, HealthBar
 from pygame.math import Vector2
 from map_loader import MapLoader
+from log_system import get_logger
+from render_cache import RotationCache, effect_variants
+from render_queue import RenderQueue, OVERLAY_DEPTH
+from spatial_hash import SpatialHash
 
+log = get_logger('waves')
+
+
+# Enemy archetype configurations, shared by every Enemy instance
+ENEMY_CONFIGS = {
+    'goblin': {
+        'health': 30,
+        'speed': 80,
+        'damage': 5,
+        'attack_range': 50,
+        'attack_cooldown': 1.0,
+        'sprite_path': os.path.join("assets", "Factions", "Goblins", "Troops", "Torch", "Red", "Torch_Red.png"),
+        'sprite_width': 192,
+        'sprite_height': 192,
+        'scale': 0.6
+    },
+    'archer': {
+        'health': 20,
+        'speed': 70,
+        'damage': 7,
+        'attack_range': 400,
+        'attack_cooldown': 2.0,
+        'sprite_path': os.path.join("assets", "Factions", "Knights", "Troops", "Archer", "Red", "Archer_Red.png"),
+        'sprite_width': 192,
+        'sprite_height': 192,
+        'scale': 0.6
+    },
+    'warrior': {
+        'health': 50,
+        'speed': 60,
+        'damage': 10,
+        'attack_range': 60,
+        'attack_cooldown': 1.5,
+        'sprite_path': os.path.join("assets", "Factions", "Knights", "Troops", "Warrior", "Red", "Warrior_Red.png"),
+        'sprite_width': 192,
+        'sprite_height': 192,
+        'scale': 0.6
+    }
+}
+
+ENEMY_ANIMATION_SPEEDS = {
+    'idle_animation_speed': 10,
+    'walk_animation_speed': 15,
+    'attack_animation_speed': 18
+}
+
+def _build_arrow_image() -> pygame.Surface:
+    """Draw the unrotated arrow (pointing right)"""
+    # Vẽ lại mũi tên với hình dạng đẹp hơn
+    arrow_w, arrow_h = 80, 16  # Giảm chiều cao để mũi tên mảnh hơn
+    image = pygame.Surface((arrow_w, arrow_h), pygame.SRCALPHA)
+    
+    # Bóng dưới mũi tên
+    shadow = pygame.Surface((arrow_w, 4), pygame.SRCALPHA)
+    pygame.draw.ellipse(shadow, (0,0,0,40), (10, arrow_h-4, arrow_w-20, 4))
+    image.blit(shadow, (0,0))
+    
+    # Thân mũi tên (gradient nâu-vàng)
+    for i in range(50):
+        # Gradient từ nâu sang vàng
+        color = (
+            139 + int(i*2),  # R tăng dần
+            69 + int(i*3),   # G tăng dần
+            19 + int(i*4)    # B tăng dần
+        )
+        pygame.draw.rect(image, color, (10+i, 6, 1, 4))
+    
+    # Đầu mũi tên (hình tam giác cân, màu xám đậm)
+    pygame.draw.polygon(image, (64,64,64), [(60,2),(arrow_w-2,arrow_h//2),(60,arrow_h-2)])
+    # Viền đầu mũi tên
+    pygame.draw.polygon(image, (32,32,32), [(60,2),(arrow_w-2,arrow_h//2),(60,arrow_h-2)], 1)
+    
+    # Đuôi lông vũ (3 lông vũ trắng)
+    feather_colors = [(255,255,255), (240,240,240), (220,220,220)]
+    for i in range(3):
+        y_offset = 2 + i * 2
+        pygame.draw.polygon(image, feather_colors[i], [(8,arrow_h//2),(2,y_offset),(2,arrow_h-y_offset)])
+    
+    # Thêm chi tiết lông vũ
+    pygame.draw.line(image, (200,200,200), (4,4), (8,arrow_h//2), 1)
+    pygame.draw.line(image, (200,200,200), (4,arrow_h-4), (8,arrow_h//2), 1)
+    pygame.draw.line(image, (180,180,180), (6,6), (8,arrow_h//2), 1)
+    pygame.draw.line(image, (180,180,180), (6,arrow_h-6), (8,arrow_h//2), 1)
+    return image
+
+_arrow_rotations = None
+_trail_stamps = None
+
+# Trail segments: 16x3 orange, alpha fades from 0 (oldest) to 80 (newest)
+TRAIL_SEGMENT_SIZE = (16, 3)
+TRAIL_MAX_ALPHA = 80
+# A trail point is recorded every 1/60 s, whatever the simulation rate
+TRAIL_INTERVAL = 1.0 / 60
+# Enemies overlapping each other are pushed apart at this speed (px/s)
+AVOID_PUSH_SPEED = 90
+# Spatial hash cell size; about one enemy sprite (192 * 0.6 px)
+ENEMY_HASH_CELL_SIZE = 128
+
+def get_trail_stamps() -> List[pygame.Surface]:
+    """Get one pre-filled trail segment per alpha value (index = alpha)"""
+    global _trail_stamps
+    if _trail_stamps is None:
+        _trail_stamps = []
+        for alpha in range(TRAIL_MAX_ALPHA + 1):
+            stamp = pygame.Surface(TRAIL_SEGMENT_SIZE, pygame.SRCALPHA)
+            stamp.fill((255, 180, 40, alpha))  # Màu cam nhạt thay vì vàng
+            _trail_stamps.append(stamp)
+    return _trail_stamps
+
+def get_arrow_rotations() -> RotationCache:
+    """Get the shared pre-rotated arrow images (built on first use)"""
+    global _arrow_rotations
+    if _arrow_rotations is None:
+        _arrow_rotations = RotationCache(_build_arrow_image(), buckets=64)
+    return _arrow_rotations
 
 class Arrow(pygame.sprite.Sprite):
-    def __init__(self, start_pos: Tuple[int, int], target_pos: Tuple[int, int], damage: int, speed: float = 200, player_velocity: Tuple[float, float] = (0, 0)):
+    def __init__(self, start_pos: Tuple[int, int], target_pos: Tuple[int, int], damage: int, speed: float = 200, player_velocity: Tuple[float, float] = (0, 0),
+                 collision_index=None):
         super().__init__()
         
         # Arrow properties
         self.damage = damage
         self.speed = speed
+        self.collision_index = collision_index  # Arrows break on map obstacles
         self.lifetime = 100.0  # Arrow disappears after 18 seconds (tăng 1.5 lần từ 12)
         self.lifetime_timer = 0.0
         
-        # Trail effect properties
-        self.trail_positions = []
+        # Trail effect properties (ring buffer, oldest position first)
         self.max_trail_length = 12  # Tăng trail cho đẹp
+        self.trail_positions = deque(maxlen=self.max_trail_length)
+        self.trail_timer = TRAIL_INTERVAL
         
         # Calculate direction to current target position (không dự đoán)
         dx = target_pos[0] - start_pos[0]
@@ -35,50 +158,13 @@ class Arrow(pygame.sprite.Sprite):
             self.direction_x = 0
             self.direction_y = 1
         
-        # Vẽ lại mũi tên với hình dạng đẹp hơn
-        arrow_w, arrow_h = 80, 16  # Giảm chiều cao để mũi tên mảnh hơn
-        self.image = pygame.Surface((arrow_w, arrow_h), pygame.SRCALPHA)
-        
-        # Bóng dưới mũi tên
-        shadow = pygame.Surface((arrow_w, 4), pygame.SRCALPHA)
-        pygame.draw.ellipse(shadow, (0,0,0,40), (10, arrow_h-4, arrow_w-20, 4))
-        self.image.blit(shadow, (0,0))
-        
-        # Thân mũi tên (gradient nâu-vàng)
-        for i in range(50):
-            # Gradient từ nâu sang vàng
-            color = (
-                139 + int(i*2),  # R tăng dần
-                69 + int(i*3),   # G tăng dần
-                19 + int(i*4)    # B tăng dần
-            )
-            pygame.draw.rect(self.image, color, (10+i, 6, 1, 4))
-        
-        # Đầu mũi tên (hình tam giác cân, màu xám đậm)
-        pygame.draw.polygon(self.image, (64,64,64), [(60,2),(arrow_w-2,arrow_h//2),(60,arrow_h-2)])
-        # Viền đầu mũi tên
-        pygame.draw.polygon(self.image, (32,32,32), [(60,2),(arrow_w-2,arrow_h//2),(60,arrow_h-2)], 1)
-        
-        # Đuôi lông vũ (3 lông vũ trắng)
-        feather_colors = [(255,255,255), (240,240,240), (220,220,220)]
-        for i in range(3):
-            y_offset = 2 + i * 2
-            pygame.draw.polygon(self.image, feather_colors[i], [(8,arrow_h//2),(2,y_offset),(2,arrow_h-y_offset)])
-        
-        # Thêm chi tiết lông vũ
-        pygame.draw.line(self.image, (200,200,200), (4,4), (8,arrow_h//2), 1)
-        pygame.draw.line(self.image, (200,200,200), (4,arrow_h-4), (8,arrow_h//2), 1)
-        pygame.draw.line(self.image, (180,180,180), (6,6), (8,arrow_h//2), 1)
-        pygame.draw.line(self.image, (180,180,180), (6,arrow_h-6), (8,arrow_h//2), 1)
-        self.rect = self.image.get_rect()
         # Position
-        self.rect.center = start_pos
         self.pos_x = float(start_pos[0])
         self.pos_y = float(start_pos[1])
-        # Calculate rotation angle
+        # Calculate rotation angle and pick the pre-rotated image
         self.angle = math.degrees(math.atan2(-dy, dx))
-        self.image = pygame.transform.rotate(self.image, self.angle)
-        self.rect = self.image.get_rect(center=self.rect.center)
+        self.image = get_arrow_rotations().get(self.angle)
+        self.rect = self.image.get_rect(center=start_pos)
         
     def update(self, dt: float):
         """Update arrow movement"""
@@ -88,10 +174,11 @@ class Arrow(pygame.sprite.Sprite):
             self.kill()
             return
         
-        # Store current position for trail
-        self.trail_positions.append((int(self.pos_x), int(self.pos_y)))
-        if len(self.trail_positions) > self.max_trail_length:
-            self.trail_positions.pop(0)
+        # Store current position for trail (the deque drops the oldest)
+        self.trail_timer += dt
+        if self.trail_timer >= TRAIL_INTERVAL:
+            self.trail_timer %= TRAIL_INTERVAL
+            self.trail_positions.append((int(self.pos_x), int(self.pos_y)))
         
         # Move arrow
         self.pos_x += self.direction_x * self.speed * dt
@@ -99,68 +186,63 @@ class Arrow(pygame.sprite.Sprite):
         
         # Update rect
         self.rect.center = (int(self.pos_x), int(self.pos_y))
+
+        # Test the shaft's center only, so an archer standing at a wall can still shoot away from it
+        if self.collision_index is not None and self.collision_index.collides(pygame.Rect(self.rect.center, (1, 1))):
+            self.kill()
         
-    def draw(self, surface: pygame.Surface):
-        """Draw the arrow with trail effect"""
-        # Draw trail với hiệu ứng mờ dần (không còn vạch ngang rõ ràng)
-        for i, pos in enumerate(self.trail_positions):
-            # Alpha giảm dần từ đầu đến cuối trail
-            alpha = int(80 * (i / len(self.trail_positions)))
+    def queue_draw(self, queue: RenderQueue):
+        """Queue the trail and arrow at the arrow's depth, reported as one rect"""
+        bounds = self.get_draw_bounds()
+        if not queue.is_visible(bounds):
+            return
+        blit_sequence = []
+        self.add_trail_blits(blit_sequence)
+        blit_sequence.append((self.image, queue.interpolated_topleft(self)))
+        queue.add_blits(blit_sequence, self.rect.bottom)
+        queue.add_dirty_rect(bounds)
+
+    def get_draw_bounds(self) -> pygame.Rect:
+        """Get the area covered by the arrow and its trail"""
+        bounds = self.rect.copy()
+        if self.trail_positions:
+            xs = [x for x, _ in self.trail_positions]
+            ys = [y for _, y in self.trail_positions]
+            left = min(xs) - TRAIL_SEGMENT_SIZE[0] // 2
+            top = min(ys) - TRAIL_SEGMENT_SIZE[1] // 2
+            bounds.union_ip(pygame.Rect(left, top, max(xs) - min(xs) + TRAIL_SEGMENT_SIZE[0],
+                                        max(ys) - min(ys) + TRAIL_SEGMENT_SIZE[1]))
+        return bounds
+
+    def add_trail_blits(self, blit_sequence: List) -> int:
+        """Append (stamp, position) pairs for the trail; returns how many were added"""
+        # Trail mờ dần (không còn vạch ngang rõ ràng): alpha tăng từ cuối lên đầu
+        stamps = get_trail_stamps()
+        length = len(self.trail_positions)
+        half_w = TRAIL_SEGMENT_SIZE[0] // 2
+        half_h = TRAIL_SEGMENT_SIZE[1] // 2
+        added = 0
+        for i, (x, y) in enumerate(self.trail_positions):
+            alpha = int(TRAIL_MAX_ALPHA * (i / length))
             if alpha > 5:  # Chỉ vẽ nếu đủ sáng
-                # Trail nhỏ hơn và mờ hơn
-                trail_surface = pygame.Surface((16, 3), pygame.SRCALPHA)
-                trail_surface.fill((255, 180, 40, alpha))  # Màu cam nhạt thay vì vàng
-                trail_rect = trail_surface.get_rect(center=pos)
-                surface.blit(trail_surface, trail_rect)
-        
-        # Draw main arrow
-        surface.blit(self.image, self.rect)
+                blit_sequence.append((stamps[alpha], (x - half_w, y - half_h)))
+                added += 1
+        return added
 
 class Enemy(pygame.sprite.Sprite):
-    def __init__(self, enemy_type: str, pos: Tuple[int, int], player_ref,  all_enemies_group=None, collision_sprites=None):
+    def __init__(self, enemy_type: str, pos: Tuple[int, int], player_ref,  all_enemies_group=None, collision_sprites=None,
+                 spatial_hash=None, collision_index=None):
         super().__init__()
         self.enemy_type = enemy_type
         self.player_ref = player_ref
         self.all_enemies = all_enemies_group
+        # Neighbor lookup for separation (WaveManager's hash of all enemies)
+        self.spatial_hash = spatial_hash
         # Enemy configurations
-        self.configs = {
-            'goblin': {
-                'health': 30,
-                'speed': 80,
-                'damage': 5,
-                'attack_range': 50,
-                'attack_cooldown': 1.0,
-                'sprite_path': os.path.join("assets", "Factions", "Goblins", "Troops", "Torch", "Red", "Torch_Red.png"),
-                'sprite_width': 192,
-                'sprite_height': 192,
-                'scale': 0.6
-            },
-            'archer': {
-                'health': 20,
-                'speed': 70,
-                'damage': 7,
-                'attack_range': 400,
-                'attack_cooldown': 2.0,
-                'sprite_path': os.path.join("assets", "Factions", "Knights", "Troops", "Archer", "Red", "Archer_Red.png"),
-                'sprite_width': 192,
-                'sprite_height': 192,
-                'scale': 0.6
-            },
-            'warrior': {
-                'health': 50,
-                'speed': 60,
-                'damage': 10,
-                'attack_range': 60,
-                'attack_cooldown': 1.5,
-                'sprite_path': os.path.join("assets", "Factions", "Knights", "Troops", "Warrior", "Red", "Warrior_Red.png"),
-                'sprite_width': 192,
-                'sprite_height': 192,
-                'scale': 0.6
-            }
-        }
-        
+        self.configs = ENEMY_CONFIGS
         self.config = self.configs[enemy_type]
         self.collision_sprites = collision_sprites
+        self.collision_index = collision_index  # Broadphase over collision_sprites (map's CollisionIndex)
         # Initialize systems
         self._init_sprite_system()
         self._init_health_system()
@@ -192,28 +274,18 @@ class Enemy(pygame.sprite.Sprite):
         self.death_timer = 0.0
         self.death_duration = 1.0  # 1 second death animation
         self.original_image = None
-        self.death_rotation = 0.0
-        self.death_scale = 1.0
-        self.death_alpha = 255
         
     def _init_sprite_system(self):
         """Initialize sprite and animation system"""
-        sprite_loader = LoadSprite(self.config['sprite_path'])
-        animations = sprite_loader.get_all_animations_player(
+        # Frames are sliced once per archetype and shared by every enemy
+        self.animation_manager = animation_library.create_manager(
+            self.config['sprite_path'],
+            ENEMY_ANIMATION_SPEEDS,
             sprite_width=self.config['sprite_width'],
             sprite_height=self.config['sprite_height'],
             scale=self.config['scale']
         )
         
-        animation_speeds = {
-            'idle_animation_speed': 10,
-            'walk_animation_speed': 15,
-            'attack_animation_speed': 18
-        }
-        
-        self.animation_manager = AnimationManager(animations, animation_speeds)
-        self.animation_manager.create_directional_idle_animations()
-        
         # Set initial image
         self.image = self.animation_manager._get_current_frame()
         self.rect = self.image.get_rect()
@@ -234,29 +306,39 @@ class Enemy(pygame.sprite.Sprite):
         """Handle enemy death"""
         self.state = 'dead'
         self.death_timer = 0.0
-        # Store original image for death animation
-        self.original_image = self.image.copy()
+        # Death frames are baked from the current (shared) animation frame
+        self.original_image = self.image
         
     def take_damage(self, damage: int) -> bool:
         """Take damage from player"""
         return self.health_system.take_damage(damage)
     
-    def _avoid_others(self):
+    def _avoid_others(self, dt: float):
         """Đẩy enemy ra xa các enemy khác nếu bị đè lên nhau"""
-        if not self.all_enemies:
+        if self.spatial_hash is not None:
+            others = self.spatial_hash.query_rect(self.rect)
+        elif self.all_enemies:
+            others = self.all_enemies
+        else:
             return
 
-        for other in self.all_enemies:
-            if other == self or other.state == 'dead':
+        push = AVOID_PUSH_SPEED * dt  # lực đẩy nhẹ
+        for other in others:
+            if other is self or other.state == 'dead':
                 continue
 
             if self.rect.colliderect(other.rect):
-                offset = Vector2(self.rect.center) - Vector2(other.rect.center)
-                if offset.length() == 0:
-                    offset = Vector2(random.uniform(-1, 1), random.uniform(-1, 1))  # tránh chia 0
-                offset = offset.normalize() * 1.5  # lực đẩy nhẹ
-                self.pos_x += offset.x
-                self.pos_y += offset.y
+                center_x, center_y = self.rect.center
+                other_x, other_y = other.rect.center
+                offset_x = center_x - other_x
+                offset_y = center_y - other_y
+                if offset_x == 0 and offset_y == 0:
+                    offset_x, offset_y = random.uniform(-1, 1), random.uniform(-1, 1)  # tránh chia 0
+                length = math.hypot(offset_x, offset_y)
+                if length == 0:
+                    continue
+                self.pos_x += offset_x / length * push
+                self.pos_y += offset_y / length * push
                 self.rect.x = int(self.pos_x)
                 self.rect.y = int(self.pos_y)
 
@@ -280,7 +362,7 @@ class Enemy(pygame.sprite.Sprite):
         # Update AI
         self._update_ai(dt)
 
-        self._avoid_others()
+        self._avoid_others(dt)
 
         # Update animation
         self._update_animation(dt)
@@ -310,29 +392,11 @@ class Enemy(pygame.sprite.Sprite):
             self.kill()
             return
             
-        # Calculate death effects
-        self.death_rotation = progress * 360  # Full rotation
-        self.death_scale = 1.0 - progress * 0.5  # Scale down to 50%
-        self.death_alpha = int(255 * (1.0 - progress))  # Fade out
-        
-        # Apply effects to image
+        # Rotated/scaled/faded frames (full turn, down to 50%) are precomputed per progress bucket
         if self.original_image:
-            # Rotate
-            rotated = pygame.transform.rotate(self.original_image, self.death_rotation)
-            
-            # Scale
-            new_width = int(rotated.get_width() * self.death_scale)
-            new_height = int(rotated.get_height() * self.death_scale)
-            if new_width > 0 and new_height > 0:
-                scaled = pygame.transform.scale(rotated, (new_width, new_height))
-                
-                # Apply alpha
-                if self.death_alpha < 255:
-                    alpha_surface = pygame.Surface(scaled.get_size(), pygame.SRCALPHA)
-                    alpha_surface.fill((255, 255, 255, self.death_alpha))
-                    scaled.blit(alpha_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
-                
-                self.image = scaled
+            death_frame = effect_variants.get_death_frame(self.original_image, progress)
+            if death_frame is not None:
+                self.image = death_frame
                 # Update rect to center the scaled image
                 old_center = self.rect.center
                 self.rect = self.image.get_rect()
@@ -417,7 +481,10 @@ class Enemy(pygame.sprite.Sprite):
             self.is_moving = False
 
     def check_collision(self, direction):
-        hits = pygame.sprite.spritecollide(self, self.collision_sprites, False)
+        if self.collision_index is not None:
+            hits = self.collision_index.query(self.rect)
+        else:
+            hits = pygame.sprite.spritecollide(self, self.collision_sprites, False)
         if direction == 'horizontal':
             for sprite in hits:
                 if self.rect.right >= sprite.rect.left and self.old_rect.right <= sprite.rect.left:
@@ -489,7 +556,8 @@ class Enemy(pygame.sprite.Sprite):
             target_pos=(target_x, target_y),
             damage=self.config['damage'],
             speed=200,  # Giảm tốc độ từ 350 xuống 200
-            player_velocity=(0, 0)  # Không dùng prediction
+            player_velocity=(0, 0),  # Không dùng prediction
+            collision_index=self.collision_index
         )
         
         # Add arrow to group
@@ -533,29 +601,28 @@ class Enemy(pygame.sprite.Sprite):
                 dt, False, 0, self.is_moving, self.direction, self.direction, False
             )
             
-    def draw_health_bar(self, surface: pygame.Surface):
-        """Draw health bar above enemy"""
+    def get_health_bar_blit(self, topleft=None):
+        """Get (image, position) of the health bar above the enemy (drawn at topleft), or None when dead"""
         if self.health_system.is_alive() and self.state != 'dead':
-            bar_x = self.rect.centerx - self.health_bar.width // 2
-            bar_y = self.rect.top - 20
-            self.health_bar.draw(surface, self.health_system, (bar_x, bar_y))
-    
-    def draw_arrows(self, surface: pygame.Surface):
-        """Draw arrows if archer"""
-        if self.is_archer:
-            for arrow in self.arrows:
-                arrow.draw(surface)
+            x, y = topleft if topleft is not None else self.rect.topleft
+            bar_x = x + self.rect.width // 2 - self.health_bar.width // 2
+            bar_y = y - 20
+            return self.health_bar.get_blit(self.health_system, (bar_x, bar_y))
+        return None
 
 
     
 
 class WaveManager:
-    def __init__(self, player_ref, collision_sprites=None):
+    def __init__(self, player_ref, collision_sprites=None, collision_index=None):
         self.player_ref = player_ref
         self.collision_sprites = collision_sprites or pygame.sprite.Group()
+        self.collision_index = collision_index
 
         self.current_wave = 0
         self.enemies = pygame.sprite.Group()
+        # Rebuilt every update after enemies move; used for separation and hit tests
+        self.enemy_hash = SpatialHash(ENEMY_HASH_CELL_SIZE)
         self.enemy_types = ['goblin', 'archer', 'warrior']
         
         # Wave configuration
@@ -579,7 +646,7 @@ class WaveManager:
         self.wave_transition_timer = 0.0
         self.wave_transition_duration = 3.0  # 3 seconds between waves
         self.wave_completed = False
-         # Camera view (giả sử logic 1280x720, có thể lấy từ Game nếu cần)
+        # Camera view in world coordinates (Game shares its Camera.rect here)
         self.camera_rect = pygame.Rect(0, 0, 1280, 720)
         
         
@@ -601,7 +668,7 @@ class WaveManager:
         self.enemies_spawned = 0
         self.spawn_timer = 0.0
         
-        print(f"Starting wave {self.current_wave} with {self.enemies_to_spawn} enemies")
+        log.debug("Starting wave %s with %s enemies", self.current_wave, self.enemies_to_spawn)
         
     def update(self, dt: float, camera_rect=None):
         """Update wave manager"""
@@ -631,6 +698,7 @@ class WaveManager:
                 # Update arrows even if enemy is off-screen (for long-range arrows)
                 if enemy.is_archer:
                     enemy.arrows.update(dt)
+        self.enemy_hash.build(self.enemies)
         
         # Check arrow collisions with player
         self._check_arrow_collisions()
@@ -641,15 +709,15 @@ class WaveManager:
                 self.wave_in_progress = False
                 self.wave_completed = True
                 self.wave_transition_timer = 0.0
-                print(f"Wave {self.current_wave} completed! Next wave in {self.wave_transition_duration} seconds...")
+                log.debug("Wave %s completed! Next wave in %s seconds...", self.current_wave, self.wave_transition_duration)
                 
     def _spawn_enemy(self):
         """Spawn a new enemy"""
         if not self.player_ref:
             return
             
-        # Get spawn position around player
-        spawn_rect = pygame.Rect(200, 200, 900, 400)  # ví dụ: mép phải màn hình
+        # Get spawn position inside the current view
+        spawn_rect = pygame.Rect(200, 200, 900, 400).move(self.camera_rect.topleft)  # Spawn area relative to the view, not the map origin
 
         spawn_x = random.uniform(spawn_rect.left, spawn_rect.right)
         spawn_y = random.uniform(spawn_rect.top, spawn_rect.bottom)
@@ -664,25 +732,33 @@ class WaveManager:
             enemy_type = random.choices(self.enemy_types, weights=weights)[0]
            
         # Create enemy
-        enemy = Enemy(enemy_type, (spawn_x, spawn_y), self.player_ref,  all_enemies_group=self.enemies, collision_sprites=self.player_ref.collision_sprites)
+        enemy = Enemy(enemy_type, (spawn_x, spawn_y), self.player_ref,  all_enemies_group=self.enemies, collision_sprites=self.player_ref.collision_sprites,
+                      spatial_hash=self.enemy_hash, collision_index=self.collision_index)
 
         self.enemies.add(enemy)
         self.enemies_spawned += 1
     
     def draw(self, surface: pygame.Surface, camera_rect=None):
-        """Draw all enemies and their health bars (only if visible)"""
+        """Draw all enemies and their health bars (only if visible); returns the rects drawn"""
+        queue = RenderQueue()
+        self.queue_draw(queue, camera_rect)
+        return queue.flush(surface)
+
+    def queue_draw(self, queue: RenderQueue, camera_rect=None):
+        """Queue visible enemies, their health bars and all arrows (the queue culls bars and arrows)"""
         if camera_rect is None:
             camera_rect = self.camera_rect
         
-        # Draw enemies and their arrows
         for enemy in self.enemies:
             if camera_rect.colliderect(enemy.rect):
-                surface.blit(enemy.image, enemy.rect)
-                enemy.draw_health_bar(surface)
-                enemy.draw_arrows(surface)
-            else:
-                # Draw arrows even if enemy is off-screen (for long-range arrows)
-                enemy.draw_arrows(surface)
+                queue.add_sprite(enemy)
+                bar_blit = enemy.get_health_bar_blit(queue.interpolated_topleft(enemy))
+                if bar_blit:
+                    queue.add(bar_blit[0], bar_blit[1], OVERLAY_DEPTH)
+            # Arrows are drawn even if the archer is off-screen (long-range arrows)
+            if enemy.is_archer:
+                for arrow in enemy.arrows:
+                    arrow.queue_draw(queue)
             
     def get_enemy_count(self) -> int:
         """Get current number of enemies"""
@@ -691,10 +767,15 @@ class WaveManager:
     def clear_enemies(self):
         """Clear all enemies"""
         self.enemies.empty()
+        self.enemy_hash.clear()
         self.wave_in_progress = False
         self.wave_completed = False
         self.wave_transition_timer = 0.0
         
+    def get_enemies_in_rect(self, rect: pygame.Rect) -> List['Enemy']:
+        """Get the enemies overlapping a world rect (as of the last update)"""
+        return self.enemy_hash.query_rect(rect)
+
     def get_wave_transition_progress(self) -> float:
         """Get progress of wave transition (0.0 to 1.0)"""
         if not self.wave_completed:
@@ -56,6 +56,9 @@ class HealthSystem:
         self.is_invulnerable = False
         self.invulnerability_time = 0.0
 
+# Bar images shared by every HealthBar with the same look, keyed by filled width
+_bar_images = {}
+
 class HealthBar:
     def __init__(self, width: int = 100, height: int = 10, border_width: int = 2):
         self.width = width
@@ -68,23 +71,37 @@ class HealthBar:
         self.health_color = (0, 255, 0)
         self.low_health_color = (255, 0, 0)
         
-    def draw(self, surface: pygame.Surface, health_system: HealthSystem, position: tuple):
-        """Draw health bar at given position"""
+    def get_image(self, percentage: float) -> pygame.Surface:
+        """Get the bar image (border included) for a health percentage.
+
+        Percentages are quantized to the filled width in pixels, so each
+        distinct bar is drawn once and shared.
+        """
+        health_width = max(0, int(self.width * percentage))
+        # Change color based on health percentage
+        color = self.low_health_color if percentage < 0.3 else self.health_color
+        key = (self.width, self.height, self.border_width, health_width, color,
+               self.border_color, self.background_color)
+        image = _bar_images.get(key)
+        if image is None:
+            border = self.border_width
+            image = pygame.Surface((self.width + border * 2, self.height + border * 2))
+            image.fill(self.border_color)
+            image.fill(self.background_color, (border, border, self.width, self.height))
+            if health_width > 0:
+                image.fill(color, (border, border, health_width, self.height))
+            if pygame.display.get_surface() is not None:
+                image = image.convert()
+            _bar_images[key] = image
+        return image
+
+    def get_blit(self, health_system: HealthSystem, position: tuple):
+        """Get (image, top-left) for a bar whose inner area starts at position"""
         x, y = position
-        
-        # Draw border
-        pygame.draw.rect(surface, self.border_color, 
-                        (x - self.border_width, y - self.border_width, 
-                         self.width + self.border_width * 2, 
-                         self.height + self.border_width * 2))
-        
-        # Draw background
-        pygame.draw.rect(surface, self.background_color, 
-                        (x, y, self.width, self.height))
-        
-        # Draw health
-        health_width = int(self.width * health_system.get_health_percentage())
-        if health_width > 0:
-            # Change color based on health percentage
-            color = self.low_health_color if health_system.get_health_percentage() < 0.3 else self.health_color
-            pygame.draw.rect(surface, color, (x, y, health_width, self.height)) 
\ No newline at end of file
+        return (self.get_image(health_system.get_health_percentage()),
+                (x - self.border_width, y - self.border_width))
+
+    def draw(self, surface: pygame.Surface, health_system: HealthSystem, position: tuple):
+        """Draw health bar at given position; returns the area it covers"""
+        image, dest = self.get_blit(health_system, position)
+        return surface.blit(image, dest) 
\ No newline at end of file
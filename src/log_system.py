@@ -0,0 +1,156 @@
+import os
+import sys
+import time
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+# Leveled logging for game subsystems.
+#
+#     from log_system import get_logger
+#     log = get_logger('combat')
+#     log.debug("Attack executed in direction: %s", direction)
+#
+# Messages are formatted only when they are emitted. A disabled level's method
+# is rebound to a no-op, so a filtered call costs one attribute lookup. Guard
+# expensive arguments with the matching flag (`if log.debug_enabled:`).
+#
+# Levels come from TSS_LOG, e.g. TSS_LOG=debug or TSS_LOG=info,combat=debug.
+# The last records are kept in a ring buffer that the game dumps on a crash.
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: 'DEBUG', INFO: 'INFO', WARNING: 'WARNING', ERROR: 'ERROR'}
+LEVELS = {name.lower(): level for level, name in LEVEL_NAMES.items()}
+LOG_ENV = "TSS_LOG"
+DEFAULT_LEVEL = INFO
+RING_BUFFER_SIZE = 500
+
+def _noop(*args, **kwargs):
+    pass
+
+class Logger:
+    """Logger for one subsystem; disabled levels are no-op methods"""
+    def __init__(self, manager: 'LogManager', name: str, level: int):
+        self.manager = manager
+        self.name = name
+        self.set_level(level)
+
+    def set_level(self, level: int):
+        """Change the level and rebind the level methods"""
+        self.level = level
+        for method_level, level_name in LEVEL_NAMES.items():
+            method_name = level_name.lower()
+            enabled = method_level >= level
+            setattr(self, method_name + '_enabled', enabled)
+            if enabled:
+                setattr(self, method_name, self._make_emitter(method_level))
+            else:
+                setattr(self, method_name, _noop)
+
+    def _make_emitter(self, level: int):
+        manager = self.manager
+        name = self.name
+
+        def emit(message, *args):
+            manager.emit(name, level, message, args)
+        return emit
+
+class LogManager:
+    """Owns per-subsystem loggers, the console sink and the ring buffer"""
+    def __init__(self, ring_size: int = RING_BUFFER_SIZE):
+        self.default_level = DEFAULT_LEVEL
+        self.subsystem_levels: Dict[str, int] = {}
+        self.loggers: Dict[str, Logger] = {}
+        self.console = True
+        # (timestamp, thread, subsystem, level, message, args); formatted when dumped
+        self.ring_buffer = deque(maxlen=ring_size)
+        self._lock = threading.Lock()
+
+    def get_logger(self, name: str) -> Logger:
+        """Get (or create) the logger for a subsystem"""
+        with self._lock:
+            logger = self.loggers.get(name)
+            if logger is None:
+                logger = Logger(self, name, self.subsystem_levels.get(name, self.default_level))
+                self.loggers[name] = logger
+            return logger
+
+    def configure(self, spec: str = None, environ: Dict[str, str] = None):
+        """Apply a level spec such as "info,combat=debug" (defaults to TSS_LOG)"""
+        if spec is None:
+            spec = (os.environ if environ is None else environ).get(LOG_ENV, "")
+        for part in spec.split(','):
+            part = part.strip().lower()
+            if not part:
+                continue
+            if '=' in part:
+                name, level_name = (item.strip() for item in part.split('=', 1))
+            else:
+                name, level_name = None, part
+            level = LEVELS.get(level_name)
+            if level is None:
+                print(f"Unknown log level '{level_name}' in {LOG_ENV}")
+                continue
+            self.set_level(level, name)
+
+    def set_level(self, level: int, name: str = None):
+        """Set the level of one subsystem, or the default for all of them"""
+        with self._lock:
+            if name is None:
+                self.default_level = level
+                for logger_name, logger in self.loggers.items():
+                    if logger_name not in self.subsystem_levels:
+                        logger.set_level(level)
+            else:
+                self.subsystem_levels[name] = level
+                if name in self.loggers:
+                    self.loggers[name].set_level(level)
+
+    def emit(self, name: str, level: int, message: str, args: tuple):
+        """Record an enabled message and print it to the console"""
+        record = (time.time(), threading.current_thread().name, name, level, message, args)
+        self.ring_buffer.append(record)
+        if self.console:
+            print(self.format_record(record, with_time=False))
+
+    def format_record(self, record, with_time: bool = True) -> str:
+        timestamp, thread_name, name, level, message, args = record
+        try:
+            text = message % args if args else str(message)
+        except (TypeError, ValueError):
+            text = f"{message} {args}"
+        prefix = f"[{name}] " if level < WARNING else f"[{name}] {LEVEL_NAMES[level]}: "
+        if with_time:
+            clock = time.strftime("%H:%M:%S", time.localtime(timestamp))
+            return f"{clock}.{int(timestamp * 1000) % 1000:03d} {thread_name} {prefix}{text}"
+        return prefix + text
+
+    def recent_records(self) -> List[str]:
+        """Format the records currently held in the ring buffer"""
+        return [self.format_record(record) for record in list(self.ring_buffer)]
+
+    def dump(self, path: str = None, reason: str = None) -> Optional[str]:
+        """Write the ring buffer to a file (default logs/crash-<time>.log)"""
+        path = path or os.path.join("logs", "crash-" + time.strftime("%Y%m%d-%H%M%S") + ".log")
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                if reason:
+                    f.write(reason.rstrip() + "\n\n")
+                f.write("\n".join(self.recent_records()) + "\n")
+        except OSError as e:
+            print(f"Could not write log dump {path}: {e}", file=sys.stderr)
+            return None
+        return path
+
+# Shared by every subsystem
+log_manager = LogManager()
+log_manager.configure()
+
+def get_logger(name: str) -> Logger:
+    """Get the logger for a subsystem"""
+    return log_manager.get_logger(name)
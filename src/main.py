@@ -1,26 +1,54 @@
-import pygame
-from settings import *
-from player import Player
-from map_loader import MapLoader
-from enemy_system import WaveManager, Enemy
-from powerup_system import PowerUpManager
-from audio_system import AudioSystem
-from ui_system import Menu, HUD, GameOverScreen, LeaderboardScreen
-from leaderboard_system import LeaderboardSystem
-import os
-import math
-from resolutionscaler import ResolutionScalerFullScreenStretch
+from startup_profiler import profiler
+profiler.configure()
+
+with profiler.phase('imports'):
+    import pygame
+    from settings import *
+    from player import Player, PLAYER_SPRITE_PATH, PLAYER_SPRITE_SCALE
+    from map_loader import MapLoader
+    from enemy_system import WaveManager, Enemy, ENEMY_CONFIGS
+    from powerup_system import PowerUpManager, powerup_registry
+    from utils import animation_library
+    from asset_pipeline import AssetPipeline
+    from dirty_renderer import DirtyRectRenderer
+    from render_queue import RenderQueue
+    from camera import Camera
+    from audio_system import AudioSystem
+    from ui_system import Menu, HUD, GameOverScreen, LeaderboardScreen, get_dim_overlay
+    from text_cache import fonts, text_cache
+    from leaderboard_system import LeaderboardSystem
+    from log_system import log_manager, get_logger
+    import traceback
+    import os
+    import sys
+    import math
+    import time
+    from resolutionscaler import ResolutionScalerFullScreenStretch
 
 class Game:
     def __init__(self):
-        pygame.init()
+        with profiler.phase('game_init'):
+            self._init_systems()
+
+    def _init_systems(self):
+        """Create the window and everything needed for the first frame"""
+        with profiler.phase('pygame.init'):
+            pygame.init()
 
         # Set fixed logic dimensions
         self.logic_width = 1280
         self.logic_height = 720
 
-        self.scaler = ResolutionScalerFullScreenStretch(self.logic_width, self.logic_height)
-        self.screen = self.scaler.get_logic_surface()  
+        with profiler.phase('scaler'):
+            self.scaler = ResolutionScalerFullScreenStretch(self.logic_width, self.logic_height)
+        self.screen = self.scaler.get_logic_surface()
+        # Follows the player; world size is set once the map is loaded
+        self.camera = Camera(self.logic_width, self.logic_height)
+
+        # Optional dirty-rect rendering for gameplay frames
+        self.dirty_renderer = None
+        if DIRTY_RECTS or '--dirty-rects' in sys.argv or os.environ.get('TSS_DIRTY_RECTS') == '1':
+            self.dirty_renderer = DirtyRectRenderer(self.scaler)
 
         pygame.display.set_caption("Tiny Sword Survival")
         self.clock = pygame.time.Clock()
@@ -29,53 +57,128 @@ class Game:
         # Game state
         self.game_state = 'menu'  # 'menu', 'playing', 'paused', 'game_over', 'leaderboard'
         
-        # Initialize systems
-        self.setup_audio()
-        self.setup_leaderboard()
-        self.setup_map()
-        self.setup_sprites()
-        self.setup_ui()
+        # Systems that depend on loaded assets are created in finish_loading()
+        self.assets_ready = False
+        self.map_loader = None
+        self.player = None
+        self.hud = None
+
+        # Snapshot of the world shown behind menus, taken once per visit
+        self.freeze_frame = None
+        self.freeze_frame_dimmed = None
+        self.freeze_frame_valid = False
+        self.freeze_frame_dimmed_valid = False
+
+        # Initialize systems needed for the first frame; heavy loading runs in the background
+        with profiler.phase('audio'):
+            self.setup_audio()
+        with profiler.phase('leaderboard'):
+            self.setup_leaderboard()
+        self.start_asset_loading()
+        with profiler.phase('ui'):
+            self.setup_ui()
         
         # Start background music
-        self.audio_system.play_music("background_music.wav", loop=True)
+        with profiler.phase('music'):
+            self.audio_system.play_music("background_music.wav", loop=True)
 
     def setup_audio(self):
-        """Setup audio system"""
-        self.audio_system = AudioSystem()
+        """Setup audio system (sounds are decoded by the asset pipeline)"""
+        self.audio_system = AudioSystem(preload=False)
+
+    def start_asset_loading(self):
+        """Queue image, sound and map loading on background workers"""
+        self.asset_pipeline = AssetPipeline()
+        self.asset_pipeline.submit('audio', self.load_sound_assets, weight=1.0)
+        self.asset_pipeline.submit('map', self.load_map_assets, weight=3.0)
+        self.asset_pipeline.submit('sprites', self.load_sprite_assets, weight=2.0)
+
+    def load_sprite_assets(self):
+        """Slice every animation sheet and load power-up icons (worker thread)"""
+        with profiler.phase('sprites'):
+            animation_library.get_animations(PLAYER_SPRITE_PATH, 192, 192, PLAYER_SPRITE_SCALE)
+            for config in ENEMY_CONFIGS.values():
+                animation_library.get_animations(config['sprite_path'], config['sprite_width'],
+                                                 config['sprite_height'], config['scale'])
+            with profiler.phase('powerup icons'):
+                powerup_registry.prewarm()
+
+    def load_sound_assets(self):
+        """Decode the sound effects needed early in a run (worker thread); others decode on first play"""
+        with profiler.phase('sounds'):
+            self.audio_system.prefetch_sounds()
+
+    def finish_loading(self):
+        """Wait for background assets and build the systems that need them"""
+        if self.assets_ready:
+            return
+        with profiler.phase('finish_loading'):
+            with profiler.phase('wait for assets'):
+                self.asset_pipeline.wait_all()
+            self.setup_map()
+            with profiler.phase('setup_sprites'):
+                self.setup_sprites()
+            self.hud = HUD(self.player, self.wave_manager, self.powerup_manager,
+                           camera=self.camera, render_queue=self.render_queue)
+        self.assets_ready = True
+        self.freeze_frame_valid = False  # Show the world instead of the loading backdrop
+        self.main_menu.set_progress(None)
+        profiler.write_report()
 
     def setup_leaderboard(self):
         """Setup leaderboard system"""
         self.leaderboard = LeaderboardSystem()
 
-    def setup_map(self):
-        """Setup map loading and processing"""
+    def load_map_assets(self):
+        """Parse the map and pre-render its layers (worker thread)"""
         tmx_path = os.path.join("tiled_map", "Basic_maps.tmx")
         
-        self.map_loader = MapLoader(tmx_path)
-        
-        if self.map_loader.load_map():
-            self.map_loader.setup_layers()
+        with profiler.phase('map'):
+            debug_collision = (DEBUG_COLLISION or '--debug-collision' in sys.argv
+                               or os.environ.get('TSS_DEBUG_COLLISION') == '1')
+            map_loader = MapLoader(tmx_path, background_color=(64, 128, 64), bake_animations=BAKE_MAP_ANIMATIONS,
+                                   debug_collision=debug_collision)
+
+            if map_loader.load_map():
+                map_loader.setup_layers()
+                return map_loader
+        return None
+
+    def setup_map(self):
+        """Setup map from the background loader's result"""
+        try:
+            self.map_loader = self.asset_pipeline.get('map')
+        except Exception as e:
+            print(f"Error loading map: {e}")
+            self.map_loader = None
+
+        if self.map_loader:
+            # The dirty-rect renderer redraws tiles only when their frame changes
+            self.map_loader.track_animation_changes = self.dirty_renderer is not None
             print("Map setup complete")
             print(f"Collision objects created: {len(self.map_loader.collision_sprites)}")
             print(f"Animated tiles: {len(self.map_loader.animated_tiles)}")
         else:
             print("Failed to load map")
-            self.map_loader = None
 
     def setup_sprites(self):
         """Setup player and sprite groups"""
         self.all_sprites = pygame.sprite.Group()
+        self.render_queue = RenderQueue()  # Y-sorts world sprites into one blits call per frame
         
-        # Pass collision sprites to player if map loaded
+        # Pass collision sprites (and their broadphase index) to player if map loaded
         collision_sprites = None
+        collision_index = None
         if self.map_loader:
             collision_sprites = self.map_loader.collision_sprites
+            collision_index = self.map_loader.collision_index
             
         self.player = Player(
             self.all_sprites, 
             pos=(640, 400), 
             collision_sprites=collision_sprites,
-            audio_system=self.audio_system
+            audio_system=self.audio_system,
+            collision_index=collision_index
         )
         
         # Center the player on screen
@@ -86,16 +189,23 @@ class Game:
         self.all_sprites.add(self.player)
         
         # Setup wave manager
-        self.wave_manager = WaveManager(self.player, collision_sprites=collision_sprites)
+        self.wave_manager = WaveManager(self.player, collision_sprites=collision_sprites, collision_index=collision_index)
         
-        # Setup power-up manager
+        # Setup power-up manager (icons were prewarmed by the asset pipeline)
         self.powerup_manager = PowerUpManager(self.player)
 
+        # Everything culls against (and spawns inside) the shared camera view
+        if self.map_loader:
+            self.camera.set_world_size(*self.map_loader.get_map_size())
+        self.player.world_rect = self.camera.world_rect
+        self.wave_manager.camera_rect = self.camera.rect
+        self.powerup_manager.camera_rect = self.camera.rect
+        self.render_queue.set_view(self.camera.view_rect)
+        self.camera.follow(self.player.rect)
+        self.camera.store_previous()
+
     def setup_ui(self):
-        """Setup UI systems"""
-        # Setup HUD
-        self.hud = HUD(self.player, self.wave_manager, self.powerup_manager)
-        
+        """Setup UI systems (the HUD is created once assets are loaded)"""
         # Setup main menu
         self.setup_main_menu()
         
@@ -111,6 +221,7 @@ class Game:
     def setup_main_menu(self):
         """Setup main menu"""
         self.main_menu = Menu("Tiny Sword Survival", 500, 420)
+        self.main_menu.set_progress(0.0)
         # Căn giữa menu và button
         button_width = 260
         button_height = 56
@@ -172,11 +283,15 @@ class Game:
 
     def start_game(self):
         """Start a new game"""
+        # Only now do we need the background-loaded assets
+        self.finish_loading()
         self.game_state = 'playing'
         self.player.reset()
         self.wave_manager.clear_enemies()
         self.wave_manager.current_wave = 0  # Reset wave counter
         self.powerup_manager.clear_powerups()
+        self.camera.follow(self.player.rect)
+        self.camera.store_previous()
         self.wave_manager.start_wave()
         self.audio_system.play_sound('wave_start')
 
@@ -231,14 +346,76 @@ class Game:
                 print(f"🎉 New record! Rank #{rank}")
 
     def run(self):
+        # The simulation advances in fixed steps of 1/SIM_RATE; each rendered frame
+        # draws moving sprites between the last two steps
+        step = 1.0 / SIM_RATE
+        uncapped = '--uncapped' in sys.argv or os.environ.get('TSS_UNCAPPED') == '1'
+        perf_log = get_logger('perf')
+        accumulator = 0.0
+        last_time = time.perf_counter()
+        # Uncapped benchmark: update() and draw() are timed separately, so sim
+        # throughput is steps per second of update time, not steps per wall second
+        report_time = last_time
+        report = {'steps': 0, 'frames': 0, 'update_time': 0.0, 'draw_time': 0.0}
+        totals = dict(report)
+
         while self.running:
-            dt = self.clock.tick(FPS) / 1000.0  # Convert to seconds
-            self.handle_events()
-            self.update(dt)
-            self.draw()
+            if uncapped:
+                self.clock.tick()
+            else:
+                self.clock.tick(FPS)
+            now = time.perf_counter()
+            accumulator += now - last_time
+            last_time = now
 
+            self.handle_events()
+            steps = 0
+            update_start = time.perf_counter()
+            while accumulator >= step:
+                if steps == MAX_SIM_STEPS:
+                    # Too far behind (a stall or a slow machine): drop the backlog
+                    # instead of spending every later frame catching up
+                    accumulator = 0.0
+                    break
+                self.update(step)
+                accumulator -= step
+                steps += 1
+            draw_start = time.perf_counter()
+            self.draw(accumulator / step)
+
+            if uncapped:
+                report['steps'] += steps
+                report['frames'] += 1
+                report['update_time'] += draw_start - update_start
+                report['draw_time'] += time.perf_counter() - draw_start
+                if now - report_time >= 1.0:
+                    self._log_benchmark(perf_log, "uncapped", report, now - report_time)
+                    for key in totals:
+                        totals[key] += report[key]
+                        report[key] = 0
+                    report_time = now
+
+        if uncapped:
+            for key in totals:
+                totals[key] += report[key]
+            self._log_benchmark(perf_log, "uncapped total", totals)
+
+        self.asset_pipeline.shutdown()
+        if profiler.enabled:
+            print(self.audio_system.sound_bank.format_report())
         pygame.quit()
 
+    def _log_benchmark(self, perf_log, label, counts, elapsed=None):
+        """Log sim steps per second of update() time and frames per second of draw() time"""
+        sim_rate = counts['steps'] / counts['update_time'] if counts['update_time'] else 0.0
+        draw_rate = counts['frames'] / counts['draw_time'] if counts['draw_time'] else 0.0
+        message = "%s: sim %.0f steps/s (%d steps), render %.0f frames/s (%d frames)"
+        args = [label, sim_rate, counts['steps'], draw_rate, counts['frames']]
+        if elapsed:
+            message += ", %.0f frames/s on screen"
+            args.append(counts['frames'] / elapsed)
+        perf_log.info(message, *args)
+
     def handle_events(self):
         events = pygame.event.get()
         # Chuyển đổi event.pos về logic surface nếu là sự kiện chuột
@@ -281,15 +458,24 @@ class Game:
     
 
     def update(self, dt):
+        if not self.assets_ready:
+            # Build game systems as soon as the background loader is done
+            self.main_menu.set_progress(self.asset_pipeline.get_progress())
+            if self.asset_pipeline.is_done():
+                self.finish_loading()
+
         if self.game_state != 'playing':
             return
-            
+
+        self.store_previous_positions()
+
         # Update map animations
         if self.map_loader:
             self.map_loader.update_animations(dt)
         
         # Update sprites
         self.all_sprites.update(dt)
+        self.camera.follow(self.player.rect)
         
         # Update wave manager
         self.wave_manager.update(dt)
@@ -309,6 +495,18 @@ class Game:
         # Check game over
         self.check_game_over()
 
+    def store_previous_positions(self):
+        """Remember where moving things are before a simulation step (for interpolation)"""
+        self.camera.store_previous()
+        for sprite in self.all_sprites:
+            sprite.prev_topleft = sprite.rect.topleft
+        for enemy in self.wave_manager.enemies:
+            enemy.prev_topleft = enemy.rect.topleft
+            for arrow in enemy.arrows:
+                arrow.prev_topleft = arrow.rect.topleft
+        for powerup in self.powerup_manager.powerups:
+            powerup.prev_topleft = powerup.rect.topleft
+
     def check_collisions(self):
         """Check all collisions"""
         # Check player attacks on enemies
@@ -324,27 +522,25 @@ class Game:
         attack_rect = self.get_attack_area()
         
         # Check enemies in attack area
-        for enemy in self.wave_manager.enemies:
-            
-            if attack_rect.colliderect(enemy.rect):
-                if enemy.take_damage(self.player.get_damage()):
-                    self.audio_system.play_sound('enemy_hit')
-                    #dx = enemy.rect.centerx - self.player.rect.centerx
-                    #dy = enemy.rect.centery - self.player.rect.centery
-                    #dist = math.hypot(dx, dy)
-                    #if dist != 0:
-                       #knockback_strength = 20  
-                       #dx, dy = dx / dist, dy / dist
-                       #enemy.pos_x += dx * knockback_strength
-                       #enemy.pos_y += dy * knockback_strength
-                       #enemy.rect.center = (int(enemy.pos_x), int(enemy.pos_y))
-                    # Remove dead enemies
-                    if not enemy.health_system.is_alive():
-                        # Play death sound when enemy starts death animation
-                        self.audio_system.play_sound('enemy_death')
-                        # Update player stats
-                        self.player.on_enemy_killed()
-                        # Note: enemy.kill() is now called automatically in death animation
+        for enemy in self.wave_manager.get_enemies_in_rect(attack_rect):
+            if enemy.take_damage(self.player.get_damage()):
+                self.audio_system.play_sound('enemy_hit')
+                #dx = enemy.rect.centerx - self.player.rect.centerx
+                #dy = enemy.rect.centery - self.player.rect.centery
+                #dist = math.hypot(dx, dy)
+                #if dist != 0:
+                   #knockback_strength = 20  
+                   #dx, dy = dx / dist, dy / dist
+                   #enemy.pos_x += dx * knockback_strength
+                   #enemy.pos_y += dy * knockback_strength
+                   #enemy.rect.center = (int(enemy.pos_x), int(enemy.pos_y))
+                # Remove dead enemies
+                if not enemy.health_system.is_alive():
+                    # Play death sound when enemy starts death animation
+                    self.audio_system.play_sound('enemy_death')
+                    # Update player stats
+                    self.player.on_enemy_killed()
+                    # Note: enemy.kill() is now called automatically in death animation
 
     def get_attack_area(self):
         """Get the attack area rectangle based on player direction"""
@@ -364,53 +560,131 @@ class Game:
             return pygame.Rect(self.player.rect.centerx - attack_width//2, self.player.rect.top - attack_range, 
                              attack_width, attack_range)
 
-    def draw(self):
+    def draw(self, alpha=1.0):
+        """Draw a frame; alpha (0..1) is how far the frame lies between the last two simulation steps"""
+        if self.game_state == 'playing':
+            # The world moves on; take a new snapshot when a menu opens
+            self.freeze_frame_valid = False
+            self.camera.update_view(alpha)
+            self.render_queue.set_interpolation(alpha)
+        if self.dirty_renderer and self.game_state == 'playing':
+            self.draw_dirty()
+            return
+        if self.dirty_renderer:
+            self.dirty_renderer.invalidate()
+
         surface = self.scaler.begin_frame()
 
         if self.game_state == 'playing':
             self.draw_game(surface)
         elif self.game_state == 'menu':
-            self.draw_game(surface)  # Draw game in background
+            surface.blit(self.get_freeze_frame(), (0, 0))  # Frozen game in background
             self.main_menu.draw(surface)
         elif self.game_state == 'paused':
-            self.draw_game(surface)  # Draw game in background
+            surface.blit(self.get_freeze_frame(), (0, 0))
             self.pause_menu.draw(surface)
         elif self.game_state == 'settings':
-            self.draw_game(surface)  # Draw game in background
+            surface.blit(self.get_freeze_frame(), (0, 0))
             self.settings_menu.draw(surface)
         elif self.game_state == 'game_over':
-            self.draw_game(surface)  # Draw game in background
-            self.game_over_screen.draw(surface)
+            surface.blit(self.get_freeze_frame(dimmed=True), (0, 0))
+            self.game_over_screen.draw(surface, draw_overlay=False)
         elif self.game_state == 'leaderboard':
-            self.draw_game(surface)  # Draw game in background
-            self.leaderboard_screen.draw(surface)
+            surface.blit(self.get_freeze_frame(dimmed=True), (0, 0))
+            self.leaderboard_screen.draw(surface, draw_overlay=False)
 
         self.scaler.end_frame()
 
+    def get_freeze_frame(self, dimmed=False):
+        """Get the world snapshot shown behind menus (dimmed: with the overlay applied)"""
+        if not self.freeze_frame_valid:
+            if self.freeze_frame is None:
+                self.freeze_frame = pygame.Surface((self.logic_width, self.logic_height)).convert()
+            self.draw_background(self.freeze_frame)
+            self.freeze_frame_valid = True
+            self.freeze_frame_dimmed_valid = False
+        if not dimmed:
+            return self.freeze_frame
+
+        if not self.freeze_frame_dimmed_valid:
+            if self.freeze_frame_dimmed is None:
+                self.freeze_frame_dimmed = pygame.Surface((self.logic_width, self.logic_height)).convert()
+            self.freeze_frame_dimmed.blit(self.freeze_frame, (0, 0))
+            self.freeze_frame_dimmed.blit(get_dim_overlay(self.freeze_frame.get_size()), (0, 0))
+            self.freeze_frame_dimmed_valid = True
+        return self.freeze_frame_dimmed
+
+    def draw_background(self, surface):
+        """Draw the game world behind menus, or a plain backdrop while loading"""
+        if self.assets_ready:
+            self.draw_game(surface)
+        else:
+            surface.fill((64, 128, 64))
+
+    def draw_dirty(self):
+        """Draw a gameplay frame through the dirty-rect renderer"""
+        camera = self.camera
+        if camera.view_moved:
+            if camera.view_delta is None:
+                self.dirty_renderer.invalidate()
+            else:
+                # Shift the cached frame; only the newly exposed strips are redrawn
+                self.dirty_renderer.scroll(*camera.view_delta)
+        background_rects = self.map_loader.pop_changed_animated_rects(camera.x, camera.y) if self.map_loader else []
+        queue = self.render_queue
+        self.queue_world_sprites(queue)
+        draw_foreground = self.draw_foreground if self.map_loader and self.map_loader.has_foreground() else None
+        self.dirty_renderer.render(self.draw_map, queue.flush, self.hud.draw,
+                                   self.hud.get_signature(), background_rects,
+                                   draw_foreground=draw_foreground, world_rects=queue.get_pending_rects())
+
     def draw_game(self, surface):
         """Draw the game world"""
-        surface.fill((64, 128, 64))  # Green background
+        self.draw_map(surface)
+        self.draw_world_sprites(surface)
+        self.draw_foreground(surface)
+        
+        # Draw HUD
+        self.hud.draw(surface)
+
+    def draw_map(self, surface, area=None):
+        """Draw the map (only inside area, if given)"""
+        camera_x, camera_y = self.camera.x, self.camera.y
+        if not self.map_loader or not self.map_loader.covers_view(area or surface.get_rect(), camera_x, camera_y):
+            surface.fill((64, 128, 64), area)  # Green background
 
         if self.map_loader:
-            self.map_loader.draw_static_layers(surface)
-            self.map_loader.draw_animated_tiles(surface)
+            self.map_loader.draw_static_layers(surface, camera_x, camera_y, area=area)
+            self.map_loader.draw_animated_tiles(surface, camera_x, camera_y, area=area)
         else:
-            font = pygame.font.Font(None, 36)
-            text = font.render("Map failed to load!", True, (255, 255, 255))
+            text = text_cache.render(fonts.get(36), "Map failed to load!", (255, 255, 255))
             surface.blit(text, (50, 50))
 
-        # Draw sprites
-        self.all_sprites.draw(surface)
-        
-        # Draw enemies
-        self.wave_manager.draw(surface)
-        
-        # Draw power-ups
-        self.powerup_manager.draw(surface)
-        
-        # Draw HUD
-        self.hud.draw(surface)
+    def draw_foreground(self, surface, area=None):
+        """Draw map layers that cover sprites (only inside area, if given)"""
+        if self.map_loader:
+            self.map_loader.draw_above_layers(surface, self.camera.x, self.camera.y, area=area)
+            self.map_loader.draw_collision_debug(surface, self.camera.x, self.camera.y, area=area)
+
+    def draw_world_sprites(self, surface):
+        """Draw player, enemies and power-ups y-sorted in one batch; returns the rects drawn"""
+        self.queue_world_sprites(self.render_queue)
+        return self.render_queue.flush(surface)
+
+    def queue_world_sprites(self, queue):
+        """Queue player, enemies and power-ups for one frame"""
+        for sprite in self.all_sprites:
+            queue.add_sprite(sprite)
+        self.wave_manager.queue_draw(queue)
+        self.powerup_manager.queue_draw(queue)
 
 if __name__ == "__main__":
-    game = Game()
-    game.run()
\ No newline at end of file
+    try:
+        game = Game()
+        game.run()
+    except Exception:
+        # Keep the last log records around for the bug report
+        crash_log = log_manager.dump(reason=traceback.format_exc())
+        if crash_log:
+            print(f"Crash log written to {crash_log}")
+        raise
\ No newline at end of file
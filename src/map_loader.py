@@ -3,121 +3,374 @@ import xml.etree.ElementTree as ET
 import os
 import base64
 import zlib
-import struct
-import pytmx
+import pickle
+import math
+from bisect import bisect_right
+from itertools import accumulate
+import numpy as np
+from atlas_bundle import get_atlas
+from startup_profiler import profiler
+from spatial_hash import CollisionIndex
+from log_system import get_logger
+
+log = get_logger('map')
+
+# Bump when the layout of the compiled map cache changes
+MAP_CACHE_VERSION = 4
+MAP_CACHE_DIR = ".cache"
+# Upper 3 bits of a TMX gid are flip flags
+GID_MASK = 0x1FFFFFFF
+# Largest amount of memory bake_animation_frames() may use for baked frames
+ANIMATION_BAKE_BUDGET = 64 * 1024 * 1024
+# Cell size of the collision broadphase grid (pixels)
+COLLISION_CELL_SIZE = 128
+
+def _object_rect(x, y, width, height):
+    """Get the pixel rect of a Tiled object (size truncated, position rounded, as pygame does)"""
+    rect = pygame.Rect(0, 0, int(width), int(height))
+    rect.topleft = (x, y)
+    return rect
+
+def merge_collision_rects(rects):
+    """Merge touching or overlapping rects into fewer rects covering exactly the same pixels.
+
+    Rects are grouped into touching clusters. Each cluster's union is cut on
+    a compressed grid of its edge coordinates and rebuilt greedily from
+    maximal row runs. A cluster keeps its source rects if that does not
+    reduce the count. Empty rects (which never collide) are dropped.
+    """
+    rects = [pygame.Rect(rect) for rect in rects]
+    rects = [rect for rect in rects if rect.width > 0 and rect.height > 0]
+
+    # Cluster rects that overlap or share an edge (union-find)
+    parent = list(range(len(rects)))
+
+    def find(index):
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    for index, rect in enumerate(rects):
+        for other in rect.inflate(2, 2).collidelistall(rects):
+            if other > index:
+                parent[find(other)] = find(index)
+    clusters = {}
+    for index in range(len(rects)):
+        clusters.setdefault(find(index), []).append(rects[index])
+
+    merged = []
+    for cluster in clusters.values():
+        if len(cluster) == 1:
+            merged.extend(cluster)
+            continue
+        xs = sorted({x for rect in cluster for x in (rect.left, rect.right)})
+        ys = sorted({y for rect in cluster for y in (rect.top, rect.bottom)})
+        covered = np.zeros((len(ys) - 1, len(xs) - 1), dtype=bool)
+        for rect in cluster:
+            covered[ys.index(rect.top):ys.index(rect.bottom), xs.index(rect.left):xs.index(rect.right)] = True
+
+        pieces = []
+        rows, cols = covered.shape
+        for row in range(rows):
+            for col in range(cols):
+                if not covered[row, col]:
+                    continue
+                end_col = col
+                while end_col + 1 < cols and covered[row, end_col + 1]:
+                    end_col += 1
+                end_row = row
+                while end_row + 1 < rows and covered[end_row + 1, col:end_col + 1].all():
+                    end_row += 1
+                covered[row:end_row + 1, col:end_col + 1] = False
+                pieces.append(pygame.Rect(xs[col], ys[row], xs[end_col + 1] - xs[col], ys[end_row + 1] - ys[row]))
+        merged.extend(pieces if len(pieces) < len(cluster) else cluster)
+    return merged
+
+def _file_stamp(path):
+    """Get the (mtime, size) fingerprint used to key the compiled map cache"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
 class MapLoader:
-    def __init__(self, tmx_path):
+    def __init__(self, tmx_path, use_cache=True, cache_layer_pixels=True, background_color=(0, 0, 0),
+                 bake_animations=False, debug_collision=False):
         self.tmx_path = tmx_path
-        self.map_data = pytmx.load_pygame(tmx_path)
+        self.use_cache = use_cache
+        self.cache_layer_pixels = cache_layer_pixels
+        self.cache_path = os.path.join(os.path.dirname(tmx_path), MAP_CACHE_DIR,
+                                       os.path.basename(tmx_path) + ".cache")
+        self.map_data = None  # XML root, only set when the TMX was actually parsed
+        self.compiled = None  # Plain-data map description (parsed or loaded from cache)
+        self.loaded_from_cache = False
         self.tilesets = {}
         self.layers = []
+        self.background_color = background_color  # Shows through empty cells of the composite
+        self.static_composite = None  # All static layers below sprites, flattened and opaque
+        self.above_composite = None  # Layers marked above_sprites (canopy), or None
         self.collision_sprites = []
+        self.collision_index = CollisionIndex()  # Broadphase over collision_sprites
+        self.debug_collision = debug_collision  # Draw obstacles as an overlay (allocates their images)
+        self.collision_stats = {}
         self.animated_tiles = []
+        self.animation_groups = {}  # gid -> shared clock state and the tiles using it
+        self.animation_time = 0  # Global animation clock (ms), wraps at animation_period
+        self.animation_period = 1
+        self.bake_animations = bake_animations
+        self.baked_frames = []  # One surface per distinct global animation frame, if baked
+        self.baked_frame_starts = []
+        self.baked_rect = None
+        self.baked_index = 0
+        self.track_animation_changes = False  # Set by the dirty-rect renderer
+        self.changed_animated_tiles = []  # Tiles whose frame advanced since the last pop
         self.tile_animations = {}  # Store animation data for tiles
-        self.collision_rects = []
+        self.tile_lookup = []  # gid -> tile subsurface (None for empty/unknown gids)
+        self._tileset_firstgids = []  # Sorted, for resolving gids outside the lookup table
+        self.collision_rects = []  # As drawn in Tiled
+        self.obstacle_rects = []  # After merge_collision_rects(); one StaticObstacle each
         # Map properties
-        self.map_width = self.map_data.width
-        self.map_height = self.map_data.height
-        self.tile_width = self.map_data.tilewidth
-        self.tile_height = self.map_data.tileheight
-        self.map_pixel_width = self.map_width * self.tile_width
-        self.map_pixel_height = self.map_height * self.tile_height
-        
-
-
-    
+        self.map_width = 0
+        self.map_height = 0
+        self.tile_width = 0
+        self.tile_height = 0
+        self.map_pixel_width = 0
+        self.map_pixel_height = 0
 
-    
-    
-    
     def load_map(self):
-        """Load and parse the TMX file"""
+        """Load the map from the compiled cache, or parse the TMX file once"""
         try:
             if not os.path.exists(self.tmx_path):
                 print(f"TMX file not found: {self.tmx_path}")
                 return False
 
-            # Parse XML
-            tree = ET.parse(self.tmx_path)
-            self.map_data = tree.getroot()
-            
+            with profiler.phase('map cache'):
+                self.compiled = self._load_cache() if self.use_cache else None
+            self.loaded_from_cache = self.compiled is not None
+            if self.compiled is None:
+                with profiler.phase('parse tmx'):
+                    self.compiled = self._compile_tmx()
+
             # Get map dimensions
-            self.map_width = int(self.map_data.get('width'))
-            self.map_height = int(self.map_data.get('height'))
-            self.tile_width = int(self.map_data.get('tilewidth'))
-            self.tile_height = int(self.map_data.get('tileheight'))
+            map_info = self.compiled['map']
+            self.map_width = map_info['width']
+            self.map_height = map_info['height']
+            self.tile_width = map_info['tile_width']
+            self.tile_height = map_info['tile_height']
             self.map_pixel_width = self.map_width * self.tile_width
             self.map_pixel_height = self.map_height * self.tile_height
-            
-            print(f"Map loaded: {self.map_width}x{self.map_height} tiles, {self.tile_width}x{self.tile_height} tile size")
-            
+
+            source = "compiled cache" if self.loaded_from_cache else "TMX"
+            print(f"Map loaded from {source}: {self.map_width}x{self.map_height} tiles, {self.tile_width}x{self.tile_height} tile size")
+
             # Load tilesets
-            self._load_tilesets()
-            
+            with profiler.phase('tilesets'):
+                self._load_tilesets()
+
             return True
-            
+
         except Exception as e:
             print(f"Error loading map: {e}")
             return False
 
-    def _load_tilesets(self):
-        """Load tileset images and data"""
+    def _compile_tmx(self):
+        """Parse the TMX and its external TSX files into plain data (single pass)"""
         map_dir = os.path.dirname(self.tmx_path)
-        
+        self.map_data = ET.parse(self.tmx_path).getroot()
+        sources = [self.tmx_path]
+
+        compiled = {
+            'version': MAP_CACHE_VERSION,
+            'map': {
+                'width': int(self.map_data.get('width')),
+                'height': int(self.map_data.get('height')),
+                'tile_width': int(self.map_data.get('tilewidth')),
+                'tile_height': int(self.map_data.get('tileheight'))
+            },
+            'tilesets': [],
+            'animations': {},
+            'layers': [],
+            'collision_rects': [],
+            'layer_pixels': None
+        }
+
         for tileset in self.map_data.findall('tileset'):
             firstgid = int(tileset.get('firstgid'))
-            
+
             # Handle external tileset files
             source = tileset.get('source')
             tileset_elem = tileset
             if source:
                 tsx_path = os.path.join(map_dir, source)
                 if os.path.exists(tsx_path):
-                    tsx_tree = ET.parse(tsx_path)
-                    tileset_elem = tsx_tree.getroot()
-            
-            # Get tileset properties
-            tile_width = int(tileset_elem.get('tilewidth'))
-            tile_height = int(tileset_elem.get('tileheight'))
-            tile_count = int(tileset_elem.get('tilecount', 0))
-            columns = int(tileset_elem.get('columns', 1))
-            
+                    tileset_elem = ET.parse(tsx_path).getroot()
+                    sources.append(tsx_path)
+
             # Find image element
             image_elem = tileset_elem.find('image')
-            if image_elem is not None:
-                image_source = image_elem.get('source')
-                image_width = int(image_elem.get('width'))
-                image_height = int(image_elem.get('height'))
-                
-                # Load tileset image
-                image_path = os.path.join(map_dir, image_source)
-                if os.path.exists(image_path):
-                    try:
-                        tileset_image = pygame.image.load(image_path).convert_alpha()
-                        
-                        # Create tileset data
-                        self.tilesets[firstgid] = {
-                            'image': tileset_image,
-                            'tile_width': tile_width,
-                            'tile_height': tile_height,
-                            'columns': columns,
-                            'tile_count': tile_count,
-                            'image_width': image_width,
-                            'image_height': image_height
-                        }
-                        
-                        # Load tile animations
-                        self._load_tile_animations(tileset_elem, firstgid)
-                        
-                        print(f"Loaded tileset: {image_source} (GID: {firstgid}, Tiles: {tile_count})")
-                        
-                    except pygame.error as e:
-                        print(f"Failed to load tileset image {image_path}: {e}")
-                else:
-                    print(f"Tileset image not found: {image_path}")
+            if image_elem is None:
+                continue
+
+            image_path = os.path.join(map_dir, image_elem.get('source'))
+            sources.append(image_path)
+            compiled['tilesets'].append({
+                'firstgid': firstgid,
+                'image_path': image_path,
+                'image_source': image_elem.get('source'),
+                'tile_width': int(tileset_elem.get('tilewidth')),
+                'tile_height': int(tileset_elem.get('tileheight')),
+                'columns': int(tileset_elem.get('columns', 1)),
+                'tile_count': int(tileset_elem.get('tilecount', 0)),
+                'image_width': int(image_elem.get('width')),
+                'image_height': int(image_elem.get('height'))
+            })
+
+            # Load tile animations
+            compiled['animations'].update(self._load_tile_animations(tileset_elem, firstgid))
+
+        # Tile layers, stored as (height, width) uint32 gid grids
+        for layer in self.map_data.findall('layer'):
+            data_elem = layer.find('data')
+            if data_elem is None:
+                continue
+            tile_data = self._parse_layer_data(data_elem, data_elem.get('encoding'), data_elem.get('compression'))
+            if tile_data is not None and tile_data.size:
+                width = int(layer.get('width'))
+                height = int(layer.get('height'))
+                compiled['layers'].append({
+                    'name': layer.get('name'),
+                    'width': width,
+                    'height': height,
+                    'data': self._to_grid(tile_data, width, height),
+                    'above_sprites': self._layer_bool_property(layer, 'above_sprites')
+                })
+
+        # Object layers (for collision)
+        for objectgroup in self.map_data.findall('objectgroup'):
+            group_name = objectgroup.get('name', '').lower()
+            if group_name == 'collision' or 'collision' in group_name:
+                for obj in objectgroup.findall('object'):
+                    x = float(obj.get('x', 0))
+                    y = float(obj.get('y', 0))
+                    w = float(obj.get('width', 0))
+                    h = float(obj.get('height', 0))
+                    compiled['collision_rects'].append((x, y, w, h))
+        object_rects = [_object_rect(*rect) for rect in compiled['collision_rects']]
+        compiled['obstacle_rects'] = [tuple(rect) for rect in merge_collision_rects(object_rects)]
+
+        compiled['sources'] = {path: _file_stamp(path) for path in sources}
+        return compiled
+
+    def _layer_bool_property(self, layer, name):
+        """Read a boolean custom property (set in Tiled) from a layer element"""
+        for prop in layer.findall('properties/property'):
+            if prop.get('name') == name:
+                return prop.get('value', '').lower() == 'true'
+        return False
+
+    def _load_cache(self):
+        """Load the compiled map if every source file is unchanged"""
+        if not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path, 'rb') as f:
+                compiled = pickle.load(f)
+        except Exception as e:
+            print(f"Ignoring unreadable map cache {self.cache_path}: {e}")
+            return None
+
+        if compiled.get('version') != MAP_CACHE_VERSION:
+            return None
+        if compiled['sources'].get(self.tmx_path) is None:
+            return None
+        for path, stamp in compiled['sources'].items():
+            if _file_stamp(path) != stamp:
+                return None
+        return compiled
+
+    def _save_cache(self):
+        """Write the compiled map (and rendered layer pixels) next to the TMX"""
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(self.compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Could not write map cache {self.cache_path}: {e}")
+
+    def _load_tilesets(self):
+        """Load tileset images and data"""
+        for tileset_info in self.compiled['tilesets']:
+            with profiler.phase(f"tileset {tileset_info['image_source']}"):
+                self._load_tileset(tileset_info)
+        self._build_tile_lookup()
+
+        # Tile animations
+        for global_id, frames in self.compiled['animations'].items():
+            self.tile_animations[global_id] = {
+                'frames': [{'tileid': tileid, 'duration': duration} for tileid, duration in frames],
+                'current_frame': 0,
+                'current_time': 0,
+                'total_duration': sum(duration for _, duration in frames)
+            }
+
+    def _load_tileset(self, tileset_info):
+        """Load one tileset image and register its data"""
+        firstgid = tileset_info['firstgid']
+        image_path = tileset_info['image_path']
+
+        # Load tileset image (from the packed atlas when it is up to date)
+        if os.path.exists(image_path):
+            try:
+                atlas = get_atlas()
+                tileset_image = atlas.get_image(image_path) if atlas else None
+                if tileset_image is None:
+                    tileset_image = pygame.image.load(image_path).convert_alpha()
+
+                # Create tileset data
+                self.tilesets[firstgid] = {
+                    'image': tileset_image,
+                    'tile_width': tileset_info['tile_width'],
+                    'tile_height': tileset_info['tile_height'],
+                    'columns': tileset_info['columns'],
+                    'tile_count': tileset_info['tile_count'],
+                    'image_width': tileset_info['image_width'],
+                    'image_height': tileset_info['image_height']
+                }
+
+                print(f"Loaded tileset: {tileset_info['image_source']} (GID: {firstgid}, Tiles: {tileset_info['tile_count']})")
+
+            except pygame.error as e:
+                print(f"Failed to load tileset image {image_path}: {e}")
+        else:
+            print(f"Tileset image not found: {image_path}")
+
+    def _build_tile_lookup(self):
+        """Slice every tileset once into subsurfaces indexed by gid"""
+        self._tileset_firstgids = sorted(self.tilesets)
+        max_gid = max((firstgid + tileset['tile_count'] for firstgid, tileset in self.tilesets.items()), default=0)
+        self.tile_lookup = [None] * (max_gid + 1)
+        for firstgid, tileset in self.tilesets.items():
+            for local_id in range(tileset['tile_count']):
+                self.tile_lookup[firstgid + local_id] = self._slice_tile(tileset, local_id)
+
+    def _slice_tile(self, tileset_data, local_id):
+        """Get a tile as a subsurface of its tileset image (shares pixels, no copy)"""
+        columns = max(tileset_data['columns'], 1)
+        tile_rect = pygame.Rect((local_id % columns) * tileset_data['tile_width'],
+                                (local_id // columns) * tileset_data['tile_height'],
+                                tileset_data['tile_width'], tileset_data['tile_height'])
+        tile_rect = tile_rect.clip(tileset_data['image'].get_rect())
+        if tile_rect.width <= 0 or tile_rect.height <= 0:
+            return None
+        return tileset_data['image'].subsurface(tile_rect)
 
     def _load_tile_animations(self, tileset_elem, firstgid):
-        """Load animation data for animated tiles"""
+        """Load animation data for animated tiles as {gid: [(frame_gid, duration_ms), ...]}"""
+        animations = {}
         for tile in tileset_elem.findall('tile'):
             tile_id = int(tile.get('id'))
             global_id = firstgid + tile_id
@@ -128,106 +381,111 @@ class MapLoader:
                 for frame in animation.findall('frame'):
                     frame_tileid = int(frame.get('tileid'))
                     frame_duration = int(frame.get('duration'))  # Duration in milliseconds
-                    frames.append({
-                        'tileid': firstgid + frame_tileid,
-                        'duration': frame_duration
-                    })
+                    frames.append((firstgid + frame_tileid, frame_duration))
                 
                 if frames:
-                    self.tile_animations[global_id] = {
-                        'frames': frames,
-                        'current_frame': 0,
-                        'current_time': 0,
-                        'total_duration': sum(frame['duration'] for frame in frames)
-                    }
+                    animations[global_id] = frames
                     print(f"Loaded animation for tile {global_id} with {len(frames)} frames")
+        return animations
 
     def setup_layers(self):
         """Process map layers"""
-        if not self.map_data:
+        if not self.compiled:
             return
         
         # Clear animated tiles list
         self.animated_tiles = []
+        self.layers = []
         self.collision_sprites = pygame.sprite.Group()
 
+        cached_pixels = self.compiled['layer_pixels'] if self.loaded_from_cache else None
+        rendered_pixels = []
+
         # Process tile layers
-        for layer in self.map_data.findall('layer'):
-            layer_name = layer.get('name')
-            
-            # Skip collision layer for now
-                
-            layer_width = int(layer.get('width'))
-            layer_height = int(layer.get('height'))
-            
-            # Get layer data
-            data_elem = layer.find('data')
-            if data_elem is not None:
-                encoding = data_elem.get('encoding')
-                compression = data_elem.get('compression')
-                
-                # Parse tile data
-                tile_data = self._parse_layer_data(data_elem, encoding, compression)
-                
-                if tile_data:
-                    layer_info = {
-                        'name': layer_name,
-                        'width': layer_width,
-                        'height': layer_height,
-                        'data': tile_data,
-                        'surface': None
-                    }
-                    
-                    # Find animated tiles in this layer
-                    self._find_animated_tiles(layer_info)
-                    
-                    # Pre-render layer to surface for better performance (static tiles only)
-                    layer_info['surface'] = self._render_layer_to_surface(layer_info)
-                    self.layers.append(layer_info)
-                    
-                    print(f"Processed layer: {layer_name} ({layer_width}x{layer_height})")
+        for index, compiled_layer in enumerate(self.compiled['layers']):
+            with profiler.phase(f"layer {compiled_layer['name']}"):
+                self._setup_layer(index, compiled_layer, cached_pixels, rendered_pixels)
 
         # Process object layers (for collision)
-        for objectgroup in self.map_data.findall('objectgroup'):
-            group_name = objectgroup.get('name', '').lower()
-            if group_name == 'collision' or 'collision' in group_name:
-                for obj in objectgroup.findall('object'):
-                    x = float(obj.get('x', 0))
-                    y = float(obj.get('y', 0))
-                    w = float(obj.get('width', 0))
-                    h = float(obj.get('height', 0))
+        with profiler.phase('collision objects'):
+            self.collision_rects = list(self.compiled['collision_rects'])
+            self.obstacle_rects = [pygame.Rect(rect) for rect in self.compiled['obstacle_rects']]
+            for rect in self.obstacle_rects:
+                StaticObstacle(rect.topleft, rect.size, [self.collision_sprites], debug=self.debug_collision)
+            self.collision_index = CollisionIndex(self.collision_sprites, COLLISION_CELL_SIZE)
+            self.collision_stats = self._get_collision_stats()
+        if self.collision_rects:
+            print(f"✔ Đã load {len(self.collision_sprites)} vật cản từ object layer.")
+            stats = self.collision_stats
+            log.info("Collision rects merged: %s -> %s, %.0f KB of debug images not allocated",
+                     stats['source_rects'], stats['obstacles'], stats['debug_bytes_saved'] / 1024)
+
+        with profiler.phase('static composite'):
+            self._build_static_composite()
+
+        self._build_animation_groups()
+        if self.bake_animations:
+            with profiler.phase('bake animations'):
+                self.bake_animation_frames()
+
+        if self.use_cache and not self.loaded_from_cache:
+            self.compiled['layer_pixels'] = rendered_pixels if self.cache_layer_pixels else None
+            with profiler.phase('save map cache'):
+                self._save_cache()
 
-                    if w != None and h != None:
-                        StaticObstacle((x, y), (w, h), [self.collision_sprites])
-                    else:
-                        print(f"⚠️ Bỏ qua object không hợp lệ: x={x}, y={y}, w={w}, h={h}")
+    def _setup_layer(self, index, compiled_layer, cached_pixels, rendered_pixels):
+        """Build one layer: animated tile positions plus its pre-rendered surface"""
+        layer_info = {
+            'name': compiled_layer['name'],
+            'width': compiled_layer['width'],
+            'height': compiled_layer['height'],
+            'data': compiled_layer['data'],
+            'above_sprites': compiled_layer.get('above_sprites', False),
+            'surface': None
+        }
 
-                print(f"✔ Đã load {len(self.collision_sprites)} vật cản từ object layer.")
-              
+        # Find animated tiles in this layer
+        self._find_animated_tiles(layer_info)
+
+        if cached_pixels:
+            # Restore the pre-rendered layer instead of re-blitting every tile
+            layer_info['surface'] = self._surface_from_pixels(cached_pixels[index])
+        else:
+            # Pre-render layer to surface for better performance (static tiles only)
+            layer_info['surface'] = self._render_layer_to_surface(layer_info)
+            if self.cache_layer_pixels:
+                rendered_pixels.append(zlib.compress(pygame.image.tobytes(layer_info['surface'], 'RGBA'), 1))
+        self.layers.append(layer_info)
+
+        print(f"Processed layer: {layer_info['name']} ({layer_info['width']}x{layer_info['height']})")
+
+    def _surface_from_pixels(self, compressed_pixels):
+        """Rebuild a pre-rendered layer surface from cached RGBA bytes"""
+        size = (self.map_pixel_width, self.map_pixel_height)
+        surface = pygame.image.frombytes(zlib.decompress(compressed_pixels), size, 'RGBA')
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        return surface
 
     def _find_animated_tiles(self, layer_info):
         """Find and store animated tile positions"""
-        tile_data = layer_info['data']
-        
-        for y in range(layer_info['height']):
-            for x in range(layer_info['width']):
-                tile_index = y * layer_info['width'] + x
-                if tile_index < len(tile_data):
-                    gid = tile_data[tile_index]
-                    
-                    if gid > 0 and gid in self.tile_animations:
-                        animated_tile = {
-                            'gid': gid,
-                            'x': x * self.tile_width,
-                            'y': y * self.tile_height,
-                            'layer': layer_info['name'],
-                            'current_frame': 0,
-                            'current_time': 0
-                        }
-                        self.animated_tiles.append(animated_tile)
+        if not self.tile_animations:
+            return
+        animated_gids = np.fromiter(self.tile_animations.keys(), dtype=np.uint32)
+        grid = layer_info['data']
+        rows, cols = np.nonzero(np.isin(grid, animated_gids))
+
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            animated_tile = {
+                'gid': int(grid[row, col]),
+                'x': col * self.tile_width,
+                'y': row * self.tile_height,
+                'layer': layer_info['name']
+            }
+            self.animated_tiles.append(animated_tile)
 
     def _parse_layer_data(self, data_elem, encoding, compression):
-        """Parse tile data from layer"""
+        """Parse tile data from layer into a flat uint32 gid array (flip flags removed)"""
         try:
             if encoding == 'base64':
                 # Decode base64 data
@@ -240,131 +498,282 @@ class MapLoader:
                     import gzip
                     raw_data = gzip.decompress(raw_data)
                 
-                # Convert to tile IDs (4 bytes per tile, little endian)
-                tile_count = len(raw_data) // 4
-                tile_data = []
-                
-                for i in range(tile_count):
-                    tile_id = struct.unpack('<I', raw_data[i*4:(i+1)*4])[0]
-                    # Remove flip flags (upper 3 bits)
-                    tile_id = tile_id & 0x1FFFFFFF
-                    tile_data.append(tile_id)
-                
-                return tile_data
+                # 4 bytes per tile, little endian
+                tile_data = np.frombuffer(raw_data, dtype='<u4', count=len(raw_data) // 4)
                 
             elif encoding == 'csv':
                 # Parse CSV data
-                csv_data = data_elem.text.strip()
-                tile_data = [int(x.strip()) for x in csv_data.split(',') if x.strip()]
-                return tile_data
+                tile_data = np.fromstring(data_elem.text.strip(), dtype=np.uint32, sep=',')
                 
             else:
                 # Parse tile elements directly
                 tiles = data_elem.findall('tile')
-                tile_data = [int(tile.get('gid', 0)) for tile in tiles]
-                return tile_data
+                tile_data = np.fromiter((int(tile.get('gid', 0)) for tile in tiles),
+                                        dtype=np.uint32, count=len(tiles))
+
+            return (tile_data & GID_MASK).astype(np.uint32)
                 
         except Exception as e:
             print(f"Error parsing layer data: {e}")
             return None
 
+    def _to_grid(self, tile_data, width, height):
+        """Shape a flat gid array into a (height, width) grid, padding short layers with 0"""
+        if tile_data.size == width * height:
+            return tile_data.reshape(height, width)
+        grid = np.zeros(width * height, dtype=np.uint32)
+        count = min(tile_data.size, grid.size)
+        grid[:count] = tile_data[:count]
+        return grid.reshape(height, width)
+
     def _render_layer_to_surface(self, layer_info):
         """Pre-render a layer to a surface for better performance (static tiles only)"""
         surface = pygame.Surface((self.map_pixel_width, self.map_pixel_height), pygame.SRCALPHA)
         
-        tile_data = layer_info['data']
-        
-        for y in range(layer_info['height']):
-            for x in range(layer_info['width']):
-                tile_index = y * layer_info['width'] + x
-                if tile_index < len(tile_data):
-                    gid = tile_data[tile_index]
-                    
-                    # Only render static tiles to the surface
-                    if gid > 0 and gid not in self.tile_animations:
-                        tile_image = self._get_tile_image(gid)
-                        if tile_image:
-                            pos_x = x * self.tile_width
-                            pos_y = y * self.tile_height
-                            surface.blit(tile_image, (pos_x, pos_y))
+        grid = layer_info['data']
+        # Only non-empty, static cells are visited
+        static_mask = grid != 0
+        if self.tile_animations:
+            static_mask &= ~np.isin(grid, np.fromiter(self.tile_animations.keys(), dtype=np.uint32))
+        rows, cols = np.nonzero(static_mask)
+        if rows.size == 0:
+            return surface
+
+        get_tile_image = self._get_tile_image
+        gids = grid[rows, cols].tolist()
+        xs = (cols * self.tile_width).tolist()
+        ys = (rows * self.tile_height).tolist()
+        blit_sequence = []
+        for gid, x, y in zip(gids, xs, ys):
+            tile_image = get_tile_image(gid)
+            if tile_image:
+                blit_sequence.append((tile_image, (x, y)))
+        surface.blits(blit_sequence, doreturn=False)
         
         return surface
 
     def _get_tile_image(self, gid):
         """Get tile image from GID"""
-        if gid == 0:
-            return None
-        
-        # Find the correct tileset
-        tileset_data = None
-        local_id = gid
-        
-        # Sort tilesets by firstgid in descending order
-        sorted_tilesets = sorted(self.tilesets.items(), reverse=True)
-        
-        for firstgid, tileset in sorted_tilesets:
-            if gid >= firstgid:
-                tileset_data = tileset
-                local_id = gid - firstgid
-                break
-        
-        if not tileset_data:
+        if 0 < gid < len(self.tile_lookup):
+            return self.tile_lookup[gid]
+        if gid <= 0 or not self._tileset_firstgids:
             return None
-        
-        # Calculate tile position in tileset
-        columns = tileset_data['columns']
-        tile_x = (local_id % columns) * tileset_data['tile_width']
-        tile_y = (local_id // columns) * tileset_data['tile_height']
-        
-        # Extract tile from tileset
-        try:
-            tile_rect = pygame.Rect(tile_x, tile_y, tileset_data['tile_width'], tileset_data['tile_height'])
-            tile_surface = pygame.Surface((tileset_data['tile_width'], tileset_data['tile_height']), pygame.SRCALPHA)
-            tile_surface.blit(tileset_data['image'], (0, 0), tile_rect)
-            return tile_surface
-        except:
+
+        # Outside the table: resolve the owning tileset by firstgid
+        index = bisect_right(self._tileset_firstgids, gid) - 1
+        if index < 0:
             return None
+        firstgid = self._tileset_firstgids[index]
+        return self._slice_tile(self.tilesets[firstgid], gid - firstgid)
 
-    def draw_static_layers(self, screen, camera_x=0, camera_y=0):
-        """Draw all pre-rendered layers to screen"""
+    def _build_static_composite(self):
+        """Flatten the pre-rendered layers into one opaque surface (plus one for canopy layers)"""
+        size = (self.map_pixel_width, self.map_pixel_height)
+        self.static_composite = pygame.Surface(size)
+        self.static_composite.fill(self.background_color)
+        self.above_composite = None
         for layer in self.layers:
-            if layer['surface']:
-                screen.blit(layer['surface'], (-camera_x, -camera_y))
+            if not layer['surface']:
+                continue
+            if layer['above_sprites']:
+                if self.above_composite is None:
+                    self.above_composite = pygame.Surface(size, pygame.SRCALPHA)
+                self.above_composite.blit(layer['surface'], (0, 0))
+            else:
+                self.static_composite.blit(layer['surface'], (0, 0))
+
+        if pygame.display.get_surface() is not None:
+            self.static_composite = self.static_composite.convert()
+            if self.above_composite is not None:
+                self.above_composite = self.above_composite.convert_alpha()
+
+    def covers_view(self, view_rect, camera_x=0, camera_y=0):
+        """Check whether the map fills a screen rect (no backdrop needed behind it)"""
+        return pygame.Rect(-camera_x, -camera_y, self.map_pixel_width, self.map_pixel_height).contains(view_rect)
+
+    def draw_static_layers(self, screen, camera_x=0, camera_y=0, area=None):
+        """Draw the static map: one opaque blit of the visible part (only inside area, if given)"""
+        if self.static_composite is not None:
+            self._blit_view(screen, self.static_composite, camera_x, camera_y, area)
+
+    def draw_above_layers(self, screen, camera_x=0, camera_y=0, area=None):
+        """Draw the layers that cover sprites (only inside area, if given)"""
+        if self.above_composite is not None:
+            self._blit_view(screen, self.above_composite, camera_x, camera_y, area)
+
+    def _get_collision_stats(self):
+        """Count obstacles before/after merging and the debug-image memory that is not allocated"""
+        source_rects = [_object_rect(*rect) for rect in self.collision_rects]
+        # Before merging every source rect carried an RGBA debug image
+        source_bytes = sum(rect.width * rect.height * 4 for rect in source_rects if rect.width > 0 and rect.height > 0)
+        debug_bytes = 0
+        if self.debug_collision:
+            debug_bytes = sum(rect.width * rect.height * 4 for rect in self.obstacle_rects)
+        return {
+            'source_rects': len(source_rects),
+            'obstacles': len(self.obstacle_rects),
+            'debug_bytes': debug_bytes,
+            'debug_bytes_saved': source_bytes - debug_bytes
+        }
 
-    def draw_animated_tiles(self, screen, camera_x=0, camera_y=0):
-        """Draw animated tiles"""
+    def has_foreground(self):
+        """Check whether anything is drawn above the sprites (canopy layers or the collision overlay)"""
+        return self.above_composite is not None or (self.debug_collision and len(self.collision_sprites) > 0)
+
+    def draw_collision_debug(self, screen, camera_x=0, camera_y=0, area=None):
+        """Draw the obstacles over the map when the collision overlay is on (only inside area, if given)"""
+        if not self.debug_collision:
+            return
+        view = area if area is not None else screen.get_rect()
+        for obstacle in self.collision_sprites:
+            dest = obstacle.rect.move(-camera_x, -camera_y)
+            clipped = dest.clip(view)
+            if clipped.width and clipped.height:
+                screen.blit(obstacle.image, clipped, clipped.move(-dest.x, -dest.y))
+
+    def _blit_view(self, screen, composite, camera_x, camera_y, area):
+        """Blit the part of a map-sized surface that lands inside area (default: the whole screen)"""
+        view = area if area is not None else screen.get_rect()
+        source = view.move(camera_x, camera_y).clip(composite.get_rect())
+        if source.width and source.height:
+            screen.blit(composite, (source.x - camera_x, source.y - camera_y), source)
+
+    def _build_animation_groups(self):
+        """Group animated tiles by gid; every group shares one clock"""
+        self.animation_groups = {}
+        self.animation_time = 0
+        self.baked_frames = []
+        periods = []
         for animated_tile in self.animated_tiles:
             gid = animated_tile['gid']
-            if gid in self.tile_animations:
-                animation_data = self.tile_animations[gid]
-                current_frame = animated_tile['current_frame']
-                
-                if current_frame < len(animation_data['frames']):
-                    frame_gid = animation_data['frames'][current_frame]['tileid']
-                    tile_image = self._get_tile_image(frame_gid)
-                    
-                    if tile_image:
-                        screen_x = animated_tile['x'] - camera_x
-                        screen_y = animated_tile['y'] - camera_y
-                        screen.blit(tile_image, (screen_x, screen_y))
+            group = self.animation_groups.get(gid)
+            if group is None:
+                frames = self.tile_animations[gid]['frames']
+                frame_ends = list(accumulate(frame['duration'] for frame in frames))
+                group = {
+                    'images': [self._get_tile_image(frame['tileid']) for frame in frames],
+                    'frame_ends': frame_ends,
+                    'period': frame_ends[-1] if frame_ends else 0,
+                    'current_frame': 0,
+                    'tiles': []
+                }
+                group['image'] = group['images'][0] if group['images'] else None
+                self.animation_groups[gid] = group
+                if group['period'] > 0:
+                    periods.append(group['period'])
+
+            tile_image = self._get_tile_image(gid)
+            size = tile_image.get_size() if tile_image else (self.tile_width, self.tile_height)
+            animated_tile['rect'] = pygame.Rect((animated_tile['x'], animated_tile['y']), size)
+            animated_tile['group'] = group
+            group['tiles'].append(animated_tile)
+
+        # All clocks line up again after the least common multiple of their periods
+        self.animation_period = math.lcm(*periods) if periods else 1
+
+    def _frame_at(self, group, time_ms):
+        """Get a group's frame index at a global animation time"""
+        if group['period'] <= 0:
+            return 0
+        return bisect_right(group['frame_ends'], time_ms % group['period'])
+
+    def bake_animation_frames(self, memory_budget=ANIMATION_BAKE_BUDGET):
+        """Pre-render every distinct global animation frame of the animated tiles.
+
+        Returns False (and keeps per-tile drawing) when there is nothing to bake or
+        the frames would not fit in memory_budget bytes.
+        """
+        self.baked_frames = []
+        if not self.animated_tiles:
+            return False
+        bounds = self.animated_tiles[0]['rect'].unionall([tile['rect'] for tile in self.animated_tiles])
+
+        frame_bytes = bounds.width * bounds.height * 4
+        max_frames = memory_budget // frame_bytes
+
+        # A new global frame starts wherever any group changes frame within one period.
+        # The period is an LCM and can be huge, so stop as soon as the budget is exceeded
+        starts = {0}
+        for group in self.animation_groups.values():
+            frame_ends = group['frame_ends']
+            if group['period'] <= 0 or len(frame_ends) < 2:
+                continue
+            # This group's own frame changes are distinct, so check them before enumerating
+            if self.animation_period // group['period'] * len(frame_ends) > max_frames:
+                starts = None
+                break
+            for cycle_start in range(0, self.animation_period, group['period']):
+                starts.add(cycle_start)  # Wraps back to the first frame
+                starts.update(cycle_start + end for end in frame_ends[:-1])
+            if len(starts) > max_frames:
+                starts = None
+                break
+
+        if starts is None:
+            log.info("Not baking animation frames: more than %d frames of %dx%d exceed the %d MB budget",
+                     max_frames, bounds.width, bounds.height, memory_budget // (1024 * 1024))
+            return False
+        starts = sorted(starts)
+
+        has_display = pygame.display.get_surface() is not None
+        for start in starts:
+            frame = pygame.Surface(bounds.size, pygame.SRCALPHA)
+            blit_sequence = []
+            for animated_tile in self.animated_tiles:
+                group = animated_tile['group']
+                if group['images']:
+                    image = group['images'][self._frame_at(group, start)]
+                    if image:
+                        blit_sequence.append((image, (animated_tile['x'] - bounds.x, animated_tile['y'] - bounds.y)))
+            frame.blits(blit_sequence, doreturn=False)
+            self.baked_frames.append(frame.convert_alpha() if has_display else frame)
+
+        self.baked_frame_starts = starts
+        self.baked_rect = bounds
+        self.baked_index = bisect_right(starts, self.animation_time) - 1
+        return True
+
+    def draw_animated_tiles(self, screen, camera_x=0, camera_y=0, area=None):
+        """Draw animated tiles (only those touching area, if given)"""
+        if self.baked_frames:
+            # One area-limited blit of the pre-rendered global frame
+            view = area if area is not None else screen.get_rect()
+            source = view.move(camera_x, camera_y).clip(self.baked_rect)
+            if source.width and source.height:
+                screen.blit(self.baked_frames[self.baked_index], (source.x - camera_x, source.y - camera_y),
+                            source.move(-self.baked_rect.x, -self.baked_rect.y))
+            return
+
+        # Images come from the shared per-gid clocks; tiles keep their layer order.
+        # Only tiles inside the view (or area) are drawn.
+        blit_sequence = []
+        view = (area if area is not None else screen.get_rect()).move(camera_x, camera_y)
+        for animated_tile in self.animated_tiles:
+            image = animated_tile['group']['image']
+            if image and view.colliderect(animated_tile['rect']):
+                blit_sequence.append((image, (animated_tile['x'] - camera_x, animated_tile['y'] - camera_y)))
+        screen.blits(blit_sequence, doreturn=False)
+
+    def pop_changed_animated_rects(self, camera_x=0, camera_y=0):
+        """Get the screen rects of animated tiles that changed frame since the last call"""
+        rects = [animated_tile['rect'].move(-camera_x, -camera_y) for animated_tile in self.changed_animated_tiles]
+        self.changed_animated_tiles = []
+        return rects
 
     def update_animations(self, dt):
-        """Update animated tiles"""
-        dt_ms = dt * 1000  # Convert to milliseconds
+        """Advance the global animation clock and the frame of every gid group"""
+        self.animation_time = (self.animation_time + dt * 1000) % self.animation_period
         
-        for animated_tile in self.animated_tiles:
-            gid = animated_tile['gid']
-            if gid in self.tile_animations:
-                animation_data = self.tile_animations[gid]
-                animated_tile['current_time'] += dt_ms
-                
-                if len(animation_data['frames']) > 0:
-                    current_frame = animated_tile['current_frame']
-                    frame_duration = animation_data['frames'][current_frame]['duration']
-                    
-                    if animated_tile['current_time'] >= frame_duration:
-                        animated_tile['current_time'] = 0
-                        animated_tile['current_frame'] = (current_frame + 1) % len(animation_data['frames'])
+        for group in self.animation_groups.values():
+            frame = self._frame_at(group, self.animation_time)
+            if frame != group['current_frame']:
+                group['current_frame'] = frame
+                group['image'] = group['images'][frame]
+                if self.track_animation_changes:
+                    self.changed_animated_tiles.extend(group['tiles'])
+
+        if self.baked_frames:
+            self.baked_index = bisect_right(self.baked_frame_starts, self.animation_time) - 1
 
     def get_map_size(self):
         """Get map size in pixels"""
@@ -379,17 +788,16 @@ class MapLoader:
             for layer in self.layers:
                 if layer['name'] == layer_name:
                     if 0 <= tile_x < layer['width'] and 0 <= tile_y < layer['height']:
-                        tile_index = tile_y * layer['width'] + tile_x
-                        if tile_index < len(layer['data']):
-                            return layer['data'][tile_index]
+                        return int(layer['data'][int(tile_y), int(tile_x)])
         
         return 0
     
 class StaticObstacle(pygame.sprite.Sprite):
-    def __init__(self, pos, size, groups):
+    def __init__(self, pos, size, groups, debug=False):
         super().__init__(groups)
-        self.image = pygame.Surface(size)
-        self.image = pygame.Surface(size, pygame.SRCALPHA)  
-        self.image.fill((255, 255, 0, 100))
-        self.rect = self.image.get_rect(topleft=pos)
+        self.image = None  # Only the collision debug overlay draws obstacles
+        if debug:
+            self.image = pygame.Surface(size, pygame.SRCALPHA)
+            self.image.fill((255, 255, 0, 100))
+        self.rect = pygame.Rect(pos, size)
         self.old_rect = self.rect.copy()
@@ -1,11 +1,22 @@
 import pygame
 import os
-from utils import LoadSprite, AnimationManager, InputHandler, CombatSystem
+from utils import animation_library, InputHandler, CombatSystem
 from health_system import HealthSystem, HealthBar
 from power_system import PowerSystem
+from log_system import get_logger
+from render_cache import effect_variants
+
+log = get_logger('player')
+
+PLAYER_SPRITE_PATH = os.path.join("assets", "Factions", "Knights", "Troops", "Warrior", "Blue", "Warrior_Blue.png")
+PLAYER_SPRITE_SCALE = 0.75
+PLAYER_ANIMATION_SPEEDS = {
+    'idle_animation_speed': 8,
+    'attack_animation_speed': 25
+}
 
 class Player(pygame.sprite.Sprite):
-    def __init__(self, groups, pos=(400, 300), collision_sprites=None, audio_system=None):
+    def __init__(self, groups, pos=(400, 300), collision_sprites=None, audio_system=None, collision_index=None):
         super().__init__(groups)
         
         # Store audio system reference
@@ -63,6 +74,8 @@ class Player(pygame.sprite.Sprite):
         self.pos_x = float(self.rect.x)
         self.pos_y = float(self.rect.y)
         self.old_rect = self.rect.copy()
+        # Area the player must stay in (Game sets it to the map size)
+        self.world_rect = pygame.Rect(0, 0, 1280, 800)
         # Movement and direction state
         self.is_moving = False
         self.direction = 'right'
@@ -75,21 +88,15 @@ class Player(pygame.sprite.Sprite):
 
         # Collision system - accept collision sprites from parameter
         self.collision_sprites = collision_sprites
+        self.collision_index = collision_index  # Broadphase over collision_sprites (map's CollisionIndex)
 
     def _init_sprite_system(self):
         """Initialize sprite and animation system"""
-        sprite_path = os.path.join("assets", "Factions", "Knights", "Troops", "Warrior", "Blue", "Warrior_Blue.png")
-        sprite_loader = LoadSprite(sprite_path)
-        animations = sprite_loader.get_all_animations_player(sprite_width=192, sprite_height=192, scale=0.75)
-        
-        animation_speeds = {
-            'idle_animation_speed': 8,
-            'attack_animation_speed': 25
-        }
-        
-        # Because there is no left idle animation we need to create both left and right idle animation
-        self.animation_manager = AnimationManager(animations, animation_speeds)
-        self.animation_manager.create_directional_idle_animations()
+        # Because there is no left idle animation the library builds both left and right idle animation
+        self.animation_manager = animation_library.create_manager(
+            PLAYER_SPRITE_PATH, PLAYER_ANIMATION_SPEEDS,
+            sprite_width=192, sprite_height=192, scale=PLAYER_SPRITE_SCALE
+        )
         
         # Set initial image
         self.image = self.animation_manager._get_current_frame()
@@ -140,7 +147,7 @@ class Player(pygame.sprite.Sprite):
         
         if effect_type == 'health_boost':
             self.health_system.heal(50)
-            print(effect_desc['health_boost'])
+            log.info(effect_desc['health_boost'])
         elif effect_type == 'damage_boost':
             duration = 10.0
             self.active_power_ups['damage_boost'] = {
@@ -148,7 +155,7 @@ class Player(pygame.sprite.Sprite):
                 'duration': duration,
                 'multiplier': 2.0
             }
-            print(effect_desc['damage_boost'])
+            log.info(effect_desc['damage_boost'])
         elif effect_type == 'speed_boost':
             duration = 8.0
             self.active_power_ups['speed_boost'] = {
@@ -156,7 +163,7 @@ class Player(pygame.sprite.Sprite):
                 'duration': duration,
                 'multiplier': 1.5
             }
-            print(effect_desc['speed_boost'])
+            log.info(effect_desc['speed_boost'])
         elif effect_type == 'invulnerability':
             duration = 5.0
             self.active_power_ups['invulnerability'] = {
@@ -165,7 +172,7 @@ class Player(pygame.sprite.Sprite):
             }
             self.health_system.is_invulnerable = True
             self.health_system.invulnerability_time = duration
-            print(effect_desc['invulnerability'])
+            log.info(effect_desc['invulnerability'])
         elif effect_type == 'rapid_fire':
             duration = 12.0
             self.active_power_ups['rapid_fire'] = {
@@ -173,7 +180,7 @@ class Player(pygame.sprite.Sprite):
                 'duration': duration,
                 'multiplier': 0.3
             }
-            print(effect_desc['rapid_fire'])
+            log.info(effect_desc['rapid_fire'])
         elif effect_type == 'area_attack':
             duration = 15.0
             self.active_power_ups['area_attack'] = {
@@ -181,7 +188,7 @@ class Player(pygame.sprite.Sprite):
                 'duration': duration,
                 'range_multiplier': 1.5
             }
-            print(effect_desc['area_attack'])
+            log.info(effect_desc['area_attack'])
 
     def update_power_ups(self, dt):
         """Update active power up timers"""
@@ -193,7 +200,7 @@ class Player(pygame.sprite.Sprite):
         for effect_name, effect_data in self.active_power_ups.items():
             if current_time - effect_data['start_time'] >= effect_data['duration']:
                 expired_effects.append(effect_name)
-                print(f"⏰ {effect_name.title()} effect expired!")
+                log.info("⏰ %s effect expired!", effect_name.title())
         
         # Remove expired effects
         for effect_name in expired_effects:
@@ -230,7 +237,10 @@ class Player(pygame.sprite.Sprite):
     
 
     def collision(self, direction):
-        col_sprites = pygame.sprite.spritecollide(self, self.collision_sprites, False)
+        if self.collision_index is not None:
+            col_sprites = self.collision_index.query(self.rect)
+        else:
+            col_sprites = pygame.sprite.spritecollide(self, self.collision_sprites, False)
         if col_sprites:
             if direction == 'horizontal':
                 for sprite in col_sprites:
@@ -333,9 +343,10 @@ class Player(pygame.sprite.Sprite):
             distance = (total_move_x**2 + total_move_y**2)**0.5
             self.animation_manager.add_distance_traveled(distance)
         
-        # Keep on screen
-        self.pos_x = max(0, min(1280 - self.rect.width, self.pos_x))
-        self.pos_y = max(0, min(800 - self.rect.height, self.pos_y))
+        # Keep inside the map
+        world = self.world_rect
+        self.pos_x = max(world.left, min(world.right - self.rect.width, self.pos_x))
+        self.pos_y = max(world.top, min(world.bottom - self.rect.height, self.pos_y))
         
         self.rect.x = int(self.pos_x)
         self.collision('horizontal')
@@ -454,7 +465,7 @@ class Player(pygame.sprite.Sprite):
         # Add power for killing enemy
         power_gained = 15  # 15 power per enemy killed
         if self.add_power(power_gained):
-            print(f"Power up triggered! Enemies killed: {self.enemies_killed}")
+            log.debug("Power up triggered! Enemies killed: %s", self.enemies_killed)
 
     def on_wave_completed(self):
         """Called when a wave is completed"""
@@ -504,20 +515,12 @@ class Player(pygame.sprite.Sprite):
                 current_time = self.damage_flash_duration - self.damage_flash_timer
                 blink_cycle = int(current_time / blink_interval) % 2
                 
-                # Apply effect to current animation frame
+                # Swap in the precomputed variant of the current animation frame
                 if blink_cycle == 0:
                     # Completely invisible phase for dramatic effect
                     if self.image:
-                        temp_image = self.image.copy()
-                        temp_image.set_alpha(0)
-                        self.image = temp_image
+                        self.image = effect_variants.get_invisible(self.image)
                 else:
                     # Fully visible with red tint phase
                     if self.image:
-                        temp_image = self.image.copy()
-                        temp_image.set_alpha(255)
-                        # Add red overlay for hurt effect
-                        red_overlay = pygame.Surface(temp_image.get_size(), pygame.SRCALPHA)
-                        red_overlay.fill((255, 50, 50, 120))  # Red tint
-                        temp_image.blit(red_overlay, (0, 0), special_flags=pygame.BLEND_ADD)
-                        self.image = temp_image
\ No newline at end of file
+                        self.image = effect_variants.get_tinted(self.image)
\ No newline at end of file
@@ -14,11 +14,11 @@ class PowerBar:
         self.full_color = (255, 0, 255)   # Magenta when full
         
     def draw(self, surface: pygame.Surface, current_power: int, max_power: int, position: tuple):
-        """Draw power bar at given position"""
+        """Draw power bar at given position; returns the area it covers"""
         x, y = position
         
         # Draw border
-        pygame.draw.rect(surface, self.border_color, 
+        bar_rect = pygame.draw.rect(surface, self.border_color, 
                         (x - self.border_width, y - self.border_width, 
                          self.width + self.border_width * 2, 
                          self.height + self.border_width * 2))
@@ -33,6 +33,7 @@ class PowerBar:
             # Change color based on power level
             color = self.full_color if current_power >= max_power else self.power_color
             pygame.draw.rect(surface, color, (x, y, power_width, self.height))
+        return bar_rect
 
 class PowerSystem:
     def __init__(self, max_power: int = 100):
@@ -85,4 +86,4 @@ class PowerSystem:
         
     def draw(self, surface: pygame.Surface, position: tuple):
         """Draw power bar"""
-        self.power_bar.draw(surface, self.current_power, self.max_power, position) 
\ No newline at end of file
+        return self.power_bar.draw(surface, self.current_power, self.max_power, position) 
\ No newline at end of file
@@ -4,6 +4,103 @@ import math
 import os
 from typing import Dict, List, Tuple
 from utils import LoadSprite
+from atlas_bundle import get_atlas
+from log_system import get_logger
+from render_cache import RotationCache
+from spatial_hash import SpatialHash
+
+log = get_logger('powerups')
+
+# Power-up archetype configurations, shared by every PowerUp and the manager
+POWERUP_CONFIGS = {
+    'health': {
+        'heal_amount': 50,
+        'duration': 0,  # Instant
+        'sprite_path': os.path.join("assets", "UI", "Icons", "Regular_01.png"),
+        'color': (0, 255, 0),
+        'scale': 0.8
+    },
+    'speed': {
+        'speed_multiplier': 1.5,
+        'duration': 10.0,  # 10 seconds
+        'sprite_path': os.path.join("assets", "UI", "Icons", "Regular_02.png"),
+        'color': (0, 255, 255),
+        'scale': 0.8
+    },
+    'damage': {
+        'damage_multiplier': 2.0,
+        'duration': 8.0,  # 8 seconds
+        'sprite_path': os.path.join("UI", "Icons", "Regular_03.png"),
+        'color': (255, 0, 0),
+        'scale': 0.8
+    },
+    'invulnerability': {
+        'duration': 5.0,  # 5 seconds
+        'sprite_path': os.path.join("assets", "UI", "Icons", "Regular_04.png"),
+        'color': (255, 255, 0),
+        'scale': 0.8
+    },
+    'rapid_fire': {
+        'attack_speed_multiplier': 3.0,
+        'duration': 6.0,  # 6 seconds
+        'sprite_path': os.path.join("assets", "UI", "Icons", "Regular_05.png"),
+        'color': (255, 0, 255),
+        'scale': 0.8
+    }
+}
+
+class PowerUpRegistry:
+    """Power-up archetypes: configs plus icon surfaces, loaded once per process"""
+    def __init__(self, configs: Dict[str, Dict], use_atlas: bool = True):
+        self.configs = configs
+        self.use_atlas = use_atlas
+        self.icons: Dict[str, pygame.Surface] = {}
+        self.rotations: Dict[str, RotationCache] = {}
+
+    def get_config(self, powerup_type: str) -> Dict:
+        """Get the shared config for a power-up type"""
+        return self.configs[powerup_type]
+
+    def get_icon(self, powerup_type: str) -> pygame.Surface:
+        """Get the pre-scaled icon for a power-up type (loaded on first use)"""
+        icon = self.icons.get(powerup_type)
+        if icon is None:
+            icon = self._load_icon(self.configs[powerup_type])
+            self.icons[powerup_type] = icon
+        return icon
+
+    def get_rotations(self, powerup_type: str) -> RotationCache:
+        """Get the pre-rotated icons for a power-up type (baked on first use)"""
+        rotations = self.rotations.get(powerup_type)
+        if rotations is None:
+            rotations = RotationCache(self.get_icon(powerup_type), buckets=64)
+            self.rotations[powerup_type] = rotations
+        return rotations
+
+    def _load_icon(self, config: Dict) -> pygame.Surface:
+        """Load and scale an icon, falling back to a colored square"""
+        atlas = get_atlas() if self.use_atlas else None
+        if atlas:
+            icon = atlas.get_image(config['sprite_path'], config['scale'])
+            if icon is not None:
+                return icon
+
+        try:
+            sprite_loader = LoadSprite(config['sprite_path'])
+            return sprite_loader.get_image(0, 0, 64, 64, config['scale'])
+        except:
+            # Fallback to colored rectangle if sprite not found
+            image = pygame.Surface((32, 32))
+            image.fill(config['color'])
+            return image
+
+    def prewarm(self):
+        """Load every icon and its rotations up front so spawns and pickups do no work"""
+        for powerup_type in self.configs:
+            self.get_rotations(powerup_type)
+
+# Shared by PowerUp and PowerUpManager
+powerup_registry = PowerUpRegistry(POWERUP_CONFIGS)
 
 class PowerUp(pygame.sprite.Sprite):
     def __init__(self, powerup_type: str, pos: Tuple[int, int]):
@@ -11,44 +108,8 @@ class PowerUp(pygame.sprite.Sprite):
         self.powerup_type = powerup_type
         
         # Power-up configurations
-        self.configs = {
-            'health': {
-                'heal_amount': 50,
-                'duration': 0,  # Instant
-                'sprite_path': os.path.join("assets", "UI", "Icons", "Regular_01.png"),
-                'color': (0, 255, 0),
-                'scale': 0.8
-            },
-            'speed': {
-                'speed_multiplier': 1.5,
-                'duration': 10.0,  # 10 seconds
-                'sprite_path': os.path.join("assets", "UI", "Icons", "Regular_02.png"),
-                'color': (0, 255, 255),
-                'scale': 0.8
-            },
-            'damage': {
-                'damage_multiplier': 2.0,
-                'duration': 8.0,  # 8 seconds
-                'sprite_path': os.path.join("UI", "Icons", "Regular_03.png"),
-                'color': (255, 0, 0),
-                'scale': 0.8
-            },
-            'invulnerability': {
-                'duration': 5.0,  # 5 seconds
-                'sprite_path': os.path.join("assets", "UI", "Icons", "Regular_04.png"),
-                'color': (255, 255, 0),
-                'scale': 0.8
-            },
-            'rapid_fire': {
-                'attack_speed_multiplier': 3.0,
-                'duration': 6.0,  # 6 seconds
-                'sprite_path': os.path.join("assets", "UI", "Icons", "Regular_05.png"),
-                'color': (255, 0, 255),
-                'scale': 0.8
-            }
-        }
-        
-        self.config = self.configs[powerup_type]
+        self.configs = POWERUP_CONFIGS
+        self.config = powerup_registry.get_config(powerup_type)
         
         # Initialize sprite
         self._init_sprite()
@@ -68,14 +129,10 @@ class PowerUp(pygame.sprite.Sprite):
         
     def _init_sprite(self):
         """Initialize power-up sprite"""
-        try:
-            sprite_loader = LoadSprite(self.config['sprite_path'])
-            self.image = sprite_loader.get_image(0, 0, 64, 64, self.config['scale'])
-        except:
-            # Fallback to colored rectangle if sprite not found
-            self.image = pygame.Surface((32, 32))
-            self.image.fill(self.config['color'])
-            
+        # Icons are shared and never modified, so no copy is needed for rotation
+        self.original_image = powerup_registry.get_icon(self.powerup_type)
+        self.rotations = powerup_registry.get_rotations(self.powerup_type)
+        self.image = self.original_image
         self.rect = self.image.get_rect()
         
     def update(self, dt: float):
@@ -90,18 +147,18 @@ class PowerUp(pygame.sprite.Sprite):
         if self.rotation >= 360:
             self.rotation -= 360
             
-        # Rotate image
-        if hasattr(self, 'original_image'):
-            self.image = pygame.transform.rotate(self.original_image, self.rotation)
-        else:
-            self.original_image = self.image.copy()
-            self.image = pygame.transform.rotate(self.original_image, self.rotation)
+        # Pre-rotated image for the nearest angle bucket
+        self.image = self.rotations.get(self.rotation)
 
 class PowerUpManager:
     def __init__(self, player_ref):
         self.player_ref = player_ref
         self.powerups = pygame.sprite.Group()
+        # Pickup lookup, re-bucketed as power-ups bob
+        self.powerup_hash = SpatialHash()
         self.active_effects = {}
+        # Camera view in world coordinates (Game shares its Camera.rect here)
+        self.camera_rect = pygame.Rect(0, 0, 1280, 720)
         
         # Spawn configuration
         self.spawn_timer = 0.0
@@ -123,6 +180,8 @@ class PowerUpManager:
             
         # Update power-ups
         self.powerups.update(dt)
+        for powerup in self.powerups:
+            self.powerup_hash.update(powerup)
         
         # Update active effects
         self._update_active_effects(dt)
@@ -132,7 +191,7 @@ class PowerUpManager:
         if not self.player_ref:
             return
             
-        spawn_rect = pygame.Rect(200, 200, 900, 400)  # ví dụ: mép phải màn hình
+        spawn_rect = pygame.Rect(200, 200, 900, 400).move(self.camera_rect.topleft)  # Inside the current view
 
         spawn_x = random.uniform(spawn_rect.left, spawn_rect.right)
         spawn_y = random.uniform(spawn_rect.top, spawn_rect.bottom)
@@ -143,6 +202,7 @@ class PowerUpManager:
         # Create power-up
         powerup = PowerUp(powerup_type, (spawn_x, spawn_y))
         self.powerups.add(powerup)
+        self.powerup_hash.insert(powerup)
         
     def _update_active_effects(self, dt: float):
         """Update active power-up effects"""
@@ -175,7 +235,7 @@ class PowerUpManager:
             
     def apply_powerup(self, powerup_type: str):
         """Apply a power-up effect"""
-        config = PowerUp(powerup_type, (0, 0)).config
+        config = powerup_registry.get_config(powerup_type)
         
         if powerup_type == 'health':
             # Instant heal
@@ -217,9 +277,10 @@ class PowerUpManager:
         """Get currently active effects"""
         return self.active_effects.copy()
         
-    def draw(self, surface: pygame.Surface):
-        """Draw all power-ups"""
-        self.powerups.draw(surface)
+    def queue_draw(self, queue):
+        """Queue all power-ups on a RenderQueue"""
+        for powerup in self.powerups:
+            queue.add_sprite(powerup)
         
     def check_collisions(self):
         """Check for collisions between player and power-ups"""
@@ -227,14 +288,17 @@ class PowerUpManager:
             return
             
         # Get colliding power-ups
-        colliding_powerups = pygame.sprite.spritecollide(self.player_ref, self.powerups, True)
+        colliding_powerups = self.powerup_hash.query_rect(self.player_ref.rect)
         
         # Apply effects
         for powerup in colliding_powerups:
+            powerup.kill()
+            self.powerup_hash.remove(powerup)
             self.apply_powerup(powerup.powerup_type)
-            print(f"Applied power-up: {powerup.powerup_type}")
+            log.debug("Applied power-up: %s", powerup.powerup_type)
             
     def clear_powerups(self):
         """Clear all power-ups"""
         self.powerups.empty()
+        self.powerup_hash.clear()
         self.active_effects.clear() 
\ No newline at end of file
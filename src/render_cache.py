@@ -0,0 +1,109 @@
+import pygame
+from typing import Dict, List, Optional
+
+class RotationCache:
+    """Pre-rotated copies of one image, baked once into N angle buckets.
+
+    get(angle) returns the nearest rotated surface, so callers only re-center
+    their rect on it instead of rotating every frame.
+    """
+    def __init__(self, image: pygame.Surface, buckets: int = 64):
+        self.buckets = buckets
+        self.step = 360.0 / buckets
+        self.frames: List[pygame.Surface] = []
+
+        has_display = pygame.display.get_surface() is not None
+        for index in range(buckets):
+            rotated = pygame.transform.rotate(image, index * self.step)
+            if has_display:
+                rotated = rotated.convert_alpha() if rotated.get_flags() & pygame.SRCALPHA else rotated.convert()
+            self.frames.append(rotated)
+
+    def bucket(self, angle: float) -> int:
+        """Get the bucket index nearest to an angle in degrees (counter-clockwise)"""
+        return int(round(angle / self.step)) % self.buckets
+
+    def get(self, angle: float) -> pygame.Surface:
+        """Get the rotated surface for an angle"""
+        return self.frames[self.bucket(angle)]
+
+class EffectVariantCache:
+    """Effect variants of animation frames, built once per source frame.
+
+    Frames come from AnimationLibrary and are shared by every sprite of an
+    archetype, so variants are keyed by the frame surface itself:
+      tinted    - red hurt-flash tint
+      invisible - blank phase of the hurt blink
+      death     - rotated, shrunk and faded frames, one per progress bucket
+    """
+    def __init__(self, death_buckets: int = 30, tint_color=(255, 50, 50, 120),
+                 death_rotation: float = 360.0, death_end_scale: float = 0.5):
+        self.death_buckets = death_buckets
+        self.tint_color = tint_color
+        self.death_rotation = death_rotation
+        self.death_end_scale = death_end_scale
+        self.tinted: Dict[pygame.Surface, pygame.Surface] = {}
+        self.invisible: Dict[pygame.Surface, pygame.Surface] = {}
+        self.death_frames: Dict[pygame.Surface, List[Optional[pygame.Surface]]] = {}
+
+    def get_tinted(self, frame: pygame.Surface) -> pygame.Surface:
+        """Get the frame with the hurt-flash tint added"""
+        tinted = self.tinted.get(frame)
+        if tinted is None:
+            tinted = frame.copy()
+            tinted.set_alpha(255)
+            overlay = pygame.Surface(tinted.get_size(), pygame.SRCALPHA)
+            overlay.fill(self.tint_color)
+            tinted.blit(overlay, (0, 0), special_flags=pygame.BLEND_ADD)
+            self.tinted[frame] = tinted
+        return tinted
+
+    def get_invisible(self, frame: pygame.Surface) -> pygame.Surface:
+        """Get a fully transparent copy of the frame (same size, draws nothing)"""
+        invisible = self.invisible.get(frame)
+        if invisible is None:
+            invisible = frame.copy()
+            invisible.set_alpha(0)
+            self.invisible[frame] = invisible
+        return invisible
+
+    def death_bucket(self, progress: float) -> int:
+        """Get the death-sequence bucket for a progress in [0, 1)"""
+        return max(0, min(self.death_buckets - 1, int(progress * self.death_buckets)))
+
+    def get_death_frame(self, frame: pygame.Surface, progress: float) -> Optional[pygame.Surface]:
+        """Get the death-sequence frame for a progress in [0, 1), or None if it scales to nothing"""
+        frames = self.death_frames.get(frame)
+        if frames is None:
+            frames = [None] * self.death_buckets
+            self.death_frames[frame] = frames
+        bucket = self.death_bucket(progress)
+        variant = frames[bucket]
+        if variant is None:
+            variant = self._build_death_frame(frame, bucket / self.death_buckets)
+            frames[bucket] = variant
+        return variant
+
+    def _build_death_frame(self, frame: pygame.Surface, progress: float) -> Optional[pygame.Surface]:
+        rotated = pygame.transform.rotate(frame, progress * self.death_rotation)
+        scale = 1.0 - progress * (1.0 - self.death_end_scale)
+        width = int(rotated.get_width() * scale)
+        height = int(rotated.get_height() * scale)
+        if width <= 0 or height <= 0:
+            return None
+        scaled = pygame.transform.scale(rotated, (width, height))
+        alpha = int(255 * (1.0 - progress))
+        if alpha < 255:
+            alpha_surface = pygame.Surface(scaled.get_size(), pygame.SRCALPHA)
+            alpha_surface.fill((255, 255, 255, alpha))
+            scaled.blit(alpha_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+        return scaled
+
+    def clear(self):
+        """Drop every variant (e.g. after the animation library is cleared)"""
+        self.tinted.clear()
+        self.invisible.clear()
+        self.death_frames.clear()
+
+# Shared by the player and all enemies
+effect_variants = EffectVariantCache()
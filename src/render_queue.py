@@ -0,0 +1,104 @@
+import pygame
+from operator import itemgetter
+from typing import List, Optional
+
+# Depth for things drawn above every y-sorted sprite (health bars)
+OVERLAY_DEPTH = float('inf')
+# Sprites that moved further than this in one step (respawns) are not interpolated
+MAX_INTERPOLATION_DISTANCE = 64
+
+_by_depth = itemgetter(0)
+
+class RenderQueue:
+    """Collects one frame's sprites, y-sorts them and draws them in one Surface.blits call.
+
+    Depth is normally the bottom of the sprite's rect, so sprites lower on the
+    screen are drawn in front. Items with equal depth keep the order they were
+    queued in. flush() returns the rects of tracked items plus any extra dirty
+    rects, for the dirty-rect renderer.
+
+    Positions are in world coordinates. With a view set (the camera rect),
+    items outside it are dropped and the rest are shifted to screen space
+    as they are queued. Sprites with a prev_topleft (stored before the last
+    simulation step) are drawn between that and their rect by set_interpolation.
+    """
+    def __init__(self):
+        self.items = []  # (depth, surface, screen position, tracked)
+        self.extra_rects: List[pygame.Rect] = []
+        self.view: Optional[pygame.Rect] = None
+        self.alpha = 1.0
+
+    def set_interpolation(self, alpha: float):
+        """Set how far (0..1) between the previous and current step sprites are drawn"""
+        self.alpha = alpha
+
+    def interpolated_topleft(self, sprite: pygame.sprite.Sprite):
+        """Get the world top-left to draw a sprite at"""
+        rect = sprite.rect
+        prev = getattr(sprite, 'prev_topleft', None)
+        if prev is None or self.alpha >= 1.0:
+            return rect.topleft
+        dx = rect.x - prev[0]
+        dy = rect.y - prev[1]
+        if (not dx and not dy) or abs(dx) + abs(dy) > MAX_INTERPOLATION_DISTANCE:
+            return rect.topleft
+        return (round(prev[0] + dx * self.alpha), round(prev[1] + dy * self.alpha))
+
+    def set_view(self, view: Optional[pygame.Rect]):
+        """Set the world area shown on screen (None: no culling, world == screen)"""
+        self.view = view
+
+    def is_visible(self, rect: pygame.Rect) -> bool:
+        """Check whether a world rect intersects the view"""
+        return self.view is None or self.view.colliderect(rect)
+
+    def add(self, surface: pygame.Surface, dest, depth: float, tracked: bool = True):
+        """Queue a surface at dest (a world position or rect)"""
+        view = self.view
+        if view is not None:
+            x, y = dest[0], dest[1]
+            width, height = surface.get_size()
+            if x >= view.right or y >= view.bottom or x + width <= view.left or y + height <= view.top:
+                return
+            dest = (x - view.x, y - view.y)
+        self.items.append((depth, surface, dest, tracked))
+
+    def add_sprite(self, sprite: pygame.sprite.Sprite, depth: Optional[float] = None):
+        """Queue a sprite's image at its (interpolated) rect, y-sorted by its bottom edge"""
+        self.add(sprite.image, self.interpolated_topleft(sprite), sprite.rect.bottom if depth is None else depth)
+
+    def add_blits(self, blit_sequence, depth: float):
+        """Queue untracked (surface, position) pairs at one depth; report their area with add_dirty_rect.
+
+        Pairs are not culled one by one; check the batch with is_visible first.
+        """
+        view = self.view
+        if view is None:
+            self.items.extend((depth, surface, dest, False) for surface, dest in blit_sequence)
+        else:
+            view_x, view_y = view.x, view.y
+            self.items.extend((depth, surface, (dest[0] - view_x, dest[1] - view_y), False)
+                              for surface, dest in blit_sequence)
+
+    def add_dirty_rect(self, rect: pygame.Rect):
+        """Report a changed world area that the queued items do not report themselves"""
+        if self.view is not None:
+            rect = rect.move(-self.view.x, -self.view.y)
+        self.extra_rects.append(rect)
+
+    def get_pending_rects(self) -> List[pygame.Rect]:
+        """Get the screen rects flush() will report, before drawing anything"""
+        rects = [pygame.Rect(dest[0], dest[1], *surface.get_size())
+                 for _, surface, dest, tracked in self.items if tracked]
+        return rects + self.extra_rects
+
+    def flush(self, target: pygame.Surface) -> List[pygame.Rect]:
+        """Draw everything in depth order and empty the queue; returns the rects drawn"""
+        items = self.items
+        items.sort(key=_by_depth)
+        drawn = target.blits([(surface, dest) for _, surface, dest, _ in items])
+        rects = [rect for rect, item in zip(drawn, items) if item[3]]
+        rects += self.extra_rects
+        self.items = []
+        self.extra_rects = []
+        return rects
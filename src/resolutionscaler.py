@@ -1,12 +1,41 @@
 # resolutionscaler.py
 import pygame
 import os
+import sys
+import time
 import platform
+import math
+from log_system import get_logger
+
+log = get_logger('scaler')
+
+# Upscaling modes:
+#   legacy   - transform.scale into a new surface every frame, then blit (original path)
+#   prealloc - scale straight into the display (or a preallocated surface), no per-frame allocation
+#   integer  - largest whole-number multiple that fits, letterboxed (scale2x for 2x), pixel-perfect
+#   sdl      - logic-sized display with SDL's SCALED flag; SDL/GPU stretches it
+SCALER_MODES = ('legacy', 'prealloc', 'integer', 'sdl')
+DEFAULT_SCALER_MODE = 'prealloc'
+SCALER_MODE_ENV = "TSS_SCALER_MODE"
+
+def get_scaler_mode(argv=None, environ=None):
+    """Pick the scaler mode from --scaler=MODE or TSS_SCALER_MODE"""
+    argv = sys.argv if argv is None else argv
+    environ = os.environ if environ is None else environ
+    mode = environ.get(SCALER_MODE_ENV, DEFAULT_SCALER_MODE)
+    for arg in argv:
+        if arg.startswith('--scaler='):
+            mode = arg.split('=', 1)[1]
+    if mode not in SCALER_MODES:
+        log.warning("Unknown scaler mode '%s', using %s (choices: %s)", mode, DEFAULT_SCALER_MODE, ', '.join(SCALER_MODES))
+        mode = DEFAULT_SCALER_MODE
+    return mode
 
 class ResolutionScalerFullScreenStretch:
-    def __init__(self, logic_width, logic_height):
+    def __init__(self, logic_width, logic_height, mode=None):
         self.logic_width = logic_width
         self.logic_height = logic_height
+        self.mode = mode or get_scaler_mode()
 
         # Detect platform
         self.platform = self._detect_platform()
@@ -23,6 +52,25 @@ class ResolutionScalerFullScreenStretch:
         self.scale_x = self.screen_width / self.logic_width
         self.scale_y = self.screen_height / self.logic_height
 
+        # Integer mode: offset and factor of the letterboxed image
+        self.integer_factor = 1
+        self.offset = (0, 0)
+        self.scaled_surface = None  # Preallocated scale destination (when needed)
+
+        if self.mode == 'sdl':
+            try:
+                # SDL stretches a logic-sized display; draw straight into it
+                self.display_surface = pygame.display.set_mode((self.logic_width, self.logic_height),
+                                                               pygame.FULLSCREEN | pygame.SCALED)
+                self.screen = self.display_surface
+                pygame.display.set_caption("Full Screen Game")
+                self.logic_surface = self.display_surface
+                return
+            except pygame.error as e:
+                # No accelerated renderer available (e.g. headless)
+                log.info("SDL scaled mode unavailable (%s), using prealloc scaling", e)
+                self.mode = 'prealloc'
+
         # Set up the display mode based on platform
         self._setup_display_mode()
 
@@ -32,6 +80,12 @@ class ResolutionScalerFullScreenStretch:
         self.logic_surface = pygame.Surface((self.logic_width, self.logic_height))
 
         self.display_surface = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        self.screen = self.display_surface
+
+        if self.mode != 'legacy':
+            # Same pixel format as the display, so scaling can write into it directly
+            self.logic_surface = self.logic_surface.convert()
+            self._setup_scale_target()
 
     def _detect_platform(self):
         """Detect the current platform"""
@@ -82,11 +136,41 @@ class ResolutionScalerFullScreenStretch:
 
         self.screen = pygame.display.set_mode((self.screen_width, self.screen_height), flags)
 
+    def _setup_scale_target(self):
+        """Preallocate whatever the selected mode scales into"""
+        display_w, display_h = self.screen.get_size()
+        if self.mode == 'integer' and (display_w < self.logic_width or display_h < self.logic_height):
+            log.info("Display is smaller than the logic surface, using prealloc scaling")
+            self.mode = 'prealloc'
+        if self.mode == 'integer':
+            self.integer_factor = max(1, min(display_w // self.logic_width, display_h // self.logic_height))
+            scaled_size = (self.logic_width * self.integer_factor, self.logic_height * self.integer_factor)
+            self.offset = ((display_w - scaled_size[0]) // 2, (display_h - scaled_size[1]) // 2)
+            if self.integer_factor > 1:
+                self.scaled_surface = pygame.Surface(scaled_size, 0, self.logic_surface)
+            self.screen.fill((0, 0, 0))  # Letterbox bars
+        elif not self._can_scale_into(self.screen, (self.screen_width, self.screen_height)):
+            self.scaled_surface = pygame.Surface((self.screen_width, self.screen_height), 0, self.logic_surface)
+
+    def _can_scale_into(self, dest, size):
+        """transform.scale can only write into a surface of the same size and format"""
+        return (dest.get_size() == size and dest.get_bitsize() == self.logic_surface.get_bitsize()
+                and dest.get_masks() == self.logic_surface.get_masks())
+
     def begin_frame(self):
         self.logic_surface.fill((0, 0, 0))
         return self.logic_surface
 
     def end_frame(self):
+        if self.mode == 'sdl':
+            pygame.display.flip()
+            return
+        if self.mode == 'prealloc':
+            self._end_frame_prealloc()
+            return
+        if self.mode == 'integer':
+            self._end_frame_integer()
+            return
         try:
             if self.platform in ['android', 'ios']:
                 # Use smoothscale for mobile platforms
@@ -100,11 +184,89 @@ class ResolutionScalerFullScreenStretch:
             self.screen.blit(scaled, (0, 0))
             pygame.display.flip()
         except pygame.error as e:
-            print(f"Scaling error: {e}")
+            log.warning("Scaling error: %s", e)
             # Fallback to direct blit if scaling fails
             self.screen.blit(self.logic_surface, (0, 0))
             pygame.display.flip()
 
+    def _scale_into(self, source, size, dest):
+        if self.platform in ['android', 'ios']:
+            pygame.transform.smoothscale(source, size, dest)
+        else:
+            pygame.transform.scale(source, size, dest)
+
+    def _end_frame_prealloc(self):
+        """Scale into the display (or the preallocated surface) without allocating"""
+        size = (self.screen_width, self.screen_height)
+        try:
+            if self.scaled_surface is None:
+                self._scale_into(self.logic_surface, size, self.screen)
+            else:
+                self._scale_into(self.logic_surface, size, self.scaled_surface)
+                self.screen.blit(self.scaled_surface, (0, 0))
+            pygame.display.flip()
+        except (pygame.error, ValueError) as e:
+            log.warning("Scaling error: %s, falling back to legacy scaling", e)
+            self.mode = 'legacy'
+            self.end_frame()
+
+    def _end_frame_integer(self):
+        """Pixel-perfect whole-number scaling, centered"""
+        if self.integer_factor == 1:
+            self.screen.blit(self.logic_surface, self.offset)
+        elif self.integer_factor == 2:
+            pygame.transform.scale2x(self.logic_surface, self.scaled_surface)
+            self.screen.blit(self.scaled_surface, self.offset)
+        else:
+            pygame.transform.scale(self.logic_surface, self.scaled_surface.get_size(), self.scaled_surface)
+            self.screen.blit(self.scaled_surface, self.offset)
+        pygame.display.flip()
+
+    def end_frame_rects(self, rects):
+        """Scale and present only the given logic-surface rects"""
+        if self.mode == 'sdl':
+            pygame.display.update(rects)
+            return
+        if self.mode == 'integer':
+            self._end_frame_rects_integer(rects)
+            return
+        screen_rects = []
+        for rect in rects:
+            left = int(rect.left * self.scale_x)
+            top = int(rect.top * self.scale_y)
+            right = int(math.ceil(rect.right * self.scale_x))
+            bottom = int(math.ceil(rect.bottom * self.scale_y))
+            if right <= left or bottom <= top:
+                continue
+            region = self.logic_surface.subsurface(rect)
+            try:
+                if self.platform in ['android', 'ios']:
+                    scaled = pygame.transform.smoothscale(region, (right - left, bottom - top))
+                else:
+                    scaled = pygame.transform.scale(region, (right - left, bottom - top))
+            except pygame.error as e:
+                log.warning("Scaling error: %s", e)
+                self.end_frame()
+                return
+            screen_rects.append(self.screen.blit(scaled, (left, top)))
+        if screen_rects:
+            pygame.display.update(screen_rects)
+
+    def _end_frame_rects_integer(self, rects):
+        factor = self.integer_factor
+        offset_x, offset_y = self.offset
+        screen_rects = []
+        for rect in rects:
+            region = self.logic_surface.subsurface(rect)
+            if factor == 2:
+                region = pygame.transform.scale2x(region)  # Match the full-frame path
+            elif factor > 1:
+                region = pygame.transform.scale(region, (rect.width * factor, rect.height * factor))
+            screen_rects.append(self.screen.blit(region, (offset_x + rect.left * factor,
+                                                          offset_y + rect.top * factor)))
+        if screen_rects:
+            pygame.display.update(screen_rects)
+
     def get_logic_surface(self):
         return self.logic_surface
 
@@ -130,7 +292,38 @@ class ResolutionScalerFullScreenStretch:
 
     def screen_to_logic(self, pos):
         """Chuyển đổi tọa độ từ màn hình thật về logic surface"""
+        if self.mode == 'sdl':
+            # SDL already reports mouse positions in logic coordinates
+            return (int(pos[0]), int(pos[1]))
+        if self.mode == 'integer':
+            return (int((pos[0] - self.offset[0]) // self.integer_factor),
+                    int((pos[1] - self.offset[1]) // self.integer_factor))
         screen_w, screen_h = self.display_surface.get_size()
         logic_x = int(pos[0] * self.logic_width / screen_w)
         logic_y = int(pos[1] * self.logic_height / screen_h)
         return (logic_x, logic_y)
+
+def benchmark_scaler_modes(logic_width=1280, logic_height=720, frames=120, modes=SCALER_MODES):
+    """Time end_frame for each mode on this machine; returns {mode: ms per frame}"""
+    results = {}
+    for mode in modes:
+        scaler = ResolutionScalerFullScreenStretch(logic_width, logic_height, mode=mode)
+        surface = scaler.begin_frame()
+        # Something to scale that is not a flat color
+        for i in range(0, logic_width, 40):
+            pygame.draw.rect(surface, ((i * 7) % 255, (i * 3) % 255, 128), (i, (i * 5) % logic_height, 40, 60))
+        scaler.end_frame()  # Warm up
+
+        start = time.perf_counter()
+        for _ in range(frames):
+            scaler.end_frame()
+        results[mode] = (time.perf_counter() - start) * 1000 / frames
+        used = mode if scaler.mode == mode else f"{mode}->{scaler.mode}"
+        print(f"{used:<20}{results[mode]:>8.2f} ms/frame  (display {scaler.screen.get_size()[0]}x{scaler.screen.get_size()[1]})")
+    return results
+
+if __name__ == "__main__":
+    # python src/resolutionscaler.py [frames]
+    pygame.init()
+    benchmark_scaler_modes(frames=int(sys.argv[1]) if len(sys.argv) > 1 else 120)
+    pygame.quit()
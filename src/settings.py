@@ -1,4 +1,21 @@
 WIDTH = 1280
 HEIGHT = 800
 
-FPS = 60
\ No newline at end of file
+FPS = 60
+
+# Redraw and present only changed screen regions while playing
+# (also enabled with --dirty-rects or TSS_DIRTY_RECTS=1)
+DIRTY_RECTS = False
+
+# Draw the map's collision obstacles over the world
+# (also enabled with --debug-collision or TSS_DEBUG_COLLISION=1)
+DEBUG_COLLISION = False
+
+# Fixed simulation rate (steps per second); rendering interpolates between steps
+SIM_RATE = 120
+# Most simulation steps run per rendered frame; the rest of a long stall is dropped
+MAX_SIM_STEPS = 8
+
+# Pre-render animated map tiles once per distinct animation frame (skipped if the
+# frames would not fit in map_loader.ANIMATION_BAKE_BUDGET)
+BAKE_MAP_ANIMATIONS = False
@@ -0,0 +1,158 @@
+import pygame
+from typing import Dict, Iterable, List, Tuple
+
+def _cell_keys(rect: pygame.Rect, size: int) -> List[Tuple[int, int]]:
+    """Get the (column, row) keys of the grid cells a rect overlaps"""
+    # A zero-size rect still occupies the cell it sits in
+    right = rect.right - 1 if rect.width > 0 else rect.right
+    bottom = rect.bottom - 1 if rect.height > 0 else rect.bottom
+    return [(cell_x, cell_y)
+            for cell_x in range(rect.left // size, right // size + 1)
+            for cell_y in range(rect.top // size, bottom // size + 1)]
+
+class SpatialHash:
+    """Uniform grid that buckets items by the cells their rects overlap.
+
+    Items are anything with a rect (sprites). Cells hold candidates only:
+    queries test each candidate's current rect, so an item that moved a
+    little since it was inserted is still matched correctly near where it
+    was bucketed. Rebuild (or update) once per tick to keep buckets fresh.
+    """
+    def __init__(self, cell_size: int = 128):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], List] = {}
+        self.item_cells: Dict[object, List[Tuple[int, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.item_cells)
+
+    def clear(self):
+        """Remove every item"""
+        self.cells.clear()
+        self.item_cells.clear()
+
+    def insert(self, item):
+        """Add an item under the cells its rect overlaps"""
+        keys = _cell_keys(item.rect, self.cell_size)
+        self.item_cells[item] = keys
+        cells = self.cells
+        for key in keys:
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [item]
+            else:
+                bucket.append(item)
+
+    def remove(self, item):
+        """Remove an item (no-op if it is not in the hash)"""
+        keys = self.item_cells.pop(item, None)
+        if keys is None:
+            return
+        for key in keys:
+            bucket = self.cells[key]
+            bucket.remove(item)
+            if not bucket:
+                del self.cells[key]
+
+    def update(self, item):
+        """Re-bucket an item after it moved; cheap when it stays in the same cells"""
+        keys = self.item_cells.get(item)
+        if keys is not None and keys == _cell_keys(item.rect, self.cell_size):
+            return
+        self.remove(item)
+        self.insert(item)
+
+    def build(self, items: Iterable):
+        """Replace the contents with items"""
+        self.clear()
+        for item in items:
+            self.insert(item)
+
+    def _candidates(self, rect: pygame.Rect) -> List:
+        cells = self.cells
+        keys = _cell_keys(rect, self.cell_size)
+        if len(keys) == 1:
+            return cells.get(keys[0], ())
+        candidates = []
+        seen = set()
+        for key in keys:
+            for item in cells.get(key, ()):
+                if item not in seen:
+                    seen.add(item)
+                    candidates.append(item)
+        return candidates
+
+    def query_rect(self, rect: pygame.Rect) -> List:
+        """Get the items whose rects overlap rect"""
+        return [item for item in self._candidates(rect) if rect.colliderect(item.rect)]
+
+    def query_radius(self, pos: Tuple[float, float], radius: float) -> List:
+        """Get the items whose rect centers lie within radius of pos"""
+        x, y = pos
+        area = pygame.Rect(int(x - radius), int(y - radius), int(radius * 2) + 2, int(radius * 2) + 2)
+        radius_sq = radius * radius
+        neighbors = []
+        for item in self._candidates(area):
+            center_x, center_y = item.rect.center
+            if (center_x - x) ** 2 + (center_y - y) ** 2 <= radius_sq:
+                neighbors.append(item)
+        return neighbors
+
+class CollisionIndex:
+    """Static broadphase for obstacles that never move (the map's collision objects).
+
+    Built once; each cell keeps the indices and rects of the obstacles
+    overlapping it, tested with one Rect.collidelistall call. Small sets are
+    scanned linearly instead, which is faster below linear_scan_limit.
+    query() returns obstacles in the order they were given, so collision
+    response matches a spritecollide() over the full group.
+    """
+    def __init__(self, obstacles: Iterable = (), cell_size: int = 128, linear_scan_limit: int = 200):
+        self.cell_size = cell_size
+        self.linear_scan_limit = linear_scan_limit
+        self.obstacles: List = list(obstacles)
+        self.rects: List[pygame.Rect] = [obstacle.rect for obstacle in self.obstacles]
+        # cell -> (obstacle indices, their rects)
+        self.cells: Dict[Tuple[int, int], Tuple[List[int], List[pygame.Rect]]] = {}
+        for index, rect in enumerate(self.rects):
+            for key in _cell_keys(rect, cell_size):
+                indices, rects = self.cells.setdefault(key, ([], []))
+                indices.append(index)
+                rects.append(rect)
+
+    def __len__(self) -> int:
+        return len(self.obstacles)
+
+    def query(self, rect: pygame.Rect) -> List:
+        """Get the obstacles overlapping rect"""
+        obstacles = self.obstacles
+        if len(obstacles) <= self.linear_scan_limit:
+            return [obstacles[index] for index in rect.collidelistall(self.rects)]
+
+        cells = self.cells
+        keys = _cell_keys(rect, self.cell_size)
+        if len(keys) == 1:
+            entry = cells.get(keys[0])
+            if entry is None:
+                return []
+            indices, rects = entry
+            return [obstacles[indices[hit]] for hit in rect.collidelistall(rects)]
+
+        found = set()
+        for key in keys:
+            entry = cells.get(key)
+            if entry is not None:
+                indices, rects = entry
+                found.update(indices[hit] for hit in rect.collidelistall(rects))
+        return [obstacles[index] for index in sorted(found)]
+
+    def collides(self, rect: pygame.Rect) -> bool:
+        """Check whether rect overlaps any obstacle"""
+        if len(self.obstacles) <= self.linear_scan_limit:
+            return rect.collidelist(self.rects) != -1
+        cells = self.cells
+        for key in _cell_keys(rect, self.cell_size):
+            entry = cells.get(key)
+            if entry is not None and rect.collidelist(entry[1]) != -1:
+                return True
+        return False
@@ -0,0 +1,207 @@
+import os
+import sys
+import json
+import time
+import platform
+import threading
+from typing import Dict, List, Optional
+
+# Startup profiling mode.
+#
+# Enable with the --profile-startup flag or TSS_PROFILE_STARTUP=1. Phases are
+# timed with `with profiler.phase("name"):` and nest per thread, so work done
+# by the asset loader threads shows up under its own thread. When loading is
+# done the game writes a text and a JSON report (to TSS_PROFILE_DIR, default
+# "profiles/"). Compare two JSON reports with:
+#     python src/startup_profiler.py old.json new.json
+
+PROFILE_FLAG = "--profile-startup"
+PROFILE_ENV = "TSS_PROFILE_STARTUP"
+PROFILE_DIR_ENV = "TSS_PROFILE_DIR"
+REPORT_VERSION = 1
+
+class _NullPhase:
+    """Context manager used when profiling is off"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_PHASE = _NullPhase()
+
+class _Phase:
+    """One timed node in the phase tree"""
+    def __init__(self, profiler, name: str):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+        self.duration = 0.0
+        self.children: List['_Phase'] = []
+
+    def __enter__(self):
+        self.profiler._push(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        self.profiler._pop(self)
+        return False
+
+    def to_dict(self, origin: float) -> Dict:
+        return {
+            'name': self.name,
+            'start_ms': round((self.start - origin) * 1000, 3),
+            'duration_ms': round(self.duration * 1000, 3),
+            'children': [child.to_dict(origin) for child in self.children]
+        }
+
+class StartupProfiler:
+    """Hierarchical, thread-aware timer for the load phases of the game"""
+    def __init__(self):
+        self.enabled = False
+        self.origin = time.perf_counter()
+        self.roots: Dict[str, List[_Phase]] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.report_written = False
+
+    def configure(self, argv: List[str] = None, environ: Dict[str, str] = None):
+        """Enable profiling if requested on the command line or environment"""
+        argv = sys.argv if argv is None else argv
+        environ = os.environ if environ is None else environ
+        if PROFILE_FLAG in argv or environ.get(PROFILE_ENV, "").lower() in ("1", "true", "yes"):
+            self.enable()
+
+    def enable(self):
+        """Start collecting phases"""
+        self.enabled = True
+        self.origin = time.perf_counter()
+
+    def phase(self, name: str):
+        """Time a block: `with profiler.phase("name"): ...`"""
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def _stack(self) -> List[_Phase]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _attach(self, node: _Phase):
+        stack = self._stack()
+        if stack:
+            stack[-1].children.append(node)
+        else:
+            with self._lock:
+                self.roots.setdefault(threading.current_thread().name, []).append(node)
+
+    def _push(self, node: _Phase):
+        self._attach(node)
+        self._stack().append(node)
+
+    def _pop(self, node: _Phase):
+        stack = self._stack()
+        if stack and stack[-1] is node:
+            stack.pop()
+
+    def to_dict(self) -> Dict:
+        """Build the JSON report"""
+        with self._lock:
+            threads = {name: [node.to_dict(self.origin) for node in nodes]
+                       for name, nodes in self.roots.items()}
+        try:
+            import pygame
+            pygame_version = pygame.version.ver
+        except ImportError:
+            pygame_version = None
+        return {
+            'version': REPORT_VERSION,
+            'created': time.strftime("%Y-%m-%d %H:%M:%S"),
+            'python': platform.python_version(),
+            'pygame': pygame_version,
+            'platform': platform.platform(),
+            'wall_time_ms': round((time.perf_counter() - self.origin) * 1000, 3),
+            'threads': threads
+        }
+
+    def format_text(self, report: Dict = None) -> str:
+        """Build the human readable report"""
+        report = report or self.to_dict()
+        lines = [f"Startup profile ({report['created']}, wall {report['wall_time_ms']:.1f} ms)"]
+
+        def add_node(node, depth):
+            label = "  " * depth + node['name']
+            lines.append(f"{label:<56}{node['duration_ms']:>10.1f} ms")
+            for child in node['children']:
+                add_node(child, depth + 1)
+
+        for thread_name, nodes in report['threads'].items():
+            lines.append(f"[{thread_name}]")
+            for node in nodes:
+                add_node(node, 1)
+        return "\n".join(lines)
+
+    def write_report(self, directory: str = None) -> Optional[str]:
+        """Write text and JSON reports; returns the JSON path"""
+        if not self.enabled:
+            return None
+        directory = directory or os.environ.get(PROFILE_DIR_ENV, "profiles")
+        os.makedirs(directory, exist_ok=True)
+        report = self.to_dict()
+        base = os.path.join(directory, "startup-" + time.strftime("%Y%m%d-%H%M%S"))
+        text = self.format_text(report)
+        with open(base + ".txt", 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+        with open(base + ".json", 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        self.report_written = True
+        print(text)
+        print(f"Startup profile written to {base}.txt and {base}.json")
+        return base + ".json"
+
+def flatten_report(report: Dict) -> Dict[str, float]:
+    """Map 'thread/phase/child' paths to total milliseconds"""
+    totals = {}
+
+    def add_node(node, prefix):
+        path = f"{prefix}/{node['name']}"
+        totals[path] = totals.get(path, 0.0) + node['duration_ms']
+        for child in node['children']:
+            add_node(child, path)
+
+    for thread_name, nodes in report['threads'].items():
+        # Worker thread names carry an index that differs between runs
+        thread_key = thread_name.rsplit('_', 1)[0]
+        for node in nodes:
+            add_node(node, thread_key)
+    return totals
+
+def compare_reports(old: Dict, new: Dict) -> str:
+    """Format per-phase deltas between two JSON reports"""
+    old_totals = flatten_report(old)
+    new_totals = flatten_report(new)
+    lines = [f"{'phase':<64}{'old ms':>10}{'new ms':>10}{'delta':>10}"]
+    for path in sorted(set(old_totals) | set(new_totals)):
+        old_ms = old_totals.get(path, 0.0)
+        new_ms = new_totals.get(path, 0.0)
+        lines.append(f"{path:<64}{old_ms:>10.1f}{new_ms:>10.1f}{new_ms - old_ms:>+10.1f}")
+    lines.append(f"{'wall time':<64}{old['wall_time_ms']:>10.1f}{new['wall_time_ms']:>10.1f}"
+                 f"{new['wall_time_ms'] - old['wall_time_ms']:>+10.1f}")
+    return "\n".join(lines)
+
+# Shared by every module that wants to time a load phase
+profiler = StartupProfiler()
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python src/startup_profiler.py old.json new.json")
+        sys.exit(1)
+    with open(sys.argv[1], encoding='utf-8') as f:
+        old_report = json.load(f)
+    with open(sys.argv[2], encoding='utf-8') as f:
+        new_report = json.load(f)
+    print(compare_reports(old_report, new_report))
@@ -0,0 +1,83 @@
+import pygame
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+class FontRegistry:
+    """Shared fonts, created once per (name, size)"""
+    def __init__(self):
+        self.fonts: Dict[Tuple[Optional[str], int], pygame.font.Font] = {}
+
+    def get(self, size: int, name: Optional[str] = None) -> pygame.font.Font:
+        """Get the font for a size (name None is pygame's default font)"""
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pygame.font.Font(name, size)
+            self.fonts[key] = font
+        return font
+
+    def clear(self):
+        """Drop all fonts (call before pygame.font.quit)"""
+        self.fonts.clear()
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by (font, text, color).
+
+    Returned surfaces are shared, so callers must not draw on them.
+    """
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.entries: 'OrderedDict[tuple, pygame.Surface]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, font: pygame.font.Font, text: str, color, antialias: bool = True) -> pygame.Surface:
+        """Get the rendered text, rendering it only on a cache miss"""
+        key = (font, text, tuple(color), antialias)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.entries[key] = surface
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def clear(self):
+        """Drop every cached surface"""
+        self.entries.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache size, hits, misses and evictions"""
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+class TextLabel:
+    """Retained text element; re-renders only when its text changes"""
+    def __init__(self, font: pygame.font.Font, color, cache: 'TextCache' = None):
+        self.font = font
+        self.color = color
+        self.cache = cache or text_cache
+        self.text = None
+        self.surface = None
+
+    def set_text(self, text: str) -> pygame.Surface:
+        """Update the text and get the surface to blit"""
+        if text != self.text:
+            self.text = text
+            self.surface = self.cache.render(self.font, text, self.color)
+        return self.surface
+
+# Shared by all UI screens
+fonts = FontRegistry()
+text_cache = TextCache()
@@ -1,6 +1,19 @@
 import pygame
 from typing import Dict, List, Tuple, Optional, Callable
 from health_system import HealthBar
+from text_cache import fonts, text_cache, TextLabel
+
+_dim_overlays: Dict[Tuple[int, int], pygame.Surface] = {}
+
+def get_dim_overlay(size: Tuple[int, int]) -> pygame.Surface:
+    """Get the shared half-transparent black overlay for a screen size"""
+    overlay = _dim_overlays.get(size)
+    if overlay is None:
+        overlay = pygame.Surface(size)
+        overlay.set_alpha(128)
+        overlay.fill((0, 0, 0))
+        _dim_overlays[size] = overlay
+    return overlay
 
 class Button:
     def __init__(self, text: str, rect: pygame.Rect, callback: Callable, 
@@ -14,13 +27,13 @@ class Button:
         self.hover_color = hover_color
         self.text_color = text_color
         self.is_hovered = False
-        self.font = pygame.font.Font(None, 36)
-        self.text_surface = self.font.render(self.text, True, self.text_color)
+        self.font = fonts.get(36)
         self.update_text_rect()
         
     def update_text_rect(self):
-        self.text_surface = self.font.render(self.text, True, self.text_color)
+        self.text_surface = text_cache.render(self.font, self.text, self.text_color)
         self.text_rect = self.text_surface.get_rect(center=self.rect.center)
+        self._text_key = (self.text, tuple(self.rect))
         
     def handle_event(self, event: pygame.event.Event) -> bool:
         """Handle mouse events, return True if button was clicked"""
@@ -38,8 +51,9 @@ class Button:
         pygame.draw.rect(surface, color, self.rect)
         pygame.draw.rect(surface, (0, 0, 0), self.rect, 2)
         
-        # Cập nhật lại text_rect nếu button thay đổi vị trí
-        self.update_text_rect()
+        # Cập nhật lại text_rect nếu button thay đổi vị trí hoặc text
+        if self._text_key != (self.text, tuple(self.rect)):
+            self.update_text_rect()
         surface.blit(self.text_surface, self.text_rect)
 
 class Slider:
@@ -97,8 +111,15 @@ class Menu:
         self.height = height
         self.buttons: List[Button] = []
         self.sliders: List[Slider] = []
-        self.font = pygame.font.Font(None, 48)
-        self.title_font = pygame.font.Font(None, 72)
+        self.font = fonts.get(48)
+        self.title_font = fonts.get(72)
+        self.small_font = fonts.get(24)
+        # Asset loading progress (0.0 to 1.0), None when nothing is loading
+        self.progress: Optional[float] = None
+
+    def set_progress(self, progress: Optional[float]):
+        """Set the loading progress shown under the menu (None hides it)"""
+        self.progress = progress
         
     def add_button(self, text: str, rect: pygame.Rect, callback: Callable, **kwargs):
         """Add a button to the menu"""
@@ -130,7 +151,7 @@ class Menu:
         pygame.draw.rect(surface, (100, 100, 100), menu_rect, 3)
         
         # Draw title
-        title_surface = self.title_font.render(self.title, True, (255, 255, 255))
+        title_surface = text_cache.render(self.title_font, self.title, (255, 255, 255))
         title_rect = title_surface.get_rect(centerx=menu_rect.centerx, 
                                           top=menu_rect.top + 20)
         surface.blit(title_surface, title_rect)
@@ -141,16 +162,30 @@ class Menu:
         for slider in self.sliders:
             slider.draw(surface)
 
+        # Draw loading progress
+        if self.progress is not None:
+            bar_rect = pygame.Rect(menu_rect.left + 40, menu_rect.bottom + 20, menu_rect.width - 80, 10)
+            pygame.draw.rect(surface, (64, 64, 64), bar_rect)
+            pygame.draw.rect(surface, (255, 255, 0),
+                             (bar_rect.x, bar_rect.y, int(bar_rect.width * self.progress), bar_rect.height))
+            pygame.draw.rect(surface, (0, 0, 0), bar_rect, 2)
+            loading_surface = text_cache.render(self.small_font, f"Loading assets... {int(self.progress * 100)}%",
+                                                (255, 255, 255))
+            surface.blit(loading_surface, loading_surface.get_rect(centerx=bar_rect.centerx, top=bar_rect.bottom + 6))
+
 class HUD:
-    def __init__(self, player_ref, wave_manager_ref, powerup_manager_ref):
+    def __init__(self, player_ref, wave_manager_ref, powerup_manager_ref, camera=None, render_queue=None):
         self.player_ref = player_ref
         self.wave_manager_ref = wave_manager_ref
         self.powerup_manager_ref = powerup_manager_ref
+        self.camera = camera  # The player's health bar follows the player on screen
+        self.render_queue = render_queue  # ...at the interpolated position the player is drawn at
         
         # Fonts
-        self.font = pygame.font.Font(None, 36)
-        self.small_font = pygame.font.Font(None, 24)
-        self.large_font = pygame.font.Font(None, 48)
+        self.font = fonts.get(36)
+        self.small_font = fonts.get(24)
+        self.large_font = fonts.get(48)
+        self.popup_font = fonts.get(54)
         
         # Health bar
         self.health_bar = HealthBar(width=200, height=15)
@@ -160,50 +195,93 @@ class HUD:
         self.warning_color = (255, 255, 0)
         self.danger_color = (255, 0, 0)
         self.wave_color = (0, 255, 255)
-        
+
+        # Retained text elements; each re-renders only when its value changes
+        self.health_label = TextLabel(self.font, self.text_color)
+        self.power_label = TextLabel(self.font, self.warning_color)
+        self.kills_label = TextLabel(self.small_font, self.text_color)
+        self.wave_label = TextLabel(self.font, self.text_color)
+        self.enemy_count_label = TextLabel(self.font, self.text_color)
+        self.countdown_label = TextLabel(self.font, self.warning_color)
+        self.controls_label = TextLabel(self.small_font, (200, 200, 200))
+        self.popup_label = TextLabel(self.popup_font, (255, 255, 0))
+        
+    def get_signature(self):
+        """Everything the HUD shows; it only needs redrawing when this changes"""
+        player = self.player_ref
+        if not player:
+            return None
+        signature = [self.get_player_screen_rect().topleft, player.health_system.current_health, player.health_system.max_health,
+                     player.power_system.current_power, player.enemies_killed,
+                     self.get_effect_texts(player.get_active_power_ups()),
+                     player.get_last_powerup_popup()[0]]
+        if self.wave_manager_ref:
+            wave_manager = self.wave_manager_ref
+            signature += [wave_manager.current_wave, wave_manager.get_enemy_count(), wave_manager.wave_completed]
+            if wave_manager.wave_completed:
+                signature.append(wave_manager.wave_transition_timer)  # Countdown and progress bar
+        if self.powerup_manager_ref:
+            signature.append(self.get_effect_texts(self.powerup_manager_ref.get_active_effects()))
+        return tuple(signature)
+
+    def get_player_screen_rect(self):
+        """Get the player's rect (as drawn) in screen coordinates"""
+        rect = self.player_ref.rect
+        if self.render_queue:
+            rect = pygame.Rect(self.render_queue.interpolated_topleft(self.player_ref), rect.size)
+        if self.camera:
+            return self.camera.apply(rect)
+        return rect
+
+    def get_effect_texts(self, effects):
+        """Format effect timers the way the HUD shows them"""
+        return tuple(f"{name.title()}: {data.get('timer', 0):.1f}s" for name, data in effects.items())
+
     def draw(self, surface: pygame.Surface):
-        """Draw the HUD"""
+        """Draw the HUD; returns the rects drawn"""
         if not self.player_ref:
-            return
+            return []
+        drawn_rects = []
             
         # Draw health bar
-        bar_x = self.player_ref.rect.centerx - self.health_bar.width // 2
-        bar_y = self.player_ref.rect.top - 20
+        player_rect = self.get_player_screen_rect()
+        bar_x = player_rect.centerx - self.health_bar.width // 2
+        bar_y = player_rect.top - 20
         health_x = 20
         health_y = 20
-        self.health_bar.draw(surface, self.player_ref.health_system, (bar_x, bar_y))
+        drawn_rects.append(self.health_bar.draw(surface, self.player_ref.health_system, (bar_x, bar_y)))
         
         # Draw health text
         health_text = f"Health: {self.player_ref.health_system.current_health}/{self.player_ref.health_system.max_health}"
-        health_surface = self.font.render(health_text, True, self.text_color)
-        surface.blit(health_surface, (bar_x, bar_y + 25))
+        health_surface = self.health_label.set_text(health_text)
+        drawn_rects.append(surface.blit(health_surface, (bar_x, bar_y + 25)))
         
         # Draw power bar
         power_x = 20
         power_y = health_y + 50
-        self.player_ref.power_system.draw(surface, (power_x, power_y))
+        drawn_rects.append(self.player_ref.power_system.draw(surface, (power_x, power_y)))
         
         # Draw power text
         power_text = f"Power: {self.player_ref.power_system.current_power}/{self.player_ref.power_system.max_power}"
-        power_surface = self.font.render(power_text, True, self.warning_color)
-        surface.blit(power_surface, (power_x, power_y + 15))
+        power_surface = self.power_label.set_text(power_text)
+        drawn_rects.append(surface.blit(power_surface, (power_x, power_y + 15)))
         
         # Draw stats
         stats_x = 20
         stats_y = power_y + 40
         enemies_text = f"Enemies Killed: {self.player_ref.enemies_killed}"
-        enemies_surface = self.small_font.render(enemies_text, True, self.text_color)
-        surface.blit(enemies_surface, (stats_x, stats_y))
+        enemies_surface = self.kills_label.set_text(enemies_text)
+        drawn_rects.append(surface.blit(enemies_surface, (stats_x, stats_y)))
         
         # Draw wave information
         if self.wave_manager_ref:
             wave_text = f"Wave: {self.wave_manager_ref.current_wave}"
-            wave_surface = self.font.render(wave_text, True, self.text_color)
-            surface.blit(wave_surface, (20, stats_y + 25))
+            wave_surface = self.wave_label.set_text(wave_text)
+            drawn_rects.append(surface.blit(wave_surface, (20, stats_y + 25)))
             
             enemies_text = f"Enemies: {self.wave_manager_ref.get_enemy_count()}"
-            enemies_surface = self.font.render(enemies_text, True, self.text_color)
-            surface.blit(enemies_surface, (20, stats_y + 55))
+            enemies_surface = self.enemy_count_label.set_text(enemies_text)
+            drawn_rects.append(surface.blit(enemies_surface, (20, stats_y + 55)))
             
             # Draw wave transition info
             if self.wave_manager_ref.wave_completed:
@@ -212,15 +290,15 @@ class HUD:
                 
                 # Wave completed message
                 completed_text = f"Wave {self.wave_manager_ref.current_wave} Completed!"
-                completed_surface = self.large_font.render(completed_text, True, self.wave_color)
+                completed_surface = text_cache.render(self.large_font, completed_text, self.wave_color)
                 completed_rect = completed_surface.get_rect(center=(surface.get_width() // 2, surface.get_height() // 2 - 50))
-                surface.blit(completed_surface, completed_rect)
+                drawn_rects.append(surface.blit(completed_surface, completed_rect))
                 
                 # Next wave countdown
                 countdown_text = f"Next wave in {remaining_time:.1f}s"
-                countdown_surface = self.font.render(countdown_text, True, self.warning_color)
+                countdown_surface = self.countdown_label.set_text(countdown_text)
                 countdown_rect = countdown_surface.get_rect(center=(surface.get_width() // 2, surface.get_height() // 2))
-                surface.blit(countdown_surface, countdown_rect)
+                drawn_rects.append(surface.blit(countdown_surface, countdown_rect))
                 
                 # Progress bar
                 bar_width = 300
@@ -229,13 +307,13 @@ class HUD:
                 bar_y = surface.get_height() // 2 + 30
                 
                 # Background
-                pygame.draw.rect(surface, (64, 64, 64), (bar_x, bar_y, bar_width, bar_height))
-                pygame.draw.rect(surface, (128, 128, 128), (bar_x, bar_y, bar_width, bar_height), 2)
+                drawn_rects.append(pygame.draw.rect(surface, (64, 64, 64), (bar_x, bar_y, bar_width, bar_height)))
+                drawn_rects.append(pygame.draw.rect(surface, (128, 128, 128), (bar_x, bar_y, bar_width, bar_height), 2))
                 
                 # Progress
                 progress_width = int(bar_width * transition_progress)
                 if progress_width > 0:
-                    pygame.draw.rect(surface, self.wave_color, (bar_x, bar_y, progress_width, bar_height))
+                    drawn_rects.append(pygame.draw.rect(surface, self.wave_color, (bar_x, bar_y, progress_width, bar_height)))
             
         # Draw active power-ups
         if self.powerup_manager_ref:
@@ -243,15 +321,15 @@ class HUD:
             if active_effects:
                 effects_y = stats_y + 85
                 effects_text = "Active Effects:"
-                effects_surface = self.small_font.render(effects_text, True, self.text_color)
-                surface.blit(effects_surface, (20, effects_y))
+                effects_surface = text_cache.render(self.small_font, effects_text, self.text_color)
+                drawn_rects.append(surface.blit(effects_surface, (20, effects_y)))
                 
                 effects_y += 25
                 for effect_name, effect_data in active_effects.items():
                     timer = effect_data.get('timer', 0)
                     effect_text = f"{effect_name.title()}: {timer:.1f}s"
-                    effect_surface = self.small_font.render(effect_text, True, self.warning_color)
-                    surface.blit(effect_surface, (30, effects_y))
+                    effect_surface = text_cache.render(self.small_font, effect_text, self.warning_color)
+                    drawn_rects.append(surface.blit(effect_surface, (30, effects_y)))
                     effects_y += 20
         
         # Draw player power-ups (from power system)
@@ -260,33 +338,33 @@ class HUD:
             effects_y = stats_y + 85
             if not self.powerup_manager_ref.get_active_effects():
                 effects_text = "Active Power-ups:"
-                effects_surface = self.small_font.render(effects_text, True, self.text_color)
-                surface.blit(effects_surface, (20, effects_y))
+                effects_surface = text_cache.render(self.small_font, effects_text, self.text_color)
+                drawn_rects.append(surface.blit(effects_surface, (20, effects_y)))
                 effects_y += 25
             
             for effect_name, effect_data in player_power_ups.items():
                 timer = effect_data.get('timer', 0)
                 effect_text = f"{effect_name.title()}: {timer:.1f}s"
-                effect_surface = self.small_font.render(effect_text, True, (255, 0, 255))  # Magenta for power-ups
-                surface.blit(effect_surface, (30, effects_y))
+                effect_surface = text_cache.render(self.small_font, effect_text, (255, 0, 255))  # Magenta for power-ups
+                drawn_rects.append(surface.blit(effect_surface, (30, effects_y)))
                 effects_y += 20
         
         # Draw controls hint
         controls_text = "WASD: Move | Mouse: Attack | ESC: Menu"
-        controls_surface = self.small_font.render(controls_text, True, (200, 200, 200))
-        surface.blit(controls_surface, (20, surface.get_height() - 30))
+        controls_surface = self.controls_label.set_text(controls_text)
+        drawn_rects.append(surface.blit(controls_surface, (20, surface.get_height() - 30)))
 
         # Draw power up popup if any
         popup_text, popup_time = self.player_ref.get_last_powerup_popup()
         if popup_text:
-            popup_font = pygame.font.Font(None, 54)
-            popup_surface = popup_font.render(popup_text, True, (255, 255, 0))
+            popup_surface = self.popup_label.set_text(popup_text)
             popup_rect = popup_surface.get_rect(centerx=surface.get_width() // 2, top=40)
             # Draw background box
             bg_rect = popup_rect.inflate(40, 20)
-            pygame.draw.rect(surface, (0, 0, 0), bg_rect, border_radius=12)
-            pygame.draw.rect(surface, (255, 255, 0), bg_rect, 3, border_radius=12)
-            surface.blit(popup_surface, popup_rect)
+            drawn_rects.append(pygame.draw.rect(surface, (0, 0, 0), bg_rect, border_radius=12))
+            drawn_rects.append(pygame.draw.rect(surface, (255, 255, 0), bg_rect, 3, border_radius=12))
+            drawn_rects.append(surface.blit(popup_surface, popup_rect))
+        return drawn_rects
 
 class GameOverScreen:
     def __init__(self, waves_survived: int, restart_callback: Callable, menu_callback: Callable):
@@ -294,9 +372,9 @@ class GameOverScreen:
         self.restart_callback = restart_callback
         self.menu_callback = menu_callback
         
-        self.font = pygame.font.Font(None, 36)
-        self.title_font = pygame.font.Font(None, 72)
-        self.small_font = pygame.font.Font(None, 24)
+        self.font = fonts.get(36)
+        self.title_font = fonts.get(72)
+        self.small_font = fonts.get(24)
         
     def handle_events(self, events: List[pygame.event.Event]):
         """Handle events for game over screen"""
@@ -310,36 +388,34 @@ class GameOverScreen:
                     return True
         return False
         
-    def draw(self, surface: pygame.Surface):
-        """Draw the game over screen"""
+    def draw(self, surface: pygame.Surface, draw_overlay: bool = True):
+        """Draw the game over screen (draw_overlay=False if the background is already dimmed)"""
         # Draw background overlay
-        overlay = pygame.Surface(surface.get_size())
-        overlay.set_alpha(128)
-        overlay.fill((0, 0, 0))
-        surface.blit(overlay, (0, 0))
+        if draw_overlay:
+            surface.blit(get_dim_overlay(surface.get_size()), (0, 0))
         
         # Draw title
         title_text = "GAME OVER"
-        title_surface = self.title_font.render(title_text, True, (255, 0, 0))
+        title_surface = text_cache.render(self.title_font, title_text, (255, 0, 0))
         title_rect = title_surface.get_rect(centerx=surface.get_width() // 2, top=100)
         surface.blit(title_surface, title_rect)
         
         # Draw stats
         stats_y = 200
         stats_text = f"Waves Survived: {self.waves_survived}"
-        stats_surface = self.font.render(stats_text, True, (255, 255, 255))
+        stats_surface = text_cache.render(self.font, stats_text, (255, 255, 255))
         stats_rect = stats_surface.get_rect(centerx=surface.get_width() // 2, top=stats_y)
         surface.blit(stats_surface, stats_rect)
         
         # Draw instructions
         restart_text = "Press R to Restart"
-        restart_surface = self.font.render(restart_text, True, (255, 255, 255))
+        restart_surface = text_cache.render(self.font, restart_text, (255, 255, 255))
         restart_rect = restart_surface.get_rect(centerx=surface.get_width() // 2, 
                                                centery=surface.get_height() // 2 + 50)
         surface.blit(restart_surface, restart_rect)
         
         menu_text = "Press M for Main Menu"
-        menu_surface = self.font.render(menu_text, True, (255, 255, 255))
+        menu_surface = text_cache.render(self.font, menu_text, (255, 255, 255))
         menu_rect = menu_surface.get_rect(centerx=surface.get_width() // 2, 
                                          centery=surface.get_height() // 2 + 80)
         surface.blit(menu_surface, menu_rect)
@@ -349,9 +425,9 @@ class LeaderboardScreen:
         self.leaderboard_ref = leaderboard_ref
         self.back_callback = back_callback
         
-        self.font = pygame.font.Font(None, 36)
-        self.title_font = pygame.font.Font(None, 72)
-        self.small_font = pygame.font.Font(None, 24)
+        self.font = fonts.get(36)
+        self.title_font = fonts.get(72)
+        self.small_font = fonts.get(24)
         
     def handle_events(self, events: List[pygame.event.Event]):
         """Handle events for leaderboard screen"""
@@ -362,17 +438,15 @@ class LeaderboardScreen:
                     return True
         return False
         
-    def draw(self, surface: pygame.Surface):
-        """Draw the leaderboard screen"""
+    def draw(self, surface: pygame.Surface, draw_overlay: bool = True):
+        """Draw the leaderboard screen (draw_overlay=False if the background is already dimmed)"""
         # Draw background
-        overlay = pygame.Surface(surface.get_size())
-        overlay.set_alpha(128)
-        overlay.fill((0, 0, 0))
-        surface.blit(overlay, (0, 0))
+        if draw_overlay:
+            surface.blit(get_dim_overlay(surface.get_size()), (0, 0))
         
         # Draw title
         title_text = "LEADERBOARD"
-        title_surface = self.title_font.render(title_text, True, (255, 255, 255))
+        title_surface = text_cache.render(self.title_font, title_text, (255, 255, 255))
         title_rect = title_surface.get_rect(centerx=surface.get_width() // 2, top=50)
         surface.blit(title_surface, title_rect)
         
@@ -382,7 +456,7 @@ class LeaderboardScreen:
         if not scores:
             # No scores yet
             no_scores_text = "No scores yet! Play the game to set a record!"
-            no_scores_surface = self.font.render(no_scores_text, True, (200, 200, 200))
+            no_scores_surface = text_cache.render(self.font, no_scores_text, (200, 200, 200))
             no_scores_rect = no_scores_surface.get_rect(center=(surface.get_width() // 2, surface.get_height() // 2))
             surface.blit(no_scores_surface, no_scores_rect)
         else:
@@ -394,7 +468,7 @@ class LeaderboardScreen:
             headers = ["Rank", "Waves", "Enemies", "Score", "Date"]
             header_x = table_x
             for i, header in enumerate(headers):
-                header_surface = self.font.render(header, True, (255, 255, 0))
+                header_surface = text_cache.render(self.font, header, (255, 255, 0))
                 surface.blit(header_surface, (header_x, table_y))
                 header_x += 120
             
@@ -403,27 +477,27 @@ class LeaderboardScreen:
                 row_y = table_y + 40 + i * 30
                 
                 # Rank
-                rank_surface = self.font.render(f"#{score['rank']}", True, (255, 255, 255))
+                rank_surface = text_cache.render(self.font, f"#{score['rank']}", (255, 255, 255))
                 surface.blit(rank_surface, (table_x, row_y))
                 
                 # Waves
-                waves_surface = self.font.render(str(score['waves_survived']), True, (255, 255, 255))
+                waves_surface = text_cache.render(self.font, str(score['waves_survived']), (255, 255, 255))
                 surface.blit(waves_surface, (table_x + 120, row_y))
                 
                 # Enemies
-                enemies_surface = self.font.render(str(score['enemies_killed']), True, (255, 255, 255))
+                enemies_surface = text_cache.render(self.font, str(score['enemies_killed']), (255, 255, 255))
                 surface.blit(enemies_surface, (table_x + 240, row_y))
                 
                 # Score
-                score_surface = self.font.render(str(score['total_score']), True, (255, 255, 255))
+                score_surface = text_cache.render(self.font, str(score['total_score']), (255, 255, 255))
                 surface.blit(score_surface, (table_x + 360, row_y))
                 
                 # Date
-                date_surface = self.small_font.render(score['date'], True, (200, 200, 200))
+                date_surface = text_cache.render(self.small_font, score['date'], (200, 200, 200))
                 surface.blit(date_surface, (table_x + 480, row_y))
         
         # Draw instructions
         instructions_text = "Press ESC or B to go back"
-        instructions_surface = self.small_font.render(instructions_text, True, (200, 200, 200))
+        instructions_surface = text_cache.render(self.small_font, instructions_text, (200, 200, 200))
         instructions_rect = instructions_surface.get_rect(centerx=surface.get_width() // 2, bottom=surface.get_height() - 30)
         surface.blit(instructions_surface, instructions_rect) 
\ No newline at end of file
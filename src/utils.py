@@ -1,11 +1,18 @@
 import pygame
 import os
+from types import MappingProxyType
 from typing import Dict, List, Tuple
+from atlas_bundle import get_atlas
+from startup_profiler import profiler
+from log_system import get_logger
+
+log = get_logger('sprites')
+combat_log = get_logger('combat')
 
 class LoadSprite:
     def __init__(self, image_path):
         self.image = pygame.image.load(image_path).convert_alpha()
-        print(f"Loaded sprite sheet size: {self.image.get_size()}")  # Debug info
+        log.debug("Loaded sprite sheet size: %s", self.image.get_size())
     
     def get_image(self, x, y, width=192, height=192, scale=0.5):
         """Get a single sprite from specific coordinates"""
@@ -28,8 +35,8 @@ class LoadSprite:
         """Get animations based on new sprite layout - 6 columns, 8 rows"""
         animations = {}
         
-        print(f"Extracting animations with sprite size: {sprite_width}x{sprite_height}, scale: {scale}")
-        print("Sprite sheet layout: 6 columns x 8 rows")
+        log.debug("Extracting animations with sprite size: %sx%s, scale: %s", sprite_width, sprite_height, scale)
+        log.debug("Sprite sheet layout: 6 columns x 8 rows")
         
         # Row 0: Idle animation
         idle_frames = []
@@ -39,7 +46,7 @@ class LoadSprite:
             frame = self.get_image(x, y, sprite_width, sprite_height, scale)
             idle_frames.append(frame)
         animations['idle'] = idle_frames
-        print(f"Loaded idle animation: {len(idle_frames)} frames")
+        log.debug("Loaded idle animation: %s frames", len(idle_frames))
         
         # Row 1: Walking right animation
         walk_right_frames = []
@@ -49,7 +56,7 @@ class LoadSprite:
             frame = self.get_image(x, y, sprite_width, sprite_height, scale)
             walk_right_frames.append(frame)
         animations['walk_right'] = walk_right_frames
-        print(f"Loaded walk_right animation: {len(walk_right_frames)} frames")
+        log.debug("Loaded walk_right animation: %s frames", len(walk_right_frames))
         
         # Walking left: flip the walking right frames
         walk_left_frames = []
@@ -57,7 +64,7 @@ class LoadSprite:
             flipped_frame = pygame.transform.flip(frame, True, False)
             walk_left_frames.append(flipped_frame)
         animations['walk_left'] = walk_left_frames
-        print(f"Created walk_left animation: {len(walk_left_frames)} frames")
+        log.debug("Created walk_left animation: %s frames", len(walk_left_frames))
         
         # Row 2: First attack right sequence
         attack_right_frames = []
@@ -67,7 +74,7 @@ class LoadSprite:
             frame = self.get_image(x, y, sprite_width, sprite_height, scale)
             attack_right_frames.append(frame)
         animations['attack_right'] = attack_right_frames
-        print(f"Loaded attack_right animation: {len(attack_right_frames)} frames")
+        log.debug("Loaded attack_right animation: %s frames", len(attack_right_frames))
         
         # Row 3: Second attack right sequence  
         attack2_right_frames = []
@@ -77,7 +84,7 @@ class LoadSprite:
             frame = self.get_image(x, y, sprite_width, sprite_height, scale)
             attack2_right_frames.append(frame)
         animations['attack2_right'] = attack2_right_frames
-        print(f"Loaded attack2_right animation: {len(attack2_right_frames)} frames")
+        log.debug("Loaded attack2_right animation: %s frames", len(attack2_right_frames))
         
         # Attack left: flip both attack sequences
         attack_left_frames = []
@@ -91,7 +98,7 @@ class LoadSprite:
             flipped_frame = pygame.transform.flip(frame, True, False)
             attack2_left_frames.append(flipped_frame)
         animations['attack2_left'] = attack2_left_frames
-        print(f"Created attack_left and attack2_left animations")
+        log.debug("Created attack_left and attack2_left animations")
         
         # Row 4: First attack down sequence
         attack_down_frames = []
@@ -101,7 +108,7 @@ class LoadSprite:
             frame = self.get_image(x, y, sprite_width, sprite_height, scale)
             attack_down_frames.append(frame)
         animations['attack_down'] = attack_down_frames
-        print(f"Loaded attack_down animation: {len(attack_down_frames)} frames")
+        log.debug("Loaded attack_down animation: %s frames", len(attack_down_frames))
         
         # Row 5: Second attack down sequence
         attack2_down_frames = []
@@ -111,7 +118,7 @@ class LoadSprite:
             frame = self.get_image(x, y, sprite_width, sprite_height, scale)
             attack2_down_frames.append(frame)
         animations['attack2_down'] = attack2_down_frames
-        print(f"Loaded attack2_down animation: {len(attack2_down_frames)} frames")
+        log.debug("Loaded attack2_down animation: %s frames", len(attack2_down_frames))
         
         # Row 6: First attack up sequence
         attack_up_frames = []
@@ -121,7 +128,7 @@ class LoadSprite:
             frame = self.get_image(x, y, sprite_width, sprite_height, scale)
             attack_up_frames.append(frame)
         animations['attack_up'] = attack_up_frames
-        print(f"Loaded attack_up animation: {len(attack_up_frames)} frames")
+        log.debug("Loaded attack_up animation: %s frames", len(attack_up_frames))
         
         # Row 7: Second attack up sequence
         attack2_up_frames = []
@@ -131,9 +138,10 @@ class LoadSprite:
             frame = self.get_image(x, y, sprite_width, sprite_height, scale)
             attack2_up_frames.append(frame)
         animations['attack2_up'] = attack2_up_frames
-        print(f"Loaded attack2_up animation: {len(attack2_up_frames)} frames")
+        log.debug("Loaded attack2_up animation: %s frames", len(attack2_up_frames))
         
-        print(f"Total animations loaded: {list(animations.keys())}")
+        if log.debug_enabled:
+            log.debug("Total animations loaded: %s", list(animations.keys()))
         return animations
     
     # Keep your existing methods for backward compatibility
@@ -219,6 +227,90 @@ class LoadSprite:
         
         return animations
 
+class AnimationLibrary:
+    """Process-wide cache of sliced animation frame sets.
+
+    Each archetype (sheet path, frame size, scale, animation speeds) is built
+    once; every AnimationManager created for it shares the same read-only frame
+    tuples, so only playback state is stored per entity.
+    """
+
+    def __init__(self, use_atlas: bool = True):
+        self.use_atlas = use_atlas
+        self._frame_sets = {}
+        self._archetypes = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_animations(self, sheet_path: str, sprite_width: int = 192, sprite_height: int = 192,
+                       scale: float = 0.5) -> MappingProxyType:
+        """Get the shared frame set for a sprite sheet, slicing it on first use"""
+        key = (os.path.normpath(sheet_path), sprite_width, sprite_height, scale)
+        frame_set = self._frame_sets.get(key)
+        if frame_set is None:
+            with profiler.phase(f"sheet {os.path.basename(sheet_path)} @{scale}"):
+                frame_set = self._build_frame_set(sheet_path, sprite_width, sprite_height, scale)
+            self._frame_sets[key] = frame_set
+        return frame_set
+
+    def _build_frame_set(self, sheet_path, sprite_width, sprite_height, scale):
+        """Slice a sheet and freeze the result so it can be shared"""
+        # Pre-sliced frames from the packed atlas skip the PNG decode entirely
+        atlas = get_atlas() if self.use_atlas else None
+        animations = atlas.get_frame_set(sheet_path, sprite_width, sprite_height, scale) if atlas else None
+        if animations is not None:
+            return MappingProxyType({name: tuple(frames) for name, frames in animations.items()})
+
+        sprite_loader = LoadSprite(sheet_path)
+        animations = sprite_loader.get_all_animations_player(
+            sprite_width=sprite_width, sprite_height=sprite_height, scale=scale
+        )
+
+        # Directional idles are built here once instead of per AnimationManager
+        if 'idle' in animations:
+            animations['idle_right'] = list(animations['idle'])
+            animations['idle_left'] = [pygame.transform.flip(frame, True, False)
+                                       for frame in animations['idle']]
+
+        return MappingProxyType({name: tuple(frames) for name, frames in animations.items()})
+
+    def create_manager(self, sheet_path: str, animation_speeds: Dict[str, float],
+                       sprite_width: int = 192, sprite_height: int = 192,
+                       scale: float = 0.5) -> 'AnimationManager':
+        """Create an AnimationManager that shares the archetype's frames and speeds"""
+        key = (os.path.normpath(sheet_path), sprite_width, sprite_height, scale,
+               frozenset(animation_speeds.items()))
+        archetype = self._archetypes.get(key)
+        if archetype is None:
+            self.misses += 1
+            frames = self.get_animations(sheet_path, sprite_width, sprite_height, scale)
+            archetype = (frames, MappingProxyType(dict(animation_speeds)))
+            self._archetypes[key] = archetype
+        else:
+            self.hits += 1
+
+        frames, speeds = archetype
+        return AnimationManager(frames, speeds)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache statistics"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'frame_sets': len(self._frame_sets),
+            'archetypes': len(self._archetypes)
+        }
+
+    def clear(self):
+        """Drop all cached frame sets and reset counters"""
+        self._frame_sets.clear()
+        self._archetypes.clear()
+        self.hits = 0
+        self.misses = 0
+
+# Shared by every Player and Enemy in the process
+animation_library = AnimationLibrary()
+
 class AnimationManager:
     def __init__(self, animations: Dict, animation_speeds: Dict[str, float]):
         self.animations = animations
@@ -231,9 +323,15 @@ class AnimationManager:
 
     def create_directional_idle_animations(self):
         """Create left and right idle animations from existing idle"""
+        if 'idle_left' in self.animations:
+            # Already built (shared AnimationLibrary frame sets include them)
+            return
         if 'idle' in self.animations:
+            # Never mutate a frame set that may be shared with other managers
+            self.animations = dict(self.animations)
+
             # Rename current idle to idle_right
-            self.animations['idle_right'] = self.animations['idle'].copy()
+            self.animations['idle_right'] = list(self.animations['idle'])
             
             # Create idle_left by horizontally flipping idle_right frames
             idle_left_frames = []
@@ -517,7 +615,7 @@ class CombatSystem:
         # Set up attack push
         self.attack_push_timer = self.config['attack_push_duration']
         
-        print(f"Attack 1 executed in direction: {direction}")
+        combat_log.debug("Attack 1 executed in direction: %s", direction)
     
     def _execute_combo_attack(self, direction):
         """Execute a combo attack"""
@@ -532,7 +630,7 @@ class CombatSystem:
         # Reset attack push for combo
         self.attack_push_timer = self.config['attack_push_duration']
         
-        print(f"Combo attack executed in direction: {direction}")
+        combat_log.debug("Combo attack executed in direction: %s", direction)
     
     def update_timers(self, dt):
         """Update all combat timers"""
@@ -577,7 +675,7 @@ class CombatSystem:
         self.can_combo = False
         self.attack_combo = 0
         
-        print("Attack ended")
+        combat_log.debug("Attack ended")
     
     def get_push_movement(self, dt):
         """Get push movement vector for attack dash"""
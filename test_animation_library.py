@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared animation library
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import pygame
+from utils import AnimationLibrary
+
+SHEET = os.path.join("assets", "Factions", "Goblins", "Troops", "Torch", "Red", "Torch_Red.png")
+SPEEDS = {'idle_animation_speed': 10, 'walk_animation_speed': 15}
+
+def init_pygame():
+    """Initialize pygame with a display for testing"""
+    pygame.init()
+    pygame.display.set_mode((800, 600))
+
+def test_frames_built_once():
+    """Managers of the same archetype share one frame set"""
+    print("🧪 Testing AnimationLibrary sharing...")
+    init_pygame()
+
+    library = AnimationLibrary()
+    first = library.create_manager(SHEET, SPEEDS, scale=0.6)
+    second = library.create_manager(SHEET, dict(SPEEDS), scale=0.6)
+
+    assert first.animations is second.animations
+    assert first.animations['idle'][0] is second.animations['idle'][0]
+    assert 'idle_left' in first.animations and 'idle_right' in first.animations
+    assert library.get_stats() == {'hits': 1, 'misses': 1, 'frame_sets': 1, 'archetypes': 1}
+
+    # Different speeds are a new archetype but reuse the sliced frames
+    third = library.create_manager(SHEET, {'idle_animation_speed': 5}, scale=0.6)
+    assert third.animations is first.animations
+    assert library.get_stats()['archetypes'] == 2
+    assert library.get_stats()['frame_sets'] == 1
+    print("✅ AnimationLibrary sharing test completed\n")
+
+def test_playback_state_is_per_manager():
+    """Playback state stays per entity"""
+    print("🧪 Testing per-entity playback state...")
+    init_pygame()
+
+    library = AnimationLibrary()
+    first = library.create_manager(SHEET, SPEEDS, scale=0.6)
+    second = library.create_manager(SHEET, SPEEDS, scale=0.6)
+
+    first.update_animation(1.0, False, 0, True, 'right', 'right', False)
+    assert first.current_animation == 'walk_right'
+    assert second.current_animation == 'idle'
+
+    # Calling the legacy helper must not touch the shared frame set
+    first.create_directional_idle_animations()
+    assert first.animations is second.animations
+    print("✅ Per-entity playback state test completed\n")
+
+def main():
+    """Run all tests"""
+    try:
+        test_frames_built_once()
+        test_playback_state_is_per_manager()
+        print("🎉 All tests passed!")
+    finally:
+        pygame.quit()
+
+if __name__ == "__main__":
+    main()
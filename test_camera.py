@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script for the scrolling camera and viewport culling
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import pygame
+from camera import Camera
+from render_queue import RenderQueue
+
+def test_camera_follow_and_clamp():
+    """The camera centers on its target but never shows past the map edges"""
+    print("🧪 Testing camera follow...")
+    camera = Camera(1280, 720, 2000, 1000)
+    camera.follow(pygame.Rect(990, 490, 20, 20))
+    assert camera.rect.topleft == (360, 140) and camera.moved
+    camera.follow(pygame.Rect(990, 490, 20, 20))
+    assert not camera.moved
+
+    camera.follow(pygame.Rect(1990, 990, 20, 20))
+    assert camera.rect.bottomright == (2000, 1000)
+    camera.follow(pygame.Rect(-50, -50, 20, 20))
+    assert camera.rect.topleft == (0, 0)
+
+    # A map smaller than the view stays pinned to the corner
+    small = Camera(1280, 720, 640, 480)
+    small.follow(pygame.Rect(600, 400, 20, 20))
+    assert small.rect.topleft == (0, 0)
+
+    camera.follow(pygame.Rect(990, 490, 20, 20))
+    assert camera.apply(pygame.Rect(400, 200, 10, 10)).topleft == (40, 60)
+    assert camera.screen_to_world(camera.world_to_screen((123, 456))) == (123, 456)
+    print("✅ Camera follow test completed\n")
+
+def test_render_queue_culls_to_view():
+    """Queued sprites outside the view are skipped, the rest land in screen space"""
+    print("🧪 Testing viewport culling...")
+    pygame.init()
+    pygame.display.set_mode((320, 240))
+    target = pygame.Surface((320, 240))
+    image = pygame.Surface((10, 10))
+    image.fill((255, 255, 255))
+
+    queue = RenderQueue()
+    queue.set_view(pygame.Rect(1000, 500, 320, 240))
+    queue.add(image, (1005, 505), depth=515)
+    queue.add(image, (995, 495), depth=505)  # Partly visible
+    queue.add(image, (100, 100), depth=110)  # Off screen
+    assert not queue.is_visible(pygame.Rect(0, 0, 50, 50))
+    rects = queue.flush(target)
+    assert rects == [pygame.Rect(0, 0, 5, 5), pygame.Rect(5, 5, 10, 10)]
+    assert target.get_at((7, 7))[:3] == (255, 255, 255)
+    pygame.quit()
+    print("✅ Viewport culling test completed\n")
+
+def test_render_interpolation():
+    """Frames between two simulation steps draw the camera and sprites part way"""
+    print("🧪 Testing render interpolation...")
+    camera = Camera(1280, 720, 4000, 4000)
+    camera.follow(pygame.Rect(1000, 1000, 20, 20))
+    camera.store_previous()
+    camera.follow(pygame.Rect(1010, 1000, 20, 20))
+    camera.update_view(0.5)
+    assert camera.rect.x == 380 and camera.x == 375 and camera.view_moved
+    camera.update_view(0.5)
+    assert not camera.view_moved
+
+    queue = RenderQueue()
+    sprite = pygame.sprite.Sprite()
+    sprite.rect = pygame.Rect(110, 200, 10, 10)
+    assert queue.interpolated_topleft(sprite) == (110, 200)
+    sprite.prev_topleft = (100, 200)
+    queue.set_interpolation(0.25)
+    assert queue.interpolated_topleft(sprite) == (102, 200)
+    # Teleports (respawns) are not smeared across the frame
+    sprite.prev_topleft = (900, 200)
+    assert queue.interpolated_topleft(sprite) == (110, 200)
+    print("✅ Render interpolation test completed\n")
+
+def main():
+    """Run all tests"""
+    test_camera_follow_and_clamp()
+    test_render_queue_culls_to_view()
+    test_render_interpolation()
+    print("🎉 All tests passed!")
+
+if __name__ == "__main__":
+    main()
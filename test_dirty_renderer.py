@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Test script for the dirty-rect renderer and partial presentation
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import pygame
+from dirty_renderer import DirtyRectRenderer
+from resolutionscaler import ResolutionScalerFullScreenStretch
+
+BACKGROUND = (0, 80, 0)
+SPRITE = (255, 0, 0)
+HUD = (255, 255, 0)
+
+def init_pygame():
+    """Initialize pygame with a display for testing"""
+    pygame.init()
+    pygame.display.set_mode((800, 600))
+
+class RecordingScaler:
+    """Stands in for the resolution scaler; remembers how each frame was presented"""
+    def __init__(self, size=(100, 80)):
+        self.logic_surface = pygame.Surface(size).convert()
+        self.presented = []  # None for a full frame, else the rects
+
+    def get_logic_surface(self):
+        return self.logic_surface
+
+    def end_frame(self):
+        self.presented.append(None)
+
+    def end_frame_rects(self, rects):
+        self.presented.append(list(rects))
+
+def draw_background(surface, area=None):
+    surface.fill(BACKGROUND, area)
+
+def sprite_drawer(rect):
+    """draw_world callback drawing one sprite at rect"""
+    def draw_world(surface):
+        return [surface.fill(SPRITE, rect)]
+    return draw_world
+
+def test_rect_helpers():
+    """Rects are padded and clipped; overlapping rects merge only when it saves area"""
+    print("🧪 Testing dirty rect helpers...")
+    init_pygame()
+    renderer = DirtyRectRenderer(RecordingScaler(), padding=2)
+    assert renderer._clip_rects([pygame.Rect(10, 10, 5, 5), None, pygame.Rect(-20, 0, 10, 10),
+                                 pygame.Rect(95, 70, 20, 20)]) == [pygame.Rect(8, 8, 9, 9), pygame.Rect(93, 68, 7, 12)]
+
+    # Heavily overlapping rects become their union
+    assert renderer._merge_rects([pygame.Rect(10, 10, 20, 20), pygame.Rect(15, 15, 20, 20)]) == [pygame.Rect(10, 10, 25, 25)]
+    # A thin overlap would add a lot of empty area, so both rects stay
+    far_corners = [pygame.Rect(0, 0, 50, 5), pygame.Rect(45, 0, 5, 50)]
+    assert renderer._merge_rects(far_corners) == far_corners
+    # Merging chains through rects merged earlier; empty and off-screen rects are dropped
+    assert renderer._merge_rects([pygame.Rect(0, 0, 10, 10), pygame.Rect(20, 0, 10, 10), pygame.Rect(5, 0, 20, 10),
+                                  pygame.Rect(0, 0, 0, 10), pygame.Rect(200, 200, 5, 5)]) == [pygame.Rect(0, 0, 30, 10)]
+
+    pieces = renderer._disjoint_rects([pygame.Rect(0, 0, 20, 20), pygame.Rect(10, 10, 20, 20)])
+    assert sum(piece.width * piece.height for piece in pieces) == 400 + 400 - 100
+    assert not any(a.colliderect(b) for i, a in enumerate(pieces) for b in pieces[i + 1:])
+    print("✅ Dirty rect helper test completed\n")
+
+def test_restore_and_present():
+    """A moved sprite leaves background behind and only its old and new rects are presented"""
+    print("🧪 Testing dirty-rect restore...")
+    init_pygame()
+    scaler = RecordingScaler()
+    renderer = DirtyRectRenderer(scaler, padding=0)
+    draw_hud = lambda surface: []
+
+    renderer.render(draw_background, sprite_drawer(pygame.Rect(10, 10, 8, 8)), draw_hud)
+    assert scaler.presented == [None] and renderer.full_frames == 1
+
+    renderer.render(draw_background, sprite_drawer(pygame.Rect(40, 30, 8, 8)), draw_hud)
+    assert scaler.presented[-1] == [pygame.Rect(10, 10, 8, 8), pygame.Rect(40, 30, 8, 8)]
+    assert renderer.dirty_frames == 1
+    screen = scaler.logic_surface
+    assert screen.get_at((12, 12))[:3] == BACKGROUND
+    assert screen.get_at((42, 32))[:3] == SPRITE
+
+    # Changed background areas are redrawn and presented too
+    renderer.background.fill((0, 0, 255), pygame.Rect(70, 60, 10, 10))  # Stale tile
+    renderer.render(draw_background, sprite_drawer(pygame.Rect(40, 30, 8, 8)), draw_hud,
+                    background_rects=[pygame.Rect(70, 60, 10, 10)])
+    assert pygame.Rect(70, 60, 10, 10) in scaler.presented[-1]
+    assert renderer.world.get_at((75, 65))[:3] == BACKGROUND
+    print("✅ Dirty-rect restore test completed\n")
+
+def test_full_redraw_threshold():
+    """Frames dirtier than the threshold are presented whole"""
+    print("🧪 Testing full redraw threshold...")
+    init_pygame()
+    scaler = RecordingScaler((100, 100))
+    renderer = DirtyRectRenderer(scaler, full_redraw_threshold=0.4, padding=0)
+    draw_hud = lambda surface: []
+    renderer.render(draw_background, sprite_drawer(pygame.Rect(0, 0, 10, 10)), draw_hud)
+
+    renderer.render(draw_background, sprite_drawer(pygame.Rect(0, 0, 60, 60)), draw_hud)  # 36%
+    assert scaler.presented[-1] is not None
+    assert abs(renderer.last_dirty_fraction - 0.36) < 1e-9
+
+    renderer.render(draw_background, sprite_drawer(pygame.Rect(0, 0, 70, 70)), draw_hud)  # 49%
+    assert scaler.presented[-1] is None
+    assert renderer.get_stats()['full_frames'] == 2 and renderer.get_stats()['dirty_frames'] == 1
+    print("✅ Full redraw threshold test completed\n")
+
+def test_hud_signature():
+    """The HUD is re-rendered only when its signature changes"""
+    print("🧪 Testing HUD signature invalidation...")
+    init_pygame()
+    scaler = RecordingScaler()
+    renderer = DirtyRectRenderer(scaler, padding=0)
+    hud_calls = []
+
+    def draw_hud(surface):
+        hud_calls.append(1)
+        return [surface.fill(HUD, pygame.Rect(0, 0, 20, 5))]
+
+    draw_world = lambda surface: []
+    renderer.render(draw_background, draw_world, draw_hud, hud_signature=(100,))
+    renderer.render(draw_background, draw_world, draw_hud, hud_signature=(100,))
+    assert len(hud_calls) == 1 and scaler.presented[-1] == []
+
+    renderer.render(draw_background, draw_world, draw_hud, hud_signature=(90,))
+    assert len(hud_calls) == 2 and scaler.presented[-1] == [pygame.Rect(0, 0, 20, 5)]
+    assert scaler.logic_surface.get_at((5, 2))[:3] == HUD
+
+    renderer.render(draw_background, draw_world, draw_hud, hud_signature=None)  # No signature: always redraw
+    renderer.invalidate()
+    renderer.render(draw_background, draw_world, draw_hud, hud_signature=(90,))
+    assert len(hud_calls) == 4
+    print("✅ HUD signature test completed\n")
+
+def test_scroll_matches_full_redraw():
+    """Scrolling the cached layers gives the same frame as drawing it from scratch"""
+    print("🧪 Testing dirty-rect scrolling...")
+    init_pygame()
+    view = pygame.Rect(0, 0, 100, 80)
+
+    def draw_map(surface, area=None):
+        # Stripes in world space, so any misplaced pixel shows up
+        surface.set_clip(area)
+        surface.fill((0, 0, 0))
+        for x in range(view.x - view.x % 7, view.right, 7):
+            pygame.draw.line(surface, ((x * 5) % 256, 40, 90), (x - view.x, 0), (x - view.x, view.height))
+        for y in range(view.y - view.y % 11, view.bottom, 11):
+            pygame.draw.line(surface, (20, (y * 3) % 256, 200), (0, y - view.y), (view.width, y - view.y))
+        surface.set_clip(None)
+
+    def draw_world(surface):
+        return [surface.fill(SPRITE, pygame.Rect(60 - view.x, 40 - view.y, 6, 6))]
+
+    scaler = RecordingScaler(view.size)
+    renderer = DirtyRectRenderer(scaler)
+    reference = pygame.Surface(view.size).convert()
+    draw_hud = lambda surface: []
+    renderer.render(draw_map, draw_world, draw_hud)
+    for dx, dy in [(3, 0), (0, 5), (-4, 2), (7, -3), (0, 0), (150, 0)]:
+        view.move_ip(dx, dy)
+        renderer.scroll(dx, dy)
+        renderer.render(draw_map, draw_world, draw_hud)
+        reference.fill((0, 0, 0))
+        draw_map(reference)
+        draw_world(reference)
+        for x in range(view.width):
+            for y in range(view.height):
+                assert scaler.logic_surface.get_at((x, y)) == reference.get_at((x, y)), (dx, dy, x, y)
+    # Small moves scroll; a jump wider than the view redraws everything
+    assert renderer.scrolled_frames == 4 and renderer.full_frames == 2
+    print("✅ Dirty-rect scrolling test completed\n")
+
+def test_end_frame_rects_scaling():
+    """Partial presentation scales each logic rect onto the matching screen area"""
+    print("🧪 Testing partial presentation scaling...")
+    init_pygame()
+    scaler = ResolutionScalerFullScreenStretch.__new__(ResolutionScalerFullScreenStretch)
+    scaler.mode = 'prealloc'
+    scaler.platform = 'linux'
+    scaler.logic_surface = pygame.Surface((100, 50)).convert()
+    scaler.screen = pygame.Surface((250, 100)).convert()
+    scaler.scale_x, scaler.scale_y = 2.5, 2.0
+    scaler.logic_surface.fill(SPRITE)
+    scaler.screen.fill((0, 0, 0))
+
+    scaler.end_frame_rects([pygame.Rect(3, 4, 10, 5)])
+    # Left/top round down and right/bottom round up, so neighbouring rects leave no seams
+    assert scaler.screen.get_at((7, 8))[:3] == SPRITE and scaler.screen.get_at((32, 17))[:3] == SPRITE
+    assert scaler.screen.get_at((6, 8))[:3] == (0, 0, 0) and scaler.screen.get_at((33, 18))[:3] == (0, 0, 0)
+
+    # Integer mode places each rect at offset + rect * factor
+    scaler.mode = 'integer'
+    scaler.integer_factor = 2
+    scaler.offset = (25, 0)
+    scaler.screen.fill((0, 0, 0))
+    scaler.end_frame_rects([pygame.Rect(10, 10, 5, 5)])
+    assert scaler.screen.get_at((45, 20))[:3] == SPRITE and scaler.screen.get_at((54, 29))[:3] == SPRITE
+    assert scaler.screen.get_at((44, 20))[:3] == (0, 0, 0) and scaler.screen.get_at((55, 30))[:3] == (0, 0, 0)
+    print("✅ Partial presentation scaling test completed\n")
+
+def main():
+    """Run all tests"""
+    try:
+        test_rect_helpers()
+        test_restore_and_present()
+        test_full_redraw_threshold()
+        test_hud_signature()
+        test_scroll_matches_full_redraw()
+        test_end_frame_rects_scaling()
+        print("🎉 All tests passed!")
+    finally:
+        pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test script for leveled logging
+"""
+
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from log_system import LogManager, DEBUG, WARNING
+
+def test_levels_and_lazy_formatting():
+    """Disabled levels are no-ops and never format their arguments"""
+    print("🧪 Testing log levels...")
+    manager = LogManager()
+    manager.console = False
+    log = manager.get_logger('combat')
+
+    class Exploding:
+        def __str__(self):
+            raise AssertionError("formatted a disabled message")
+
+    assert not log.debug_enabled and log.info_enabled
+    log.debug("direction: %s", Exploding())
+    assert len(manager.ring_buffer) == 0
+
+    manager.configure("warning,combat=debug")
+    waves = manager.get_logger('waves')
+    assert log.debug_enabled
+    assert not waves.info_enabled and waves.warning_enabled
+    log.debug("Attack executed in direction: %s", (1, 0))
+    waves.info("hidden")
+    assert manager.recent_records()[-1].endswith("[combat] Attack executed in direction: (1, 0)")
+    assert len(manager.ring_buffer) == 1
+    print("✅ Log level test completed\n")
+
+def test_ring_buffer_dump():
+    """The ring buffer keeps the latest records and dumps them to a file"""
+    print("🧪 Testing ring buffer dump...")
+    manager = LogManager(ring_size=3)
+    manager.console = False
+    manager.set_level(DEBUG)
+    log = manager.get_logger('waves')
+    for wave in range(5):
+        log.debug("Starting wave %s", wave)
+    log.warning("Spawn point blocked")
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        path = manager.dump(os.path.join(log_dir, "crash.log"), reason="Traceback: boom")
+        with open(path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    assert lines[0] == "Traceback: boom"
+    records = [line for line in lines[1:] if line]
+    assert len(records) == 3
+    assert records[0].endswith("Starting wave 3")
+    assert records[-1].endswith("WARNING: Spawn point blocked")
+    assert manager.get_logger('waves').level == DEBUG
+    manager.set_level(WARNING, 'waves')
+    assert not log.debug_enabled
+    print("✅ Ring buffer dump test completed\n")
+
+def main():
+    """Run all tests"""
+    test_levels_and_lazy_formatting()
+    test_ring_buffer_dump()
+    print("🎉 All tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Test script for map loading and the compiled map cache
+"""
+
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import base64
+import zlib
+import xml.etree.ElementTree as ET
+import numpy as np
+import pygame
+from map_loader import MapLoader, merge_collision_rects
+
+TMX_PATH = os.path.join("tiled_map", "Basic_maps.tmx")
+
+def init_pygame():
+    """Initialize pygame with a display for testing"""
+    pygame.init()
+    pygame.display.set_mode((800, 600))
+
+def load_map(cache_path=None, **kwargs):
+    """Load and set up a map, optionally redirecting its cache file"""
+    loader = MapLoader(TMX_PATH, use_cache=cache_path is not None, **kwargs)
+    if cache_path:
+        loader.cache_path = cache_path
+    assert loader.load_map()
+    loader.setup_layers()
+    return loader
+
+def test_compiled_cache_roundtrip():
+    """A relaunch with an unchanged map loads the cache and matches a fresh parse"""
+    print("🧪 Testing compiled map cache...")
+    init_pygame()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache_path = os.path.join(cache_dir, "map.cache")
+        fresh = load_map()
+        first = load_map(cache_path)
+        assert not first.loaded_from_cache
+        assert os.path.exists(cache_path)
+
+        cached = load_map(cache_path)
+        assert cached.loaded_from_cache
+        assert cached.map_data is None  # No XML was parsed
+
+        assert (cached.map_width, cached.map_height) == (fresh.map_width, fresh.map_height)
+        assert cached.tile_animations == fresh.tile_animations
+        assert len(cached.animated_tiles) == len(fresh.animated_tiles)
+        assert cached.collision_rects == fresh.collision_rects
+        assert cached.obstacle_rects == fresh.obstacle_rects
+        for fresh_layer, cached_layer in zip(fresh.layers, cached.layers):
+            assert np.array_equal(fresh_layer['data'], cached_layer['data'])
+            assert (pygame.image.tobytes(fresh_layer['surface'], 'RGBA') ==
+                    pygame.image.tobytes(cached_layer['surface'], 'RGBA'))
+    print("✅ Compiled map cache test completed\n")
+
+def test_stale_cache_is_ignored():
+    """Changing a source file invalidates the cache"""
+    print("🧪 Testing stale map cache...")
+    init_pygame()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache_path = os.path.join(cache_dir, "map.cache")
+        loader = load_map(cache_path)
+        # Pretend the TMX was edited after the cache was written
+        loader.compiled['sources'][TMX_PATH] = (0, 0)
+        loader._save_cache()
+
+        reloaded = load_map(cache_path)
+        assert not reloaded.loaded_from_cache
+    print("✅ Stale map cache test completed\n")
+
+def test_layer_decoding():
+    """CSV, base64 and zlib layers decode to the same uint32 grid without flip flags"""
+    print("🧪 Testing layer decoding...")
+    loader = MapLoader(TMX_PATH, use_cache=False)
+    gids = np.array([0, 1, 5, 0x80000005, 12, 0], dtype=np.uint32)  # 0x80000005 is tile 5 flipped
+    expected = np.array([0, 1, 5, 5, 12, 0], dtype=np.uint32)
+
+    csv_elem = ET.Element('data')
+    csv_elem.text = "\n" + ",".join(str(gid) for gid in gids.tolist()) + "\n"
+    b64_elem = ET.Element('data')
+    b64_elem.text = base64.b64encode(gids.astype('<u4').tobytes()).decode()
+    zlib_elem = ET.Element('data')
+    zlib_elem.text = base64.b64encode(zlib.compress(gids.astype('<u4').tobytes())).decode()
+
+    for elem, encoding, compression in [(csv_elem, 'csv', None), (b64_elem, 'base64', None),
+                                        (zlib_elem, 'base64', 'zlib')]:
+        tile_data = loader._parse_layer_data(elem, encoding, compression)
+        assert tile_data.dtype == np.uint32
+        assert np.array_equal(tile_data, expected)
+
+    grid = loader._to_grid(expected, 3, 2)
+    assert grid.shape == (2, 3) and grid[1, 0] == 5
+    # Short layers are padded with empty tiles
+    assert loader._to_grid(expected[:4], 3, 2)[1].tolist() == [5, 0, 0]
+    print("✅ Layer decoding test completed\n")
+
+def test_tile_lookup_table():
+    """Tiles are subsurfaces of their tileset image, indexed by gid"""
+    print("🧪 Testing tile lookup table...")
+    init_pygame()
+    loader = load_map()
+
+    assert loader._get_tile_image(0) is None
+    for firstgid, tileset in loader.tilesets.items():
+        tile = loader._get_tile_image(firstgid)
+        assert tile is loader.tile_lookup[firstgid]
+        assert tile.get_parent() is tileset['image']
+        assert tile.get_size() == (tileset['tile_width'], tileset['tile_height'])
+    # Gids past the last tileset resolve through bisect and are simply empty
+    assert loader._get_tile_image(len(loader.tile_lookup) + 100) is None
+    print("✅ Tile lookup table test completed\n")
+
+def test_static_composite():
+    """The flattened map matches drawing every layer, with canopy layers split out"""
+    print("🧪 Testing static map composite...")
+    init_pygame()
+    loader = load_map()
+    view = pygame.Rect(0, 0, 800, 600)
+
+    expected = pygame.Surface(view.size)
+    expected.fill(loader.background_color)
+    for layer in loader.layers:
+        expected.blit(layer['surface'], (-40, -30))
+
+    flattened = pygame.Surface(view.size)
+    assert loader.covers_view(view, 40, 30)
+    assert not loader.covers_view(view, -1, 0)
+    loader.draw_static_layers(flattened, 40, 30)
+    assert loader.above_composite is None
+    assert pygame.image.tobytes(flattened, 'RGB') == pygame.image.tobytes(expected, 'RGB')
+
+    # A layer marked above_sprites moves to the foreground composite
+    loader.layers[-1]['above_sprites'] = True
+    loader._build_static_composite()
+    split = pygame.Surface(view.size)
+    loader.draw_static_layers(split, 40, 30)
+    assert pygame.image.tobytes(split, 'RGB') != pygame.image.tobytes(expected, 'RGB')
+    loader.draw_above_layers(split, 40, 30)
+    assert pygame.image.tobytes(split, 'RGB') == pygame.image.tobytes(expected, 'RGB')
+
+    layer_elem = ET.fromstring('<layer><properties><property name="above_sprites" type="bool" value="true"/>'
+                               '</properties></layer>')
+    assert loader._layer_bool_property(layer_elem, 'above_sprites')
+    assert not loader._layer_bool_property(ET.Element('layer'), 'above_sprites')
+    print("✅ Static map composite test completed\n")
+
+def test_shared_animation_clocks():
+    """Tiles with the same gid share one clock; baking matches per-tile drawing"""
+    print("🧪 Testing shared animation clocks...")
+    init_pygame()
+    loader = load_map()
+    loader.track_animation_changes = True
+    assert sum(len(group['tiles']) for group in loader.animation_groups.values()) == len(loader.animated_tiles)
+
+    # 100 ms frames advance together; the 200 ms rocks (gid 635) do not yet
+    loader.update_animations(0.1)
+    foam = loader.animation_groups[379]
+    rocks = loader.animation_groups[635]
+    assert foam['current_frame'] == 1 and rocks['current_frame'] == 0
+    changed = loader.pop_changed_animated_rects()
+    assert len(changed) == len(loader.animated_tiles) - len(rocks['tiles'])
+    assert loader.pop_changed_animated_rects() == []
+
+    # The full map needs too many frames for the default budget
+    assert not loader.bake_animation_frames()
+
+    # Bake just the foam tiles: 8 frames of 100 ms
+    loader.animated_tiles = list(foam['tiles'])
+    loader._build_animation_groups()
+    assert loader.animation_period == 800
+    bounds = pygame.Rect(foam['tiles'][0]['rect']).unionall([tile['rect'] for tile in foam['tiles']])
+    frame_bytes = bounds.width * bounds.height * 4
+    assert not loader.bake_animation_frames(7 * frame_bytes)  # One frame over budget
+    assert loader.bake_animation_frames(8 * frame_bytes)
+    assert len(loader.baked_frames) == 8
+    for step in range(3):
+        loader.update_animations(0.1)
+        baked = pygame.Surface((800, 600))
+        loader.draw_animated_tiles(baked, 500, 0)
+        frames = loader.baked_frames
+        loader.baked_frames = []
+        direct = pygame.Surface((800, 600))
+        loader.draw_animated_tiles(direct, 500, 0)
+        loader.baked_frames = frames
+        assert pygame.image.tobytes(baked, 'RGB') == pygame.image.tobytes(direct, 'RGB')
+    print("✅ Shared animation clock test completed\n")
+
+def test_merged_collision_rects():
+    """Abutting obstacles merge into fewer rects that cover exactly the same pixels"""
+    print("🧪 Testing collision rect merging...")
+    init_pygame()
+    # An L of three abutting squares, a lone rect and an empty one
+    rects = [pygame.Rect(0, 0, 10, 10), pygame.Rect(10, 0, 10, 10), pygame.Rect(0, 10, 10, 10),
+             pygame.Rect(100, 100, 5, 5), pygame.Rect(50, 50, 0, 10)]
+    merged = merge_collision_rects(rects)
+    assert merged == [pygame.Rect(0, 0, 20, 10), pygame.Rect(0, 10, 10, 10), pygame.Rect(100, 100, 5, 5)]
+    # A cross would need three disjoint pieces, so its two rects are kept
+    cross = [pygame.Rect(10, 0, 10, 30), pygame.Rect(0, 10, 30, 10)]
+    assert merge_collision_rects(cross) == cross
+
+    loader = load_map()
+    stats = loader.collision_stats
+    assert stats['obstacles'] == len(loader.collision_sprites) < stats['source_rects']
+    assert stats['debug_bytes'] == 0 and stats['debug_bytes_saved'] > 0
+    assert all(obstacle.image is None for obstacle in loader.collision_sprites)
+
+    # The debug overlay allocates images for the merged obstacles only
+    debug = load_map(debug_collision=True)
+    assert all(obstacle.image is not None for obstacle in debug.collision_sprites)
+    assert debug.collision_stats['debug_bytes'] > 0
+    print("✅ Collision rect merging test completed\n")
+
+def main():
+    """Run all tests"""
+    try:
+        test_compiled_cache_roundtrip()
+        test_stale_cache_is_ignored()
+        test_layer_decoding()
+        test_tile_lookup_table()
+        test_static_composite()
+        test_shared_animation_clocks()
+        test_merged_collision_rects()
+        print("🎉 All tests passed!")
+    finally:
+        pygame.quit()
+
+if __name__ == "__main__":
+    main()
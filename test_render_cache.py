@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared render caches
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import pygame
+from render_cache import RotationCache, EffectVariantCache
+
+def init_pygame():
+    """Initialize pygame with a display for testing"""
+    pygame.init()
+    pygame.display.set_mode((800, 600))
+
+def test_rotation_cache():
+    """Angles map to the nearest pre-baked bucket and reuse the same surface"""
+    print("🧪 Testing rotation cache...")
+    init_pygame()
+    image = pygame.Surface((80, 16), pygame.SRCALPHA)
+    image.fill((255, 0, 0))
+    cache = RotationCache(image, buckets=64)
+
+    assert len(cache.frames) == 64
+    assert cache.get(0).get_size() == (80, 16)
+
+    # 90 degrees is bucket 16 and swaps width/height
+    surface = cache.get(90)
+    assert cache.bucket(90) == 16
+    assert surface.get_size() == (16, 80)
+
+    # Nearby and wrapped angles share a bucket, and nothing is allocated per call
+    assert cache.get(91) is surface
+    assert cache.get(90 - 360) is surface
+    assert cache.get(359.9) is cache.get(0)
+    print("✅ Rotation cache test completed\n")
+
+def test_arrows_share_rotations():
+    """Arrows fired the same way reuse one pre-rotated image"""
+    print("🧪 Testing arrow rotations...")
+    init_pygame()
+    from enemy_system import Arrow
+
+    first = Arrow((100, 100), (300, 100), damage=5)
+    second = Arrow((400, 200), (600, 200), damage=5)
+    upward = Arrow((100, 100), (100, 0), damage=5)
+    assert first.image is second.image
+    assert first.rect.center == (100, 100)
+    assert upward.image.get_height() > upward.image.get_width()
+    print("✅ Arrow rotation test completed\n")
+
+def test_effect_variants():
+    """Flash and death variants are built once per frame and then reused"""
+    print("🧪 Testing effect variants...")
+    init_pygame()
+    frame = pygame.Surface((40, 20), pygame.SRCALPHA)
+    frame.fill((100, 100, 100, 255))
+    cache = EffectVariantCache(death_buckets=30)
+
+    tinted = cache.get_tinted(frame)
+    assert tinted is cache.get_tinted(frame)
+    assert tinted.get_at((0, 0))[:3] == (255, 150, 150)
+    assert cache.get_invisible(frame).get_alpha() == 0
+    assert frame.get_at((0, 0)) == (100, 100, 100, 255)
+
+    # Progress maps to buckets; frames in one bucket are shared
+    start = cache.get_death_frame(frame, 0.0)
+    assert start.get_size() == (40, 20)
+    assert cache.get_death_frame(frame, 0.01) is start
+    half = cache.get_death_frame(frame, 0.5)
+    assert cache.death_bucket(0.5) == 15
+    assert half.get_width() < 40 * 1.5 and half is not start
+    assert half.get_at((half.get_width() // 2, half.get_height() // 2))[3] == 127
+    assert cache.death_bucket(0.999) == 29
+    print("✅ Effect variant test completed\n")
+
+def main():
+    """Run all tests"""
+    try:
+        test_rotation_cache()
+        test_arrows_share_rotations()
+        test_effect_variants()
+        print("🎉 All tests passed!")
+    finally:
+        pygame.quit()
+
+if __name__ == "__main__":
+    main()
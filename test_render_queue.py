@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test script for the y-sorted render queue and cached health bars
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import pygame
+from render_queue import RenderQueue, OVERLAY_DEPTH
+from health_system import HealthBar, HealthSystem
+
+def init_pygame():
+    """Initialize pygame with a display for testing"""
+    pygame.init()
+    pygame.display.set_mode((800, 600))
+
+def make_sprite(color, rect):
+    sprite = pygame.sprite.Sprite()
+    sprite.image = pygame.Surface(rect.size)
+    sprite.image.fill(color)
+    sprite.rect = rect
+    return sprite
+
+def test_y_sorted_flush():
+    """Sprites lower on screen are drawn in front; overlays go on top"""
+    print("🧪 Testing render queue ordering...")
+    init_pygame()
+    surface = pygame.Surface((200, 200))
+    queue = RenderQueue()
+    front = make_sprite((255, 0, 0), pygame.Rect(10, 40, 50, 50))  # bottom 90
+    back = make_sprite((0, 0, 255), pygame.Rect(30, 20, 50, 50))  # bottom 70
+    overlay = pygame.Surface((10, 10))
+    overlay.fill((0, 255, 0))
+
+    queue.add(overlay, (35, 45), OVERLAY_DEPTH)
+    queue.add_sprite(front)
+    queue.add_sprite(back)
+    trail = pygame.Surface((4, 4))
+    queue.add_blits([(trail, (150, 150)), (trail, (154, 150))], depth=155)
+    queue.add_dirty_rect(pygame.Rect(150, 150, 8, 4))
+    pending = queue.get_pending_rects()
+    rects = queue.flush(surface)
+    assert sorted(map(tuple, pending)) == sorted(map(tuple, rects))  # Known before drawing
+
+    assert surface.get_at((40, 60))[:3] == (255, 0, 0)  # front covers back
+    assert surface.get_at((75, 30))[:3] == (0, 0, 255)
+    assert surface.get_at((40, 50))[:3] == (0, 255, 0)  # overlay above both
+    # Untracked blits are reported only through the extra dirty rect
+    assert rects == [pygame.Rect(30, 20, 50, 50), pygame.Rect(10, 40, 50, 50),
+                     pygame.Rect(35, 45, 10, 10), pygame.Rect(150, 150, 8, 4)]
+    assert queue.flush(surface) == []
+    print("✅ Render queue ordering test completed\n")
+
+def test_health_bar_images_are_shared():
+    """Bars with the same filled width reuse one cached image"""
+    print("🧪 Testing cached health bars...")
+    init_pygame()
+    bar = HealthBar(width=80, height=8)
+    health = HealthSystem(100)
+    full = bar.get_image(health.get_health_percentage())
+    assert full.get_size() == (84, 12)
+    assert HealthBar(width=80, height=8).get_image(1.0) is full
+    assert bar.get_image(0.999) is not full  # 79 px filled
+    assert bar.get_image(0.25).get_at((2, 2))[:3] == (255, 0, 0)  # Low health color
+    assert bar.draw(pygame.Surface((200, 100)), health, (10, 10)) == pygame.Rect(8, 8, 84, 12)
+    print("✅ Cached health bar test completed\n")
+
+def main():
+    """Run all tests"""
+    try:
+        test_y_sorted_flush()
+        test_health_bar_images_are_shared()
+        print("🎉 All tests passed!")
+    finally:
+        pygame.quit()
+
+if __name__ == "__main__":
+    main()
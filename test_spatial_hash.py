@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for the spatial hash used by enemies and power-ups
+"""
+
+import sys
+import os
+import random
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import pygame
+from spatial_hash import SpatialHash, CollisionIndex
+
+class Box:
+    """Minimal item with a rect"""
+    def __init__(self, x, y, width=20, height=20):
+        self.rect = pygame.Rect(x, y, width, height)
+
+def test_rect_and_radius_queries():
+    """Queries return exactly the overlapping / nearby items, once each"""
+    print("🧪 Testing spatial hash queries...")
+    grid = SpatialHash(cell_size=64)
+    near = Box(10, 10)
+    spanning = Box(50, 50, 100, 100)  # Covers several cells
+    far = Box(1000, 1000)
+    grid.build([near, spanning, far])
+    assert len(grid) == 3
+
+    assert grid.query_rect(pygame.Rect(0, 0, 60, 60)) == [near, spanning]
+    assert grid.query_rect(pygame.Rect(120, 120, 5, 5)) == [spanning]
+    assert grid.query_rect(pygame.Rect(500, 500, 10, 10)) == []
+
+    assert grid.query_radius((20, 20), 10) == [near]
+    assert set(grid.query_radius((60, 60), 100)) == {near, spanning}
+    print("✅ Spatial hash query test completed\n")
+
+def test_update_and_remove():
+    """Moved items are re-bucketed and removed items are no longer found"""
+    print("🧪 Testing spatial hash updates...")
+    grid = SpatialHash(cell_size=64)
+    box = Box(10, 10)
+    grid.insert(box)
+    box.rect.topleft = (300, 300)
+    grid.update(box)
+    assert grid.query_rect(pygame.Rect(0, 0, 64, 64)) == []
+    assert grid.query_rect(pygame.Rect(290, 290, 20, 20)) == [box]
+
+    grid.remove(box)
+    grid.remove(box)  # Already gone
+    assert len(grid) == 0 and not grid.cells
+    print("✅ Spatial hash update test completed\n")
+
+def test_collision_index_matches_spritecollide():
+    """The static index finds the same obstacles, in the same order, as a full scan"""
+    print("🧪 Testing collision index...")
+    rng = random.Random(7)
+    obstacles = []
+    for _ in range(300):
+        obstacle = pygame.sprite.Sprite()
+        obstacle.rect = pygame.Rect(rng.randint(0, 2000), rng.randint(0, 2000), rng.randint(8, 200), rng.randint(8, 200))
+        obstacles.append(obstacle)
+    group = pygame.sprite.Group(obstacles)
+    mover = pygame.sprite.Sprite()
+    for index in (CollisionIndex(obstacles, cell_size=128), CollisionIndex(obstacles, linear_scan_limit=1000)):
+        for _ in range(500):
+            mover.rect = pygame.Rect(rng.randint(-100, 2100), rng.randint(-100, 2100), 115, 115)
+            expected = pygame.sprite.spritecollide(mover, group, False)
+            assert index.query(mover.rect) == sorted(expected, key=obstacles.index)
+            assert index.collides(mover.rect) == bool(expected)
+    assert CollisionIndex().query(pygame.Rect(0, 0, 10, 10)) == []
+    print("✅ Collision index test completed\n")
+
+def main():
+    """Run all tests"""
+    test_rect_and_radius_queries()
+    test_update_and_remove()
+    test_collision_index_matches_spritecollide()
+    print("🎉 All tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script for the startup profiler
+"""
+
+import sys
+import os
+import json
+import tempfile
+import threading
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from startup_profiler import StartupProfiler, flatten_report, compare_reports
+
+def test_nested_phase_tree():
+    """Phases nest per thread and nothing is recorded while disabled"""
+    print("🧪 Testing nested profiler phases...")
+    profiler = StartupProfiler()
+    with profiler.phase('ignored'):
+        pass
+    assert profiler.roots == {}
+
+    profiler.configure(argv=[], environ={'TSS_PROFILE_STARTUP': '1'})
+    assert profiler.enabled
+    with profiler.phase('game_init'):
+        with profiler.phase('scaler'):
+            pass
+        with profiler.phase('ui'):
+            with profiler.phase('fonts'):
+                pass
+
+    def load_map():
+        with profiler.phase('map'):
+            pass
+
+    worker = threading.Thread(target=load_map, name='asset-loader_0')
+    worker.start()
+    worker.join()
+
+    main_thread = threading.current_thread().name
+    assert set(profiler.roots) == {main_thread, 'asset-loader_0'}
+    game_init = profiler.roots[main_thread][0]
+    assert [child.name for child in game_init.children] == ['scaler', 'ui']
+    assert [child.name for child in game_init.children[1].children] == ['fonts']
+    assert game_init.duration >= game_init.children[1].duration >= game_init.children[1].children[0].duration
+    assert [node.name for node in profiler.roots['asset-loader_0']] == ['map']
+    print("✅ Nested profiler phase test completed\n")
+
+def test_json_report():
+    """The JSON report round-trips and compares by thread/phase path"""
+    print("🧪 Testing profiler JSON report...")
+    profiler = StartupProfiler()
+    profiler.enable()
+    with profiler.phase('imports'):
+        with profiler.phase('pygame'):
+            pass
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = profiler.write_report(directory)
+        assert path.endswith('.json') and os.path.exists(path[:-len('.json')] + '.txt')
+        with open(path, encoding='utf-8') as f:
+            report = json.load(f)
+    assert profiler.report_written
+    assert report['version'] == 1
+    main_thread = threading.current_thread().name
+    imports = report['threads'][main_thread][0]
+    assert imports['name'] == 'imports' and imports['children'][0]['name'] == 'pygame'
+    assert imports['children'][0]['children'] == []
+    assert 0 <= imports['start_ms'] <= imports['children'][0]['start_ms']
+
+    totals = flatten_report(report)
+    assert set(totals) == {f"{main_thread}/imports", f"{main_thread}/imports/pygame"}
+
+    slower = json.loads(json.dumps(report))
+    slower['threads'][main_thread][0]['duration_ms'] += 50
+    comparison = compare_reports(report, slower)
+    assert f"{main_thread}/imports" in comparison and "+50.0" in comparison
+    assert StartupProfiler().write_report() is None  # Disabled: no files
+    print("✅ Profiler JSON report test completed\n")
+
+def main():
+    """Run all tests"""
+    test_nested_phase_tree()
+    test_json_report()
+    print("🎉 All tests passed!")
+
+if __name__ == "__main__":
+    main()
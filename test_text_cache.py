@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test script for cached text rendering
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import pygame
+from text_cache import FontRegistry, TextCache, TextLabel
+
+def test_text_cache_lru():
+    """Repeated text is rendered once and the oldest entries are evicted"""
+    print("🧪 Testing text cache...")
+    pygame.font.init()
+    fonts = FontRegistry()
+    font = fonts.get(24)
+    assert fonts.get(24) is font
+    cache = TextCache(max_entries=2)
+
+    health = cache.render(font, "Health: 100/100", (255, 255, 255))
+    assert cache.render(font, "Health: 100/100", (255, 255, 255)) is health
+    assert cache.render(font, "Health: 100/100", (255, 255, 0)) is not health
+    assert cache.get_stats()['hits'] == 1
+
+    # "Wave: 1" pushes out the least recently used entry (the white health text)
+    cache.render(font, "Wave: 1", (255, 255, 255))
+    assert cache.get_stats()['evictions'] == 1
+    assert cache.render(font, "Health: 100/100", (255, 255, 255)) is not health
+    print("✅ Text cache test completed\n")
+
+def test_text_label():
+    """A label re-renders only when its text changes"""
+    print("🧪 Testing text label...")
+    pygame.font.init()
+    cache = TextCache()
+    label = TextLabel(FontRegistry().get(36), (255, 255, 255), cache)
+    first = label.set_text("Enemies: 3")
+    assert label.set_text("Enemies: 3") is first
+    assert cache.get_stats()['misses'] == 1 and cache.get_stats()['hits'] == 0
+    assert label.set_text("Enemies: 2") is not first
+    print("✅ Text label test completed\n")
+
+def main():
+    """Run all tests"""
+    try:
+        test_text_cache_lru()
+        test_text_label()
+        print("🎉 All tests passed!")
+    finally:
+        pygame.quit()
+
+if __name__ == "__main__":
+    main()